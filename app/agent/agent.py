@@ -8,6 +8,7 @@ from dotenv import load_dotenv
 from prompts.root_agent_prompt import ROOT_AGENT_PROMPT
 from sub_agents.procedure_agent import procedure_agent
 from sub_agents.corpus_agent import corpus_agent
+from sub_agents.pre_router import PreRouterAgent, intent_classifier
 
 load_dotenv()
 
@@ -16,7 +17,7 @@ MCP_SERVER_URL = os.getenv("MCP_SERVER_URL")
 
 MODEL_GEMINI = os.getenv("MODEL_GEMINI")
 
-root_agent = LlmAgent(
+orchestrator_agent = LlmAgent(
     name="multi_domain_agent",
     model=MODEL_GEMINI,
     description=(
@@ -24,4 +25,11 @@ root_agent = LlmAgent(
     ),
     instruction=ROOT_AGENT_PROMPT,
     sub_agents=[procedure_agent, corpus_agent],
-)
\ No newline at end of file
+)
+
+root_agent = PreRouterAgent(
+    name="pre_router_agent",
+    fallback=orchestrator_agent,
+    classifier=intent_classifier,
+    description="Enruta localmente las peticiones claras y deja las demás al orquestador.",
+)
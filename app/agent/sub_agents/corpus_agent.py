@@ -4,18 +4,28 @@ Agente especializado en (eliminar, crear, listar y obtener información) de corp
 """
 
 from google.adk.agents import Agent
-from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset, StreamableHTTPConnectionParams
 from google.genai import types
 import os
 from dotenv import load_dotenv
 
 from prompts.corpus_agent_prompt import CORPUS_AGENT_PROMPT
+from sub_agents.shared_toolset import mcp_tools_for
 
 load_dotenv()
-MCP_SERVER_TOKEN = os.getenv("MCP_SERVER_TOKEN")
-MCP_SERVER_URL = os.getenv("MCP_SERVER_URL")
 MODEL_GEMINI = os.getenv("MODEL_GEMINI")
 
+CORPUS_AGENT_TOOLS = [
+    "list_corpora",
+    "create_corpus",
+    "delete_corpus",
+    "add_data_corpus",
+    "delete_document",
+    "delete_documents",
+    "get_corpus_info",
+    "get_import_status",
+    "sync_corpus",
+]
+
 def create_corpus_agent() -> Agent:
     """
     Crea el agente especializado en crear e informar sobre corpus RAG.
@@ -23,23 +33,12 @@ def create_corpus_agent() -> Agent:
     Returns:
         Agent: Agente configurado con herramientas MCP para gestionar corpus RAG y documentos.
     """
-    headers = {
-        "Authorization": f"Bearer {MCP_SERVER_TOKEN}"
-    }
-
     return Agent(
         name="corpus_info_agent",
         model=MODEL_GEMINI,
         description="Agente especializado en crear corpus y recuperar información sobre corpus RAG en Vertex AI",
         instruction=CORPUS_AGENT_PROMPT,
-        tools=[
-            MCPToolset(
-                connection_params=StreamableHTTPConnectionParams(
-                    url=f"{MCP_SERVER_URL}/api/mcp",
-                    headers=headers
-                )
-            )
-        ],
+        tools=[mcp_tools_for(CORPUS_AGENT_TOOLS)],
         generate_content_config=types.GenerateContentConfig(
             temperature=0.3,
             max_output_tokens=800,
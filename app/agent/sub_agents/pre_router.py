@@ -0,0 +1,256 @@
+"""
+Pre-enrutador determinista delante del agente orquestador.
+
+Clasifica localmente la petición del usuario con reglas de palabras clave y un clasificador
+Naive Bayes entrenado con ejemplos fijos. Si la clase es clara, la petición pasa directo al
+sub-agente correspondiente y se ahorra la llamada al modelo que solo decidiría a quién
+delegar. Con confianza baja, o para peticiones fuera de dominio, responde el orquestador.
+"""
+
+import logging
+import math
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import AsyncGenerator, Dict, List, Optional, Tuple
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+
+logger = logging.getLogger(__name__)
+
+PRE_ROUTER_ENABLED = os.getenv("PRE_ROUTER_ENABLED", "true").lower() in ("1", "true", "yes")
+PRE_ROUTER_MIN_CONFIDENCE = float(os.getenv("PRE_ROUTER_MIN_CONFIDENCE", "0.8"))
+
+PROCEDURE_AGENT = "procedure_info_agent"
+CORPUS_AGENT = "corpus_info_agent"
+GENERAL = "general"
+
+STOP_WORDS = {
+    "a", "al", "como", "con", "de", "del", "el", "en", "es", "la", "las", "lo", "los",
+    "me", "mi", "mis", "para", "por", "que", "se", "su", "sus", "un", "una", "y", "yo",
+}
+
+# Patrones inequívocos: si solo coincide una clase, se enruta sin consultar al clasificador
+KEYWORD_RULES: Dict[str, List[str]] = {
+    CORPUS_AGENT: [
+        r"\bcorpus\b",
+        r"\bcorpora\b",
+        r"gs://",
+        r"\bragfiles?\b",
+        r"\bjob_id\b",
+        r"\b(importa|importar|sincroniza|sincronizar)\b.*\b(documentos?|archivos?)\b",
+        r"\b(elimina|eliminar|borra|borrar|agrega|agregar|sube|subir)\b.*\b(documentos?|archivos?)\b",
+        r"\bbase de conocimiento\b",
+    ],
+    PROCEDURE_AGENT: [
+        r"\btramites?\b",
+        r"\brequisitos?\b",
+        r"\bcomo (saco|obtengo|renuevo|tramito|solicito|pago|registro)\b",
+        r"\b(acta|licencia|pasaporte|curp|predial|placas|tenencia|constancia)\b",
+        r"\bcuanto cuesta\b",
+        r"\bdonde (puedo|se) (tramitar|pagar|solicitar)\b",
+    ],
+}
+
+TRAINING_EXAMPLES: List[Tuple[str, str]] = [
+    ("¿Cómo renuevo mi licencia de conducir?", PROCEDURE_AGENT),
+    ("¿Qué documentos necesito para sacar mi acta de nacimiento?", PROCEDURE_AGENT),
+    ("Requisitos para tramitar el pasaporte", PROCEDURE_AGENT),
+    ("¿Cuánto cuesta el cambio de placas?", PROCEDURE_AGENT),
+    ("¿Dónde pago el impuesto predial?", PROCEDURE_AGENT),
+    ("Quiero solicitar una constancia de no antecedentes penales", PROCEDURE_AGENT),
+    ("¿Cuál es el horario de la oficina de registro civil?", PROCEDURE_AGENT),
+    ("¿Cómo registro a mi hijo recién nacido?", PROCEDURE_AGENT),
+    ("¿Qué necesito para casarme por el civil?", PROCEDURE_AGENT),
+    ("¿Puedo pagar la tenencia en línea?", PROCEDURE_AGENT),
+    ("¿Cuánto tarda la expedición de un certificado de estudios?", PROCEDURE_AGENT),
+    ("Información sobre el permiso de construcción municipal", PROCEDURE_AGENT),
+    ("¿Qué identificación oficial me piden en la ventanilla?", PROCEDURE_AGENT),
+    ("Lista todos los corpus disponibles", CORPUS_AGENT),
+    ("Crea un nuevo corpus llamado tramites-2025", CORPUS_AGENT),
+    ("Elimina el corpus de pruebas", CORPUS_AGENT),
+    ("Agrega los documentos de gs://bucket/carpeta al corpus", CORPUS_AGENT),
+    ("¿Cuántos documentos tiene el corpus de movilidad?", CORPUS_AGENT),
+    ("Borra el documento con id 123 de la base de conocimiento", CORPUS_AGENT),
+    ("¿Cómo va la importación que lancé?", CORPUS_AGENT),
+    ("Sincroniza el corpus con la carpeta del bucket", CORPUS_AGENT),
+    ("Muéstrame la información del corpus y sus archivos", CORPUS_AGENT),
+    ("Importa estos archivos PDF al índice", CORPUS_AGENT),
+    ("Hola, buenos días", GENERAL),
+    ("Gracias por la ayuda", GENERAL),
+    ("¿Quién eres?", GENERAL),
+    ("¿Qué puedes hacer?", GENERAL),
+    ("Cuéntame un chiste", GENERAL),
+    ("¿Qué clima hace hoy?", GENERAL),
+    ("Escribe un poema sobre el mar", GENERAL),
+]
+
+
+def normalize_text(text: str) -> str:
+    """
+    Minúsculas y sin acentos, para que 'trámite' y 'tramite' coincidan.
+    """
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in re.findall(r"\w+", normalize_text(text)) if token not in STOP_WORDS]
+
+
+class NaiveBayesClassifier:
+    """
+    Naive Bayes multinomial con suavizado de Laplace sobre unigramas.
+    """
+
+    def __init__(self, examples: List[Tuple[str, str]], alpha: float = 1.0):
+        self.alpha = alpha
+        self.word_counts: Dict[str, Counter] = {}
+        self.doc_counts: Counter = Counter()
+        for text, label in examples:
+            self.doc_counts[label] += 1
+            self.word_counts.setdefault(label, Counter()).update(tokenize(text))
+
+        self.vocabulary = {word for counts in self.word_counts.values() for word in counts}
+        self.total_words = {label: sum(counts.values()) for label, counts in self.word_counts.items()}
+        self.total_docs = sum(self.doc_counts.values())
+
+    def predict(self, text: str) -> Tuple[str, float, int]:
+        """
+        Devuelve la clase más probable, su probabilidad posterior y cuántos tokens del texto
+        estaban en el vocabulario de entrenamiento.
+        """
+        tokens = [token for token in tokenize(text) if token in self.vocabulary]
+        vocabulary_size = len(self.vocabulary)
+
+        log_scores = {}
+        for label, counts in self.word_counts.items():
+            score = math.log(self.doc_counts[label] / self.total_docs)
+            denominator = self.total_words[label] + self.alpha * vocabulary_size
+            for token in tokens:
+                score += math.log((counts[token] + self.alpha) / denominator)
+            log_scores[label] = score
+
+        best_label = max(log_scores, key=log_scores.get)
+        best_score = log_scores[best_label]
+        normalizer = sum(math.exp(score - best_score) for score in log_scores.values())
+        return best_label, 1.0 / normalizer, len(tokens)
+
+
+class RouteDecision:
+    def __init__(self, label: str, confidence: float, method: str):
+        self.label = label
+        self.confidence = confidence
+        self.method = method
+
+    def __repr__(self) -> str:
+        return f"RouteDecision({self.label!r}, {self.confidence:.2f}, {self.method!r})"
+
+
+class IntentClassifier:
+    """
+    Combina las reglas de palabras clave con el clasificador Naive Bayes. Las reglas deciden
+    cuando solo una clase coincide; en empate o sin coincidencias decide el clasificador.
+    """
+
+    def __init__(self, rules: Dict[str, List[str]], examples: List[Tuple[str, str]]):
+        self.rules = {label: [re.compile(pattern) for pattern in patterns] for label, patterns in rules.items()}
+        self.model = NaiveBayesClassifier(examples)
+
+    def classify(self, text: str) -> RouteDecision:
+        normalized = normalize_text(text)
+        matched = [
+            label for label, patterns in self.rules.items()
+            if any(pattern.search(normalized) for pattern in patterns)
+        ]
+        if len(matched) == 1:
+            return RouteDecision(matched[0], 1.0, "rule")
+
+        label, confidence, known_tokens = self.model.predict(text)
+        if known_tokens < 2:
+            # Con uno o ningún token conocido la probabilidad posterior no es confiable
+            confidence = min(confidence, 0.5)
+        return RouteDecision(label, confidence, "classifier")
+
+
+class RoutingStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.routed: Counter = Counter()
+        self.methods: Counter = Counter()
+        self.fallbacks = 0
+
+    def record(self, decision: RouteDecision, routed: bool) -> None:
+        with self._lock:
+            if routed:
+                self.routed[decision.label] += 1
+                self.methods[decision.method] += 1
+            else:
+                self.fallbacks += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            routed_total = sum(self.routed.values())
+            total = routed_total + self.fallbacks
+            return {
+                "enabled": PRE_ROUTER_ENABLED,
+                "min_confidence": PRE_ROUTER_MIN_CONFIDENCE,
+                "routed": dict(self.routed),
+                "routed_by_method": dict(self.methods),
+                "fallbacks": self.fallbacks,
+                "llm_routing_calls_saved_ratio": routed_total / total if total else 0.0,
+            }
+
+
+intent_classifier = IntentClassifier(KEYWORD_RULES, TRAINING_EXAMPLES)
+routing_stats = RoutingStats()
+
+
+def user_text(ctx: InvocationContext) -> str:
+    content = ctx.user_content
+    if not content or not content.parts:
+        return ""
+    return " ".join(part.text for part in content.parts if part.text)
+
+
+class PreRouterAgent(BaseAgent):
+    """
+    Agente raíz que decide localmente a qué sub-agente va cada petición.
+
+    `fallback` es el orquestador LlmAgent; sus sub-agentes son los destinos del enrutamiento
+    directo. Como `fallback` queda como sub-agente de este, las transferencias que hagan los
+    sub-agentes de regreso al orquestador siguen funcionando.
+    """
+
+    fallback: BaseAgent
+    classifier: IntentClassifier
+    min_confidence: float = PRE_ROUTER_MIN_CONFIDENCE
+
+    def __init__(self, name: str, fallback: BaseAgent, classifier: IntentClassifier, **kwargs):
+        super().__init__(
+            name=name,
+            fallback=fallback,
+            classifier=classifier,
+            sub_agents=[fallback],
+            **kwargs,
+        )
+
+    def route(self, text: str) -> Tuple[RouteDecision, Optional[BaseAgent]]:
+        decision = self.classifier.classify(text)
+        if decision.label == GENERAL or decision.confidence < self.min_confidence:
+            return decision, None
+        return decision, self.fallback.find_sub_agent(decision.label)
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        target = None
+        if PRE_ROUTER_ENABLED:
+            decision, target = self.route(user_text(ctx))
+            routing_stats.record(decision, routed=target is not None)
+            logger.info(f"Pre-enrutamiento: {decision} -> {target.name if target else self.fallback.name}")
+
+        async for event in (target or self.fallback).run_async(ctx):
+            yield event
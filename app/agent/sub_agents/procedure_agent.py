@@ -4,18 +4,18 @@ Agente especializado en recuperar información sobre trámites gubernamentales.
 
 import os
 from google.adk.agents import Agent
-from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset, StreamableHTTPConnectionParams
 from google.genai import types
 from dotenv import load_dotenv
 
 from prompts.procedure_agent_prompt import PROCEDURE_AGENT_PROMPT
+from sub_agents.shared_toolset import mcp_tools_for
 
 load_dotenv()
 
-MCP_SERVER_TOKEN = os.getenv("MCP_SERVER_TOKEN")
-MCP_SERVER_URL = os.getenv("MCP_SERVER_URL")
 MODEL_GEMINI = os.getenv("MODEL_GEMINI")
 
+PROCEDURE_AGENT_TOOLS = ["rag_query", "list_corpora"]
+
 def create_procedure_agent() -> Agent:
     """
     Crea el agente especializado en información sobre trámites.
@@ -23,23 +23,12 @@ def create_procedure_agent() -> Agent:
     Returns:
         Agent: Agente configurado con herramientas MCP para consultas RAG en trámites.
     """
-    headers = {
-        "Authorization": f"Bearer {MCP_SERVER_TOKEN}"
-    }
-
     return Agent(
         name="procedure_info_agent",
         model=MODEL_GEMINI,
         description="Agente especializado en recuperar información sobre trámites gubernamentales usando RAG.",
         instruction=PROCEDURE_AGENT_PROMPT,
-        tools=[
-            MCPToolset(
-                connection_params=StreamableHTTPConnectionParams(
-                    url=f"{MCP_SERVER_URL}/api/mcp",
-                    headers=headers
-                )
-            )
-        ],
+        tools=[mcp_tools_for(PROCEDURE_AGENT_TOOLS)],
         generate_content_config=types.GenerateContentConfig(
             temperature=0.3,
             max_output_tokens=800,
@@ -0,0 +1,130 @@
+"""
+Conexión MCP compartida por los sub-agentes.
+
+Un solo MCPToolset mantiene la sesión con el servidor MCP (una conexión HTTP y un solo
+`initialize`). La lista de herramientas se pide una vez y se cachea; cada sub-agente
+recibe un FilteredMCPToolset que filtra localmente las herramientas que le corresponden.
+
+Como la sesión la usan todos los usuarios finales, se anuncia con `Mcp-Shared-Session` y el
+servidor no guarda en ella estado por usuario como el corpus actual.
+"""
+
+import asyncio
+import os
+import time
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
+from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset, StreamableHTTPConnectionParams
+
+load_dotenv()
+
+MCP_SERVER_TOKEN = os.getenv("MCP_SERVER_TOKEN")
+MCP_SERVER_URL = os.getenv("MCP_SERVER_URL")
+MCP_TOOL_LIST_TTL_SECONDS = float(os.getenv("MCP_TOOL_LIST_TTL_SECONDS", "300"))
+
+
+class SharedMCPTools:
+    """
+    Toolset MCP único con la lista de herramientas cacheada por `ttl_seconds`.
+
+    ADK vuelve a pedir las herramientas en cada turno del modelo; con la caché ese
+    `tools/list` solo viaja al servidor cuando la lista expira. Las herramientas cacheadas
+    comparten el administrador de sesión del toolset, así que sus llamadas reutilizan la
+    misma conexión.
+    """
+
+    def __init__(self, toolset: MCPToolset, ttl_seconds: float = 300):
+        self.toolset = toolset
+        self.ttl_seconds = ttl_seconds
+        self._tools: List[BaseTool] = []
+        self._expires_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+        self.fetches = 0
+        self.cache_hits = 0
+
+    async def get_tools(self) -> List[BaseTool]:
+        if self._tools and time.monotonic() < self._expires_at:
+            self.cache_hits += 1
+            return self._tools
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            if not self._tools or time.monotonic() >= self._expires_at:
+                self._tools = await self.toolset.get_tools()
+                self._expires_at = time.monotonic() + self.ttl_seconds
+                self.fetches += 1
+            else:
+                self.cache_hits += 1
+        return self._tools
+
+    def invalidate(self) -> None:
+        self._expires_at = 0.0
+
+    async def close(self) -> None:
+        self._tools = []
+        await self.toolset.close()
+
+    def stats(self) -> dict:
+        return {
+            "tools": len(self._tools),
+            "ttl_seconds": self.ttl_seconds,
+            "tool_list_fetches": self.fetches,
+            "tool_list_cache_hits": self.cache_hits,
+        }
+
+
+class FilteredMCPToolset(BaseToolset):
+    """
+    Vista de las herramientas compartidas restringida a `tool_names`. No abre conexiones
+    propias y su `close()` no cierra la sesión compartida, que se libera con
+    `close_shared_tools()` al apagar la aplicación.
+    """
+
+    def __init__(self, shared: SharedMCPTools, tool_names: Optional[List[str]] = None):
+        super().__init__(tool_filter=tool_names)
+        self.shared = shared
+
+    async def get_tools(self, readonly_context: Optional[ReadonlyContext] = None) -> List[BaseTool]:
+        tools = await self.shared.get_tools()
+        return [tool for tool in tools if self._is_tool_selected(tool, readonly_context)]
+
+    async def close(self) -> None:
+        pass
+
+
+shared_tools = SharedMCPTools(
+    MCPToolset(
+        connection_params=StreamableHTTPConnectionParams(
+            url=f"{MCP_SERVER_URL}/api/mcp",
+            headers={
+                "Authorization": f"Bearer {MCP_SERVER_TOKEN}",
+                "Mcp-Shared-Session": "true",
+            },
+        )
+    ),
+    ttl_seconds=MCP_TOOL_LIST_TTL_SECONDS,
+)
+
+
+def mcp_tools_for(tool_names: Optional[List[str]] = None) -> FilteredMCPToolset:
+    """
+    Devuelve el toolset de un sub-agente sobre la conexión MCP compartida.
+
+    Args:
+        tool_names (List[str], opcional): Herramientas que puede usar el agente; None para todas
+
+    Returns:
+        FilteredMCPToolset: Toolset filtrado que reutiliza la sesión y la lista de herramientas
+    """
+    return FilteredMCPToolset(shared_tools, tool_names)
+
+
+async def close_shared_tools() -> None:
+    await shared_tools.close()
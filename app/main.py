@@ -1,5 +1,16 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from routes.agent_routes import router as agent_router
+from routes.agent_routes import router as agent_router, create_runner
+from services.answer_cache import corpus_version_client
+from sub_agents.shared_toolset import close_shared_tools
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.agent_runner = create_runner()
+    yield
+    await close_shared_tools()
+    await corpus_version_client.close()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.include_router(agent_router)
\ No newline at end of file
@@ -0,0 +1,51 @@
+"""
+Selección del backend de recuperación mediante la variable de entorno RAG_BACKEND.
+
+- "vertex" (por defecto): Vertex AI RAG Engine.
+- "local": almacén vectorial en memoria con NumPy, para pruebas de carga y equipos sin acceso a la nube.
+"""
+
+import logging
+import os
+import threading
+from typing import Optional
+
+from backends.base import RagBackend
+from backends.instrumented import InstrumentedRagBackend
+
+logger = logging.getLogger(__name__)
+
+RAG_BACKEND = os.getenv("RAG_BACKEND", "vertex")
+
+_backend: Optional[RagBackend] = None
+_lock = threading.Lock()
+
+
+def create_backend(kind: str) -> RagBackend:
+    """
+    Construye el backend indicado. Las dependencias de cada implementación se importan
+    solo cuando se selecciona.
+    """
+    if kind == "vertex":
+        from backends.vertex import VertexRagBackend
+        return VertexRagBackend()
+
+    if kind == "local":
+        from backends.local import LocalRagBackend
+        return LocalRagBackend.from_env()
+
+    raise ValueError(f"Backend RAG no soportado: '{kind}'. Usa 'vertex' o 'local'.")
+
+
+def get_backend() -> RagBackend:
+    """
+    Devuelve el backend del proceso, creándolo en el primer uso. Se entrega envuelto en
+    InstrumentedRagBackend para que cada llamada saliente quede registrada en /metrics.
+    """
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                _backend = InstrumentedRagBackend(create_backend(RAG_BACKEND))
+                logger.info(f"Backend RAG seleccionado: {_backend.name}")
+    return _backend
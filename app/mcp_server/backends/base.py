@@ -0,0 +1,132 @@
+"""
+Interfaz común de los backends de recuperación usados por las herramientas RAG.
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+# Extensiones cuyo contenido se puede leer como texto plano sin un parser de documentos
+TEXT_EXTENSIONS = (".txt", ".md", ".markdown", ".html", ".htm", ".csv", ".json")
+
+
+class SourceObject:
+    """
+    Objeto de origen (por ejemplo, un blob de GCS) candidato a importarse en un corpus.
+
+    `generation` cambia cada vez que el objeto se reescribe y `checksum` identifica su
+    contenido, de modo que una reescritura con el mismo contenido no obliga a reimportar.
+    """
+
+    def __init__(
+        self,
+        source_uri: str,
+        generation: str,
+        checksum: str,
+        size: int = 0,
+        updated: Optional[datetime] = None,
+    ):
+        self.source_uri = source_uri
+        self.generation = generation
+        self.checksum = checksum
+        self.size = size
+        self.updated = updated
+
+
+class RagBackend(ABC):
+    """
+    Operaciones de corpus, ingesta y recuperación que necesitan las herramientas MCP.
+
+    Los objetos devueltos exponen los mismos atributos que los de `vertexai.rag`
+    (`name`, `display_name`, `source_uri`, `imported_rag_files_count`, `text`, `score`, ...),
+    por lo que las herramientas no dependen de la implementación seleccionada.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def create_corpus(self, display_name: str, embedding_model: str) -> Any:
+        """Crea un corpus y devuelve el objeto corpus con `name` y `display_name`."""
+
+    @abstractmethod
+    def list_corpora(self) -> List[Any]:
+        """Lista los corpus disponibles."""
+
+    @abstractmethod
+    def delete_corpus(self, corpus_name: str) -> None:
+        """Elimina un corpus por su nombre completo de recurso."""
+
+    @abstractmethod
+    def import_files(
+        self,
+        corpus_name: str,
+        paths: List[str],
+        chunk_size: int,
+        chunk_overlap: int,
+        max_embedding_requests_per_min: int,
+    ) -> Any:
+        """
+        Importa archivos al corpus. El resultado expone `imported_rag_files_count`,
+        `failed_rag_files_count` y `skipped_rag_files_count`.
+        """
+
+    @abstractmethod
+    def list_files(self, corpus_name: str) -> List[Any]:
+        """Lista los archivos de un corpus."""
+
+    @abstractmethod
+    def list_files_page(
+        self,
+        corpus_name: str,
+        page_size: int,
+        page_token: Optional[str] = None,
+    ) -> Tuple[List[Any], Optional[str]]:
+        """
+        Lista una página de archivos del corpus. Devuelve los archivos y el token de la
+        página siguiente, o None si ya no hay más.
+        """
+
+    def count_files(self, corpus_name: str) -> int:
+        """
+        Cuenta los archivos del corpus recorriendo sus páginas sin construir la lista completa.
+        Los backends que conocen el total de antemano pueden sobrescribirlo.
+        """
+        total = 0
+        page_token = None
+        while True:
+            files, page_token = self.list_files_page(corpus_name, page_size=1000, page_token=page_token)
+            total += len(files)
+            if not page_token:
+                return total
+
+    @abstractmethod
+    def delete_file(self, file_name: str) -> None:
+        """Elimina un archivo por su nombre completo `.../ragFiles/{id}`."""
+
+    @abstractmethod
+    def list_source_objects(self, uri: str) -> List[SourceObject]:
+        """
+        Lista los objetos de origen bajo una ruta (archivo o carpeta) con su generación
+        y checksum, sin descargarlos cuando el almacenamiento ya los reporta.
+        """
+
+    @abstractmethod
+    def read_source_texts(self, uri: str) -> List[Tuple[str, str]]:
+        """
+        Lee el texto de los objetos de origen bajo una ruta como pares (source_uri, texto).
+        Si la ruta es un objeto, se lee solo ese objeto. Solo incluye los objetos con extensión
+        de texto (TEXT_EXTENSIONS) que se decodifican como UTF-8; los binarios como PDF se omiten.
+        """
+
+    @abstractmethod
+    def retrieval_query(
+        self,
+        corpus_name: str,
+        text: str,
+        top_k: int,
+        distance_threshold: float,
+    ) -> List[Any]:
+        """
+        Recupera los contextos más relevantes del corpus, ordenados de más a menos relevante.
+        Cada contexto expone `source_uri`, `source_display_name`, `text` y `score`.
+        """
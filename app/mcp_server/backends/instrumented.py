@@ -0,0 +1,78 @@
+"""
+Envoltura de un RagBackend que mide cada llamada saliente al servicio de recuperación.
+"""
+
+import functools
+import time
+from typing import Any, Callable, Dict
+
+from backends.base import RagBackend
+from metrics import registry
+
+BACKEND_OPERATIONS = frozenset(
+    name for name, value in vars(RagBackend).items()
+    if callable(value) and not name.startswith("_")
+)
+
+backend_calls = registry.counter(
+    "rag_backend_calls_total",
+    "Llamadas al backend de recuperación por operación y resultado.",
+    ("backend", "operation", "outcome"),
+)
+backend_duration = registry.histogram(
+    "rag_backend_call_duration_seconds",
+    "Latencia de las llamadas al backend de recuperación.",
+    ("backend", "operation"),
+)
+backend_in_flight = registry.gauge(
+    "rag_backend_calls_in_flight",
+    "Llamadas al backend de recuperación en curso.",
+    ("backend", "operation"),
+)
+
+
+class InstrumentedRagBackend:
+    """
+    Proxy de un RagBackend: las operaciones de la interfaz se cuentan y se cronometran;
+    cualquier otro atributo (por ejemplo `iter_source_files` del backend local) se
+    delega sin cambios.
+    """
+
+    def __init__(self, backend: RagBackend):
+        self._backend = backend
+        self._wrapped: Dict[str, Callable[..., Any]] = {}
+        self.name = backend.name
+
+    @property
+    def wrapped_backend(self) -> RagBackend:
+        return self._backend
+
+    def __getattr__(self, attribute: str) -> Any:
+        value = getattr(self._backend, attribute)
+        if attribute not in BACKEND_OPERATIONS:
+            return value
+
+        wrapped = self._wrapped.get(attribute)
+        if wrapped is None:
+            wrapped = self._instrument(attribute, value)
+            self._wrapped[attribute] = wrapped
+        return wrapped
+
+    def _instrument(self, operation: str, method: Callable[..., Any]) -> Callable[..., Any]:
+        labels = {"backend": self.name, "operation": operation}
+
+        @functools.wraps(method)
+        def call(*args, **kwargs):
+            backend_in_flight.inc(**labels)
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = method(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                backend_duration.observe(time.perf_counter() - started, **labels)
+                backend_calls.inc(outcome=outcome, **labels)
+                backend_in_flight.dec(**labels)
+
+        return call
@@ -0,0 +1,347 @@
+"""
+Backend de recuperación en proceso: corpus en memoria, chunking local, embeddings
+deterministas por hashing y búsqueda por similitud coseno con NumPy.
+
+Permite medir el overhead propio del servidor MCP sin depender de la nube y ejecutarlo
+en equipos sin acceso a internet. El estado vive en la memoria del proceso.
+"""
+
+import functools
+import hashlib
+import itertools
+import os
+import re
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backends.base import TEXT_EXTENSIONS, RagBackend, SourceObject
+from tools.chunking import chunk_text
+
+RAG_LOCAL_DATA_DIR = os.getenv("RAG_LOCAL_DATA_DIR", "./data")
+RAG_LOCAL_EMBEDDING_DIM = int(os.getenv("RAG_LOCAL_EMBEDDING_DIM", "512"))
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.casefold())
+
+
+@functools.lru_cache(maxsize=65536)
+def _hash_feature(feature: str, dim: int) -> Tuple[int, float]:
+    value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+    return value % dim, (1.0 if value >> 63 else -1.0)
+
+
+class HashingEmbedder:
+    """
+    Embedder determinista: cada token y cada bigrama se proyecta a una dimensión con
+    blake2b (con signo, para reducir el sesgo de colisiones) y el vector se normaliza.
+    El mismo texto produce el mismo vector en cualquier proceso o máquina.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        tokens = tokenize(text)
+        features = itertools.chain(tokens, (f"{a} {b}" for a, b in zip(tokens, tokens[1:])))
+        for feature in features:
+            index, sign = _hash_feature(feature, self.dim)
+            vector[index] += sign
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    def embed_many(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.vstack([self.embed(text) for text in texts])
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class LocalRagFile:
+    def __init__(self, name: str, source_uri: str, checksum: str, chunks: List[str], embeddings: np.ndarray):
+        self.name = name
+        self.display_name = source_uri.rstrip("/").split("/")[-1]
+        self.source_uri = source_uri
+        self.checksum = checksum
+        self.chunks = chunks
+        self.embeddings = embeddings
+        self.create_time = _now()
+        self.update_time = self.create_time
+
+
+class LocalCorpus:
+    def __init__(self, name: str, display_name: str):
+        self.name = name
+        self.display_name = display_name
+        self.create_time = _now()
+        self.update_time = self.create_time
+        self.files: Dict[str, LocalRagFile] = {}
+
+        self._matrix: Optional[np.ndarray] = None
+        self._chunk_refs: List[Tuple[LocalRagFile, str]] = []
+
+    def touch(self) -> None:
+        self.update_time = _now()
+        self._matrix = None
+
+    def matrix(self) -> Tuple[np.ndarray, List[Tuple[LocalRagFile, str]]]:
+        """
+        Devuelve la matriz de embeddings de todos los fragmentos, reconstruyéndola solo
+        cuando el contenido del corpus cambió.
+        """
+        if self._matrix is None:
+            refs = []
+            blocks = []
+            for rag_file in self.files.values():
+                refs.extend((rag_file, chunk) for chunk in rag_file.chunks)
+                blocks.append(rag_file.embeddings)
+            self._matrix = np.vstack(blocks) if blocks else np.zeros((0, 0), dtype=np.float32)
+            self._chunk_refs = refs
+        return self._matrix, self._chunk_refs
+
+
+class LocalImportResult:
+    def __init__(self):
+        self.imported_rag_files_count = 0
+        self.failed_rag_files_count = 0
+        self.skipped_rag_files_count = 0
+
+
+class LocalContext:
+    def __init__(self, source_uri: str, source_display_name: str, text: str, score: float):
+        self.source_uri = source_uri
+        self.source_display_name = source_display_name
+        self.text = text
+        self.score = score
+
+
+class LocalRagBackend(RagBackend):
+    """
+    Implementación en memoria de RagBackend.
+
+    Las rutas `gs://bucket/ruta` se leen desde `data_dir/bucket/ruta`; también se aceptan
+    rutas `file://` y rutas locales. Solo se importan archivos de texto. El `score` de cada
+    contexto es la distancia coseno (menor es más relevante), igual que en Vertex AI.
+    """
+
+    name = "local"
+
+    def __init__(self, data_dir: str = "./data", embedding_dim: int = 512):
+        self.data_dir = data_dir
+        self.embedder = HashingEmbedder(embedding_dim)
+        self._corpora: Dict[str, LocalCorpus] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_env(cls) -> "LocalRagBackend":
+        return cls(data_dir=RAG_LOCAL_DATA_DIR, embedding_dim=RAG_LOCAL_EMBEDDING_DIM)
+
+    def resolve_path(self, uri: str) -> str:
+        if uri.startswith("gs://"):
+            return os.path.join(self.data_dir, uri[len("gs://"):])
+        if uri.startswith("file://"):
+            return uri[len("file://"):]
+        return uri
+
+    def iter_source_files(self, uri: str) -> List[Tuple[str, str]]:
+        """
+        Expande una ruta (archivo o carpeta) en pares (source_uri, ruta local).
+        """
+        local_path = self.resolve_path(uri)
+        if os.path.isfile(local_path):
+            return [(uri, local_path)]
+
+        sources = []
+        for root, _, file_names in os.walk(local_path):
+            for file_name in sorted(file_names):
+                path = os.path.join(root, file_name)
+                relative = os.path.relpath(path, local_path).replace(os.sep, "/")
+                sources.append((f"{uri.rstrip('/')}/{relative}", path))
+        return sorted(sources)
+
+    def _get_corpus(self, corpus_name: str) -> LocalCorpus:
+        corpus = self._corpora.get(corpus_name)
+        if corpus is None:
+            raise ValueError(f"El corpus '{corpus_name}' no existe")
+        return corpus
+
+    def create_corpus(self, display_name: str, embedding_model: str) -> LocalCorpus:
+        with self._lock:
+            name = f"projects/local/locations/local/ragCorpora/{next(self._ids)}"
+            corpus = LocalCorpus(name=name, display_name=display_name)
+            self._corpora[name] = corpus
+            return corpus
+
+    def list_corpora(self) -> List[LocalCorpus]:
+        with self._lock:
+            return list(self._corpora.values())
+
+    def delete_corpus(self, corpus_name: str) -> None:
+        with self._lock:
+            self._get_corpus(corpus_name)
+            del self._corpora[corpus_name]
+
+    def import_files(
+        self,
+        corpus_name: str,
+        paths: List[str],
+        chunk_size: int,
+        chunk_overlap: int,
+        max_embedding_requests_per_min: int,
+    ) -> LocalImportResult:
+        result = LocalImportResult()
+        with self._lock:
+            self._get_corpus(corpus_name)
+
+        for path in paths:
+            for source_uri, local_path in self.iter_source_files(path):
+                if not local_path.lower().endswith(TEXT_EXTENSIONS):
+                    result.failed_rag_files_count += 1
+                    continue
+                try:
+                    with open(local_path, "rb") as source:
+                        content = source.read()
+                    text = content.decode("utf-8")
+                except (OSError, UnicodeDecodeError):
+                    result.failed_rag_files_count += 1
+                    continue
+
+                checksum = hashlib.sha256(content).hexdigest()
+                with self._lock:
+                    corpus = self._get_corpus(corpus_name)
+                    existing = next(
+                        (f for f in corpus.files.values() if f.source_uri == source_uri),
+                        None,
+                    )
+                if existing is not None and existing.checksum == checksum:
+                    result.skipped_rag_files_count += 1
+                    continue
+
+                chunks = chunk_text(text, chunk_size, chunk_overlap)
+                embeddings = self.embedder.embed_many(chunks)
+
+                with self._lock:
+                    corpus = self._get_corpus(corpus_name)
+                    if existing is not None:
+                        corpus.files.pop(existing.name.split("/")[-1], None)
+                    file_id = uuid.uuid4().hex
+                    corpus.files[file_id] = LocalRagFile(
+                        name=f"{corpus_name}/ragFiles/{file_id}",
+                        source_uri=source_uri,
+                        checksum=checksum,
+                        chunks=chunks,
+                        embeddings=embeddings,
+                    )
+                    corpus.touch()
+                result.imported_rag_files_count += 1
+
+        return result
+
+    def list_files(self, corpus_name: str) -> List[LocalRagFile]:
+        with self._lock:
+            return list(self._get_corpus(corpus_name).files.values())
+
+    def list_files_page(
+        self,
+        corpus_name: str,
+        page_size: int,
+        page_token: Optional[str] = None,
+    ) -> Tuple[List[LocalRagFile], Optional[str]]:
+        try:
+            offset = int(page_token) if page_token else 0
+        except ValueError:
+            raise ValueError(f"page_token inválido: '{page_token}'")
+
+        with self._lock:
+            files = self._get_corpus(corpus_name).files
+            page = list(itertools.islice(files.values(), offset, offset + page_size))
+            has_more = offset + page_size < len(files)
+        return page, (str(offset + page_size) if has_more else None)
+
+    def count_files(self, corpus_name: str) -> int:
+        with self._lock:
+            return len(self._get_corpus(corpus_name).files)
+
+    def delete_file(self, file_name: str) -> None:
+        corpus_name, _, file_id = file_name.partition("/ragFiles/")
+        with self._lock:
+            corpus = self._get_corpus(corpus_name)
+            if corpus.files.pop(file_id, None) is None:
+                raise ValueError(f"El archivo '{file_name}' no existe")
+            corpus.touch()
+
+    def list_source_objects(self, uri: str) -> List[SourceObject]:
+        objects = []
+        for source_uri, local_path in self.iter_source_files(uri):
+            stat = os.stat(local_path)
+            with open(local_path, "rb") as source:
+                checksum = hashlib.md5(source.read()).hexdigest()
+            objects.append(SourceObject(
+                source_uri=source_uri,
+                generation=str(stat.st_mtime_ns),
+                checksum=checksum,
+                size=stat.st_size,
+                updated=datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+            ))
+        return objects
+
+    def read_source_texts(self, uri: str) -> List[Tuple[str, str]]:
+        texts = []
+        for source_uri, local_path in self.iter_source_files(uri):
+            if not local_path.lower().endswith(TEXT_EXTENSIONS):
+                continue
+            try:
+                with open(local_path, "rb") as source:
+                    texts.append((source_uri, source.read().decode("utf-8")))
+            except (OSError, UnicodeDecodeError):
+                continue
+        return texts
+
+    def retrieval_query(
+        self,
+        corpus_name: str,
+        text: str,
+        top_k: int,
+        distance_threshold: float,
+    ) -> List[LocalContext]:
+        if top_k <= 0:
+            return []
+
+        query_vector = self.embedder.embed(text)
+
+        with self._lock:
+            matrix, refs = self._get_corpus(corpus_name).matrix()
+
+        if not refs:
+            return []
+
+        distances = 1.0 - matrix @ query_vector
+        candidates = np.flatnonzero(distances <= distance_threshold)
+        if candidates.size > top_k:
+            nearest = np.argpartition(distances[candidates], top_k - 1)[:top_k]
+            candidates = candidates[nearest]
+        candidates = candidates[np.argsort(distances[candidates], kind="stable")]
+
+        return [
+            LocalContext(
+                source_uri=refs[i][0].source_uri,
+                source_display_name=refs[i][0].display_name,
+                text=refs[i][1],
+                score=float(distances[i]),
+            )
+            for i in candidates
+        ]
@@ -0,0 +1,165 @@
+"""
+Backend de recuperación respaldado por Vertex AI RAG Engine.
+"""
+
+from typing import Any, List, Optional, Tuple
+
+from vertexai import rag
+
+from backends.base import TEXT_EXTENSIONS, RagBackend, SourceObject
+
+
+class VertexRagFile:
+    """
+    Vista de un RagFile de la API que agrega `source_uri`: `vertexai.rag` entrega el
+    mensaje de la API, donde el origen está en `gcs_source.uris`.
+    """
+
+    def __init__(self, rag_file: Any):
+        self.name = rag_file.name
+        self.display_name = rag_file.display_name
+        self.description = getattr(rag_file, "description", "")
+        uris = list(getattr(getattr(rag_file, "gcs_source", None), "uris", None) or [])
+        self.source_uri = uris[0] if uris else ""
+        self.create_time = getattr(rag_file, "create_time", None)
+        self.update_time = getattr(rag_file, "update_time", None)
+
+
+def split_gcs_uri(uri: str) -> Tuple[str, str]:
+    bucket, _, prefix = uri[len("gs://"):].partition("/")
+    return bucket, prefix
+
+
+class VertexRagBackend(RagBackend):
+    """
+    Delegación directa a `vertexai.rag`.
+    """
+
+    name = "vertex"
+
+    def __init__(self):
+        self._storage_client = None
+
+    def create_corpus(self, display_name: str, embedding_model: str) -> Any:
+        embedding_model_config = rag.RagEmbeddingModelConfig(
+            vertex_prediction_endpoint=rag.VertexPredictionEndpoint(
+                publisher_model=embedding_model
+            )
+        )
+
+        return rag.create_corpus(
+            display_name=display_name,
+            backend_config=rag.RagVectorDbConfig(
+                rag_embedding_model_config=embedding_model_config
+            ),
+        )
+
+    def list_corpora(self) -> List[Any]:
+        return list(rag.list_corpora())
+
+    def delete_corpus(self, corpus_name: str) -> None:
+        rag.delete_corpus(corpus_name)
+
+    def import_files(
+        self,
+        corpus_name: str,
+        paths: List[str],
+        chunk_size: int,
+        chunk_overlap: int,
+        max_embedding_requests_per_min: int,
+    ) -> Any:
+        transformation_config = rag.TransformationConfig(
+            chunking_config=rag.ChunkingConfig(
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+            ),
+        )
+
+        return rag.import_files(
+            corpus_name,
+            paths,
+            transformation_config=transformation_config,
+            max_embedding_requests_per_min=max_embedding_requests_per_min,
+        )
+
+    def list_files(self, corpus_name: str) -> List[Any]:
+        return [VertexRagFile(rag_file) for rag_file in rag.list_files(corpus_name)]
+
+    def list_files_page(
+        self,
+        corpus_name: str,
+        page_size: int,
+        page_token: Optional[str] = None,
+    ) -> Tuple[List[Any], Optional[str]]:
+        # Solo se lee la primera respuesta del pager: iterarlo pediría las páginas siguientes
+        pager = rag.list_files(corpus_name, page_size=page_size, page_token=page_token)
+        return [VertexRagFile(rag_file) for rag_file in pager.rag_files], (pager.next_page_token or None)
+
+    def delete_file(self, file_name: str) -> None:
+        rag.delete_file(file_name)
+
+    def _storage(self):
+        if self._storage_client is None:
+            from google.cloud import storage
+            self._storage_client = storage.Client()
+        return self._storage_client
+
+    def list_source_objects(self, uri: str) -> List[SourceObject]:
+        if not uri.startswith("gs://"):
+            raise ValueError(f"Solo se admiten rutas gs:// para sincronizar: '{uri}'")
+
+        bucket, prefix = split_gcs_uri(uri)
+        return [
+            SourceObject(
+                source_uri=f"gs://{bucket}/{blob.name}",
+                generation=str(blob.generation),
+                checksum=blob.md5_hash or blob.crc32c or "",
+                size=blob.size or 0,
+                updated=blob.updated,
+            )
+            for blob in self._storage().list_blobs(bucket, prefix=prefix)
+            if not blob.name.endswith("/")
+        ]
+
+    def read_source_texts(self, uri: str) -> List[Tuple[str, str]]:
+        bucket, prefix = split_gcs_uri(uri)
+        # Una ruta a un objeto se lee directamente: listar el prefijo también traería
+        # objetos hermanos como 'acta.txt.bak'
+        blob = self._storage().bucket(bucket).get_blob(prefix) if prefix and not prefix.endswith("/") else None
+        blobs = [blob] if blob is not None else self._storage().list_blobs(bucket, prefix=prefix)
+
+        texts = []
+        for blob in blobs:
+            if not blob.name.lower().endswith(TEXT_EXTENSIONS):
+                continue
+            try:
+                texts.append((f"gs://{bucket}/{blob.name}", blob.download_as_bytes().decode("utf-8")))
+            except UnicodeDecodeError:
+                continue
+        return texts
+
+    def retrieval_query(
+        self,
+        corpus_name: str,
+        text: str,
+        top_k: int,
+        distance_threshold: float,
+    ) -> List[Any]:
+        rag_retrieval_config = rag.RagRetrievalConfig(
+            top_k=top_k,
+            filter=rag.Filter(vector_distance_threshold=distance_threshold),
+        )
+
+        response = rag.retrieval_query(
+            rag_resources=[
+                rag.RagResource(
+                    rag_corpus=corpus_name,
+                )
+            ],
+            text=text,
+            rag_retrieval_config=rag_retrieval_config,
+        )
+
+        if hasattr(response, "contexts") and response.contexts:
+            return list(response.contexts.contexts)
+        return []
@@ -2,21 +2,39 @@
 Servidor MCP con FastAPI que expone herramientas RAG a través de Model Context Protocol.
 """
 import os
+import sys
+import time
+import asyncio
+import uuid
 import logging
-from typing import Optional, Dict, Any
-from contextlib import asynccontextmanager
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Tuple, Union
+from contextlib import asynccontextmanager, contextmanager
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, Depends, status
-from fastapi.responses import JSONResponse
+from fastapi import Body, FastAPI, HTTPException, Depends, Request, Response, status
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import PlainTextResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 
 from mcp import types as mcp_types
-from google.adk.tools import ToolContext
 import uvicorn
 
 from tools import TOOLS_MAP
+from tools.catalog import ToolCatalog
+from tools.utils import corpus_registry, corpus_versions
+from tools.cache import file_count_cache, retrieval_cache
+from tools.jobs import import_jobs
+from tools.lexical import lexical_index
+from tools.singleflight import singleflight
+from tool_executor import ToolExecutor
+from backends import RAG_BACKEND
+from metrics import registry as metrics_registry
+from serialization import CompactJSONResponse, dumps
+
+if TYPE_CHECKING:
+    from google.adk.tools import ToolContext
 
 load_dotenv()
 
@@ -27,6 +45,15 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 MCP_SERVER_TOKEN = os.getenv("MCP_SERVER_TOKEN")
+MCP_CONTEXT_MAX_SESSIONS = int(os.getenv("MCP_CONTEXT_MAX_SESSIONS", "1000"))
+MCP_CONTEXT_TTL_SECONDS = float(os.getenv("MCP_CONTEXT_TTL_SECONDS", "1800"))
+MCP_TOOL_RESULT_FORMAT = os.getenv("MCP_TOOL_RESULT_FORMAT", "json")
+MCP_OMIT_REDUNDANT_MESSAGES = os.getenv("MCP_OMIT_REDUNDANT_MESSAGES", "false").lower() == "true"
+MCP_GZIP_MIN_SIZE = int(os.getenv("MCP_GZIP_MIN_SIZE", "1024"))
+MCP_PRELOAD_TOOLS = os.getenv("MCP_PRELOAD_TOOLS", "false").lower() == "true"
+
+MCP_SESSION_HEADER = "Mcp-Session-Id"
+MCP_SHARED_SESSION_HEADER = "Mcp-Shared-Session"
 
 security = HTTPBearer()
 
@@ -61,74 +88,359 @@ async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(secur
         )
     return token
 
-class ToolContextManager:
+class SimpleToolContext:
+    """Contexto mínimo compatible con ToolContext: solo expone `state`."""
+
     def __init__(self):
-        self._contexts: Dict[str, ToolContext] = {}
-    
-    def get_or_create(self, request_id: str = "default") -> ToolContext:
-        if request_id not in self._contexts:
-            try:
-                self._contexts[request_id] = ToolContext()
-            except TypeError:
-                class SimpleContext:
-                    def __init__(self):
-                        self.state = {}
-                self._contexts[request_id] = SimpleContext()
-        
-        context = self._contexts[request_id]
-        if not hasattr(context, 'state'):
-            context.state = {}
-        
+        self.state = {}
+
+class ToolContextManager:
+    """
+    Almacén de ToolContext por sesión MCP, acotado en tamaño y con expiración por inactividad.
+
+    Los contextos se indexan por el encabezado Mcp-Session-Id asignado en `initialize`.
+    Las entradas se mantienen ordenadas por último acceso: las que superan el TTL se
+    eliminan desde el inicio y, si se alcanza `max_size`, se descarta la menos usada.
+    Las llamadas sin sesión reciben un contexto efímero que no se almacena.
+    """
+
+    def __init__(self, max_size: int = 1000, ttl_seconds: float = 1800):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._contexts: "OrderedDict[str, Tuple[ToolContext, float]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.ephemeral = 0
+        self.evicted_expired = 0
+        self.evicted_lru = 0
+        self.closed = 0
+
+    def _new_context(self) -> "ToolContext":
+        # ToolContext de ADK exige un invocation_context que el servidor no tiene; a las
+        # herramientas les basta un objeto con `state`, y así ADK no se importa al arrancar
+        return SimpleToolContext()
+
+    def _evict_expired(self, now: float) -> None:
+        while self._contexts:
+            session_id, (_, last_access) = next(iter(self._contexts.items()))
+            if now - last_access < self.ttl_seconds:
+                break
+            del self._contexts[session_id]
+            self.evicted_expired += 1
+
+    def get_or_create(self, session_id: Optional[str] = None) -> "ToolContext":
+        if not session_id:
+            self.ephemeral += 1
+            return self._new_context()
+
+        now = time.monotonic()
+        self._evict_expired(now)
+
+        entry = self._contexts.get(session_id)
+        if entry is not None:
+            self.hits += 1
+            context = entry[0]
+            self._contexts.move_to_end(session_id)
+        else:
+            self.misses += 1
+            context = self._new_context()
+            while len(self._contexts) >= self.max_size:
+                self._contexts.popitem(last=False)
+                self.evicted_lru += 1
+
+        self._contexts[session_id] = (context, now)
         return context
 
-context_manager = ToolContextManager()
+    def discard(self, session_id: str) -> bool:
+        if self._contexts.pop(session_id, None) is None:
+            return False
+        self.closed += 1
+        return True
+
+    def stats(self) -> dict:
+        self._evict_expired(time.monotonic())
+        return {
+            "size": len(self._contexts),
+            "max_size": self.max_size,
+            "occupancy": (len(self._contexts) / self.max_size) if self.max_size else 0.0,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "ephemeral": self.ephemeral,
+            "evicted_expired": self.evicted_expired,
+            "evicted_lru": self.evicted_lru,
+            "closed": self.closed,
+        }
+
+context_manager = ToolContextManager(
+    max_size=MCP_CONTEXT_MAX_SESSIONS,
+    ttl_seconds=MCP_CONTEXT_TTL_SECONDS,
+)
+
+tool_executor = ToolExecutor.from_env()
+
+MCP_METHODS = {"initialize", "tools/list", "tools/call", "notifications/initialized"}
+
+mcp_requests = metrics_registry.counter(
+    "mcp_requests_total",
+    "Peticiones JSON-RPC atendidas por método y código HTTP.",
+    ("method", "status"),
+)
+mcp_request_duration = metrics_registry.histogram(
+    "mcp_request_duration_seconds",
+    "Latencia de las peticiones JSON-RPC por método.",
+    ("method",),
+)
+mcp_requests_in_flight = metrics_registry.gauge(
+    "mcp_requests_in_flight",
+    "Peticiones JSON-RPC en curso por método.",
+    ("method",),
+)
+tool_calls = metrics_registry.counter(
+    "mcp_tool_calls_total",
+    "Llamadas a herramientas por resultado: ok, error (status de la herramienta) o exception.",
+    ("tool", "outcome"),
+)
+tool_duration = metrics_registry.histogram(
+    "mcp_tool_duration_seconds",
+    "Latencia de las herramientas, incluida la espera en el executor.",
+    ("tool",),
+)
+tool_calls_in_flight = metrics_registry.gauge(
+    "mcp_tool_calls_in_flight",
+    "Llamadas a herramientas en curso, incluidas las que esperan turno en el executor.",
+    ("tool",),
+)
+
+
+def collect_server_metrics():
+    """
+    Traduce a métricas el estado que ya calculan el executor y las cachés del servidor.
+    """
+    executor = tool_executor.stats()
+    yield "mcp_executor_queue_depth", "gauge", "Llamadas esperando límite de herramienta o worker libre.", [
+        ({}, executor["queue_depth"]),
+    ]
+    yield "mcp_executor_tool_waiting", "gauge", "Llamadas detenidas por el límite de concurrencia de su herramienta.", [
+        ({"tool": name}, tool["waiting"]) for name, tool in executor["tools"].items()
+    ]
+    yield "mcp_executor_tool_running", "gauge", "Llamadas enviadas al pool del executor.", [
+        ({"tool": name}, tool["running"]) for name, tool in executor["tools"].items()
+    ]
+
+    caches = {
+        "corpus_registry": corpus_registry.stats(),
+        "retrieval": retrieval_cache.stats(),
+        "tool_contexts": context_manager.stats(),
+    }
+    yield "mcp_cache_hits_total", "counter", "Aciertos de las cachés del servidor.", [
+        ({"cache": name}, cache["hits"]) for name, cache in caches.items()
+    ]
+    yield "mcp_cache_misses_total", "counter", "Fallos de las cachés del servidor.", [
+        ({"cache": name}, cache["misses"]) for name, cache in caches.items()
+    ]
+    yield "mcp_cache_entries", "gauge", "Entradas almacenadas en las cachés del servidor.", [
+        ({"cache": "corpus_registry"}, caches["corpus_registry"]["corpora"]),
+        ({"cache": "retrieval"}, caches["retrieval"]["size"]),
+        ({"cache": "tool_contexts"}, caches["tool_contexts"]["size"]),
+    ]
+
+    flights = singleflight.stats()["operations"]
+    yield "rag_singleflight_upstream_calls_total", "counter", "Llamadas al backend hechas por un líder de singleflight.", [
+        ({"operation": operation}, counts["upstream_calls"]) for operation, counts in flights.items()
+    ]
+    yield "rag_singleflight_collapsed_calls_total", "counter", "Llamadas que esperaron el resultado de otra idéntica en vuelo.", [
+        ({"operation": operation}, counts["collapsed_calls"]) for operation, counts in flights.items()
+    ]
+
+    jobs = import_jobs.stats()
+    yield "mcp_import_jobs", "gauge", "Trabajos de importación conservados por estado.", [
+        ({"status": job_status}, count) for job_status, count in jobs["by_status"].items()
+    ]
+    yield "rag_embedding_quota_leased_per_min", "gauge", "Solicitudes de embedding por minuto prestadas a lotes en curso.", [
+        ({}, jobs["embedding_quota"]["leased_per_min"]),
+    ]
+    yield "rag_embedding_quota_active_jobs", "gauge", "Trabajos de importación que comparten la cuota de embeddings.", [
+        ({}, jobs["embedding_quota"]["active_jobs"]),
+    ]
+
+
+metrics_registry.register_collector(collect_server_metrics)
+
+tool_catalog = ToolCatalog()
+
+startup_report: Dict[str, Any] = {}
+
+def get_tool_catalog() -> ToolCatalog:
+    if not tool_catalog.result_json:
+        tool_catalog.build()
+    return tool_catalog
+
+def build_startup_report() -> Dict[str, Any]:
+    """
+    Resume en qué se fue el tiempo de arranque: el lifespan completo, la construcción del
+    catálogo, la precarga opcional de herramientas y qué SDK pesados ya están cargados.
+    Para el costo de los imports usa `python -X importtime mcp_server.py`.
+    """
+    return {
+        **startup_report,
+        "tool_import_seconds": TOOLS_MAP.import_times(),
+        "sdk_loaded": {
+            module: module in sys.modules
+            for module in ("google.adk", "vertexai", "numpy")
+        },
+    }
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    lifespan_started = time.perf_counter()
+    if RAG_BACKEND == "local" and tool_executor.kind == "process":
+        logger.warning(
+            "El backend RAG local guarda su estado en memoria: con MCP_TOOL_EXECUTOR=process "
+            "cada proceso worker tendrá su propio almacén"
+        )
+
+    started = time.perf_counter()
+    tool_catalog.build()
+    startup_report["tool_catalog_seconds"] = round(time.perf_counter() - started, 4)
+
+    if MCP_PRELOAD_TOOLS:
+        started = time.perf_counter()
+        TOOLS_MAP.preload()
+        startup_report["tool_preload_seconds"] = round(time.perf_counter() - started, 4)
+
+    tool_executor.start()
+    startup_report["lifespan_seconds"] = round(time.perf_counter() - lifespan_started, 4)
+    logger.info(f"Reporte de arranque: {build_startup_report()}")
     yield
+    tool_executor.shutdown()
+    import_jobs.shutdown()
+    logger.info(f"Estadísticas del registro de corpus: {corpus_registry.stats()}")
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=CompactJSONResponse)
 
-async def list_mcp_tools() -> list[mcp_types.Tool]:
-    """Expone al agente la lista de tools disponibles con schema y descripción"""
-    return [
-        mcp_types.Tool(
-            name=name,
-            description=module.DESCRIPTION,
-            inputSchema=module.SCHEMA
-        )
-        for name, module in TOOLS_MAP.items()
-    ]
+if MCP_GZIP_MIN_SIZE > 0:
+    app.add_middleware(GZipMiddleware, minimum_size=MCP_GZIP_MIN_SIZE)
+
+def format_tool_result(tool_module: Any, result: Any) -> str:
+    """
+    Serializa el resultado de una herramienta para el contenido de texto MCP.
+
+    Por defecto se entrega JSON minificado; MCP_TOOL_RESULT_FORMAT=repr conserva el formato
+    anterior. Con MCP_OMIT_REDUNDANT_MESSAGES=true se quita el `message` de las respuestas
+    exitosas de herramientas que lo marcan como REDUNDANT_MESSAGE, porque solo repite en
+    prosa los datos estructurados.
+    """
+    if MCP_TOOL_RESULT_FORMAT == "repr":
+        return str(result)
+
+    if (
+        MCP_OMIT_REDUNDANT_MESSAGES
+        and isinstance(result, dict)
+        and result.get("status") == "success"
+        and getattr(tool_module, "REDUNDANT_MESSAGE", False)
+    ):
+        result = {key: value for key, value in result.items() if key != "message"}
+
+    return dumps(result)
 
 async def call_mcp_tool(
     name: str, 
     arguments: dict, 
-    tool_context: ToolContext
+    tool_context: "ToolContext"
 ) -> list[mcp_types.Content]:
     
     if name not in TOOLS_MAP:
         raise ValueError(f"Herramienta '{name}' no encontrada")
     
+    tool_calls_in_flight.inc(tool=name)
+    started = time.perf_counter()
+    outcome = "exception"
     try:
+        if not TOOLS_MAP.is_loaded(name):
+            # La primera importación de una herramienta carga los SDK y tarda segundos:
+            # se hace en un hilo para no bloquear el event loop
+            await asyncio.get_running_loop().run_in_executor(None, TOOLS_MAP.__getitem__, name)
         tool_module = TOOLS_MAP[name]
-        func = tool_module.run.func
 
-        result = func(**arguments, tool_context=tool_context)
+        result = await tool_executor.run(name, tool_module, arguments, tool_context)
+        outcome = "error" if isinstance(result, dict) and result.get("status") == "error" else "ok"
         
-        return [mcp_types.TextContent(type="text", text=str(result))]
+        return [mcp_types.TextContent(type="text", text=format_tool_result(tool_module, result))]
     
     except Exception as e:
         logger.exception(f"Error ejecutando herramienta {name}: {str(e)}")
         raise
 
-@app.post("/api/mcp")
-async def mcp_entrypoint(
+    finally:
+        tool_duration.observe(time.perf_counter() - started, tool=name)
+        tool_calls.inc(tool=name, outcome=outcome)
+        tool_calls_in_flight.dec(tool=name)
+
+def jsonrpc_error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": {
+            "code": code,
+            "message": message
+        }
+    }
+
+@contextmanager
+def observe_mcp_request(method: str):
+    """
+    Registra latencia, resultado y concurrencia de una petición JSON-RPC. El bloque debe
+    asignar el código HTTP final en `outcome["status"]`.
+    """
+    method_label = method if method in MCP_METHODS else "other"
+    outcome = {"status": 500}
+    mcp_requests_in_flight.inc(method=method_label)
+    started = time.perf_counter()
+    try:
+        yield outcome
+    finally:
+        mcp_request_duration.observe(time.perf_counter() - started, method=method_label)
+        mcp_requests.inc(method=method_label, status=str(outcome["status"]))
+        mcp_requests_in_flight.dec(method=method_label)
+
+def tools_list_response(mcp_request: MCPRequest) -> Response:
+    """
+    Responde un `tools/list` individual con el catálogo ya serializado y su ETag. La
+    revalidación con If-None-Match se hace en `GET /api/mcp/tools`, porque las cachés HTTP
+    no revalidan peticiones POST.
+    """
+    catalog = get_tool_catalog()
+    with observe_mcp_request(mcp_request.method) as outcome:
+        outcome["status"] = 200
+        return Response(
+            content=catalog.response_bytes(mcp_request.id),
+            media_type="application/json",
+            headers={"ETag": catalog.etag},
+        )
+
+async def handle_mcp_request(
     mcp_request: MCPRequest,
-    token: str = Depends(verify_token)
-):
+    session_id: Optional[str],
+    response_headers: Dict[str, str]
+) -> Tuple[int, Dict[str, Any]]:
     """
-    Endpoint MCP que delega al MCP server y sigue el protocolo JSON-RPC 2.0.
+    Procesa una petición JSON-RPC individual.
+
+    Returns:
+        Tuple[int, Dict[str, Any]]: El código HTTP sugerido y el cuerpo JSON-RPC de la respuesta
     """
+    with observe_mcp_request(mcp_request.method) as outcome:
+        status_code, body = await dispatch_mcp_request(mcp_request, session_id, response_headers)
+        outcome["status"] = status_code
+        return status_code, body
+
+async def dispatch_mcp_request(
+    mcp_request: MCPRequest,
+    session_id: Optional[str],
+    response_headers: Dict[str, str]
+) -> Tuple[int, Dict[str, Any]]:
     request_id = mcp_request.id
     method = mcp_request.method
     params = mcp_request.params or {}
@@ -137,6 +449,7 @@ async def mcp_entrypoint(
         result_data = None
 
         if method == "initialize":
+            response_headers[MCP_SESSION_HEADER] = uuid.uuid4().hex
             result_data = {
                 "protocolVersion": "2024-11-05",
                 "capabilities": {"tools": {}},
@@ -148,17 +461,9 @@ async def mcp_entrypoint(
             }
 
         elif method == "tools/list":
-            tools = await list_mcp_tools()
-            result_data = {
-                "tools": [
-                    {
-                        "name": t.name,
-                        "description": t.description,
-                        "inputSchema": t.inputSchema
-                    }
-                    for t in tools
-                ]
-            }
+            catalog = get_tool_catalog()
+            response_headers["ETag"] = catalog.etag
+            result_data = catalog.result
 
         elif method == "tools/call":
             tool_name = params.get("name")
@@ -167,7 +472,7 @@ async def mcp_entrypoint(
             if not tool_name:
                 raise ValueError("El parámetro 'name' es requerido para 'tools/call'")
             
-            tool_context = context_manager.get_or_create(str(request_id))
+            tool_context = context_manager.get_or_create(session_id)
             
             content_list = await call_mcp_tool(tool_name, arguments, tool_context)
             
@@ -182,49 +487,167 @@ async def mcp_entrypoint(
             result_data = None
 
         else:
-            return JSONResponse(
-                status_code=404,
-                content={
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "error": {
-                        "code": -32601,
-                        "message": f"Method not found: {method}"                    }
-                }
-            )
+            return 404, jsonrpc_error(request_id, -32601, f"Method not found: {method}")
 
-        return MCPResponse(
+        return 200, MCPResponse(
             jsonrpc="2.0",
             id=request_id,
             result=result_data
-        )
+        ).dict()
 
     except ValueError as e:
-        return JSONResponse(
-            status_code=400,
-            content={
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "error": {
-                    "code": -32602,
-                    "message": f"Invalid params: {str(e)}"
-                }
-            }
-        )
+        return 400, jsonrpc_error(request_id, -32602, f"Invalid params: {str(e)}")
 
     except Exception as e:
-        return JSONResponse(
-            status_code=500,
-            content={
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "error": {
-                    "code": -32603,
-                    "message": f"Internal error: {str(e)}"
-                }
-            }
+        return 500, jsonrpc_error(request_id, -32603, f"Internal error: {str(e)}")
+
+async def handle_batch_item(
+    item: Any,
+    session_id: Optional[str],
+    response_headers: Dict[str, str]
+) -> Optional[Dict[str, Any]]:
+    """
+    Procesa un elemento de un batch JSON-RPC. Devuelve None para las notificaciones,
+    que según JSON-RPC 2.0 no llevan respuesta.
+    """
+    if not isinstance(item, dict):
+        return jsonrpc_error(None, -32600, "Invalid Request")
+
+    try:
+        mcp_request = MCPRequest.parse_obj(item)
+    except ValidationError as e:
+        return jsonrpc_error(item.get("id"), -32600, f"Invalid Request: {str(e)}")
+
+    _, body = await handle_mcp_request(mcp_request, session_id, response_headers)
+
+    if "id" not in item:
+        return None
+    return body
+
+@app.post("/api/mcp")
+async def mcp_entrypoint(
+    request: Request,
+    payload: Union[Dict[str, Any], List[Any]] = Body(...),
+    token: str = Depends(verify_token)
+):
+    """
+    Endpoint MCP que delega al MCP server y sigue el protocolo JSON-RPC 2.0.
+
+    Acepta una petición individual o un batch (arreglo) de peticiones. Los elementos de un
+    batch se ejecutan de forma concurrente y sus respuestas se devuelven en el mismo orden,
+    cada una con su propio resultado o error.
+
+    Un cliente que comparte su sesión MCP entre varios usuarios finales la marca con
+    `Mcp-Shared-Session: true`; sus llamadas reciben un contexto efímero, de modo que el
+    estado de un usuario (corpus actual, corpus verificados) no se filtra a los demás.
+    """
+    session_id = request.headers.get(MCP_SESSION_HEADER)
+    if request.headers.get(MCP_SHARED_SESSION_HEADER, "").lower() == "true":
+        session_id = None
+    response_headers: Dict[str, str] = {}
+
+    if isinstance(payload, list):
+        if not payload:
+            return CompactJSONResponse(
+                status_code=400,
+                content=jsonrpc_error(None, -32600, "Invalid Request: batch vacío")
+            )
+
+        bodies = await asyncio.gather(*(
+            handle_batch_item(item, session_id, response_headers)
+            for item in payload
+        ))
+        bodies = [body for body in bodies if body is not None]
+
+        if not bodies:
+            return Response(status_code=202, headers=response_headers)
+        return CompactJSONResponse(content=bodies, headers=response_headers)
+
+    try:
+        mcp_request = MCPRequest.parse_obj(payload)
+    except ValidationError as e:
+        return CompactJSONResponse(
+            status_code=400,
+            content=jsonrpc_error(payload.get("id"), -32600, f"Invalid Request: {str(e)}")
         )
 
+    if mcp_request.method == "tools/list":
+        return tools_list_response(mcp_request)
+
+    status_code, body = await handle_mcp_request(mcp_request, session_id, response_headers)
+    return CompactJSONResponse(status_code=status_code, content=body, headers=response_headers)
+
+@app.delete("/api/mcp")
+async def mcp_close_session(
+    request: Request,
+    token: str = Depends(verify_token)
+):
+    """
+    Cierra la sesión MCP indicada en el encabezado Mcp-Session-Id y libera su contexto.
+    """
+    session_id = request.headers.get(MCP_SESSION_HEADER)
+    if not session_id or not context_manager.discard(session_id):
+        return Response(status_code=404)
+    return Response(status_code=204)
+
+@app.get("/api/mcp/tools")
+async def mcp_tool_catalog(
+    request: Request,
+    token: str = Depends(verify_token)
+):
+    """
+    Catálogo de herramientas (el resultado de `tools/list`) para clientes que lo cachean:
+    lleva ETag y responde 304 sin cuerpo si If-None-Match coincide.
+    """
+    catalog = get_tool_catalog()
+    headers = {"ETag": catalog.etag}
+    if request.headers.get("if-none-match") == catalog.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=catalog.result_json, media_type="application/json", headers=headers)
+
+@app.get("/api/mcp/stats")
+async def mcp_stats(token: str = Depends(verify_token)):
+    """
+    Expone la ocupación del executor de herramientas y la efectividad de las cachés del servidor.
+    """
+    return {
+        "executor": tool_executor.stats(),
+        "tool_contexts": context_manager.stats(),
+        "corpus_registry": corpus_registry.stats(),
+        "retrieval_cache": retrieval_cache.stats(),
+        "file_count_cache": file_count_cache.stats(),
+        "singleflight": singleflight.stats(),
+        "lexical_index": lexical_index.stats(),
+        "import_jobs": import_jobs.stats(),
+        "tool_catalog": get_tool_catalog().stats(),
+        "startup": build_startup_report(),
+    }
+
+@app.get("/api/mcp/corpus_versions")
+async def get_corpus_versions(token: str = Depends(verify_token)):
+    """
+    Versión de contenido de cada corpus y una huella global (`token`) que cambia con cualquier
+    importación, eliminación o reinicio del servidor. La usan los clientes que cachean
+    respuestas derivadas del contenido de los corpus.
+    """
+    return {
+        "boot_id": corpus_versions.boot_id,
+        "versions": corpus_versions.snapshot(),
+        "token": corpus_versions.token(),
+    }
+
+@app.get("/metrics")
+async def metrics(token: str = Depends(verify_token)):
+    """
+    Métricas del servidor en formato de texto de Prometheus: latencia y resultado por método
+    JSON-RPC y por herramienta, llamadas salientes al backend RAG, ocupación del executor
+    y efectividad de las cachés.
+    """
+    return PlainTextResponse(
+        metrics_registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
 if __name__ == "__main__":
     uvicorn.run(
         app,
@@ -0,0 +1,46 @@
+"""
+Serialización JSON del servidor MCP. Usa orjson cuando está instalado y, si no, el
+módulo json de la biblioteca estándar con separadores compactos.
+"""
+
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson es opcional
+    orjson = None
+
+
+def _default(value: Any) -> str:
+    # Objetos que no son JSON nativos (fechas, mensajes protobuf, ...) se representan como texto
+    return str(value)
+
+
+def dumps_bytes(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        value,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=_default,
+    ).encode("utf-8")
+
+
+def dumps(value: Any) -> str:
+    """
+    Serializa a JSON minificado y UTF-8, sin escapar caracteres no ASCII.
+    """
+    return dumps_bytes(value).decode("utf-8")
+
+
+class CompactJSONResponse(JSONResponse):
+    """
+    JSONResponse que serializa con `dumps_bytes`: sin espacios y con orjson si está disponible.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content)
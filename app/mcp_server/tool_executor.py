@@ -0,0 +1,219 @@
+"""
+Ejecución de herramientas MCP fuera del event loop mediante un pool acotado de hilos o procesos.
+"""
+import asyncio
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+MCP_TOOL_EXECUTOR = os.getenv("MCP_TOOL_EXECUTOR", "thread")
+MCP_TOOL_MAX_WORKERS = int(os.getenv("MCP_TOOL_MAX_WORKERS", "16"))
+MCP_TOOL_DEFAULT_CONCURRENCY = int(os.getenv("MCP_TOOL_DEFAULT_CONCURRENCY", "8"))
+# Límites por herramienta, ej: "rag_query=16,add_data_corpus=2"
+MCP_TOOL_CONCURRENCY = os.getenv("MCP_TOOL_CONCURRENCY", "")
+
+
+def parse_concurrency_limits(raw: str) -> Dict[str, int]:
+    """
+    Convierte una cadena "tool=limite,tool2=limite2" en un diccionario de límites.
+
+    Args:
+        raw (str): La cadena de configuración
+
+    Returns:
+        Dict[str, int]: Límite de concurrencia por nombre de herramienta
+    """
+    limits = {}
+    for item in raw.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, value = item.partition("=")
+        try:
+            limits[name.strip()] = max(1, int(value))
+        except ValueError:
+            logger.warning(f"Límite de concurrencia inválido para la herramienta '{name}': '{value}'")
+    return limits
+
+
+class _ProcessToolContext:
+    """Contexto mínimo que se reconstruye dentro del proceso worker."""
+
+    def __init__(self, state: dict):
+        self.state = state
+
+
+def _run_tool_in_subprocess(name: str, arguments: dict, state: dict):
+    """
+    Ejecuta una herramienta dentro de un proceso del pool.
+    El estado del contexto viaja por copia y se devuelve para fusionarlo en el proceso principal.
+    """
+    from tools import TOOLS_MAP
+
+    tool_context = _ProcessToolContext(state)
+    result = TOOLS_MAP[name].run.func(**arguments, tool_context=tool_context)
+    return result, tool_context.state
+
+
+class ToolExecutor:
+    """
+    Ejecuta las herramientas síncronas en un pool de hilos o procesos para no bloquear
+    el event loop de uvicorn.
+
+    Cada herramienta tiene un límite de ejecuciones simultáneas; las llamadas que lo
+    exceden esperan en una cola por herramienta cuya profundidad se reporta en `stats()`.
+    Las herramientas que dependen del estado del proceso principal pueden declarar
+    `PROCESS_SAFE = False` en su módulo y siempre se ejecutan en hilos.
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: int = 16,
+        default_limit: int = 8,
+        limits: Optional[Dict[str, int]] = None,
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Tipo de executor no soportado: '{kind}'. Usa 'thread' o 'process'.")
+
+        self.kind = kind
+        self.max_workers = max_workers
+        self.default_limit = default_limit
+        self.limits = limits or {}
+
+        self._thread_executor: Optional[ThreadPoolExecutor] = None
+        self._process_executor: Optional[ProcessPoolExecutor] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._waiting: Dict[str, int] = {}
+        self._running: Dict[str, int] = {}
+        self._completed: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ToolExecutor":
+        return cls(
+            kind=MCP_TOOL_EXECUTOR,
+            max_workers=MCP_TOOL_MAX_WORKERS,
+            default_limit=MCP_TOOL_DEFAULT_CONCURRENCY,
+            limits=parse_concurrency_limits(MCP_TOOL_CONCURRENCY),
+        )
+
+    def start(self) -> None:
+        if self._thread_executor is None:
+            self._thread_executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="mcp-tool",
+            )
+        if self.kind == "process" and self._process_executor is None:
+            self._process_executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        logger.info(
+            f"Executor de herramientas iniciado: tipo={self.kind}, workers={self.max_workers}, "
+            f"límite por defecto={self.default_limit}, límites={self.limits}"
+        )
+
+    def shutdown(self, wait: bool = True) -> None:
+        for executor in (self._thread_executor, self._process_executor):
+            if executor is not None:
+                executor.shutdown(wait=wait)
+        self._thread_executor = None
+        self._process_executor = None
+
+    def limit_for(self, name: str) -> int:
+        return self.limits.get(name, self.default_limit)
+
+    def _semaphore_for(self, name: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(name)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.limit_for(name))
+            self._semaphores[name] = semaphore
+        return semaphore
+
+    def _add(self, counter: Dict[str, int], name: str, delta: int) -> None:
+        with self._lock:
+            counter[name] = counter.get(name, 0) + delta
+
+    async def run(self, name: str, tool_module: Any, arguments: dict, tool_context: Any) -> Any:
+        """
+        Ejecuta la herramienta respetando su límite de concurrencia.
+
+        Args:
+            name (str): Nombre de la herramienta en TOOLS_MAP
+            tool_module: Módulo de la herramienta (expone `run.func`)
+            arguments (dict): Argumentos de la llamada
+            tool_context: Contexto de la herramienta para la gestión del estado
+
+        Returns:
+            Any: El resultado devuelto por la herramienta
+        """
+        if self._thread_executor is None:
+            self.start()
+
+        semaphore = self._semaphore_for(name)
+
+        self._add(self._waiting, name, 1)
+        try:
+            await semaphore.acquire()
+        finally:
+            self._add(self._waiting, name, -1)
+
+        self._add(self._running, name, 1)
+        try:
+            loop = asyncio.get_running_loop()
+
+            if self._process_executor is not None and getattr(tool_module, "PROCESS_SAFE", True):
+                result, state = await loop.run_in_executor(
+                    self._process_executor,
+                    _run_tool_in_subprocess,
+                    name,
+                    arguments,
+                    dict(tool_context.state),
+                )
+                tool_context.state.update(state)
+                return result
+
+            func = tool_module.run.func
+            return await loop.run_in_executor(
+                self._thread_executor,
+                functools.partial(func, **arguments, tool_context=tool_context),
+            )
+        finally:
+            self._add(self._running, name, -1)
+            self._add(self._completed, name, 1)
+            semaphore.release()
+
+    def stats(self) -> dict:
+        """
+        Devuelve la ocupación del executor.
+
+        `queue_depth` suma las llamadas detenidas por el límite de su herramienta y las que
+        ya fueron enviadas al pool pero esperan un worker libre.
+        """
+        with self._lock:
+            names = set(self._waiting) | set(self._running) | set(self.limits)
+            tools = {
+                name: {
+                    "limit": self.limit_for(name),
+                    "waiting": self._waiting.get(name, 0),
+                    "running": self._running.get(name, 0),
+                    "completed": self._completed.get(name, 0),
+                }
+                for name in sorted(names)
+            }
+            waiting = sum(self._waiting.values())
+            submitted = sum(self._running.values())
+
+        pool_backlog = max(0, submitted - self.max_workers)
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "in_flight": submitted,
+            "waiting": waiting,
+            "pool_backlog": pool_backlog,
+            "queue_depth": waiting + pool_backlog,
+            "tools": tools,
+        }
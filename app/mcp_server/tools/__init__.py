@@ -1,19 +1,85 @@
-from . import (
-    rag_query,
-    list_corpora,
-    add_data,
-    create_corpus,
-    delete_corpus,
-    delete_document,
-    get_corpus_info,
-)
-
-TOOLS_MAP = {
-    "rag_query": rag_query,
-    "list_corpora": list_corpora,
-    "add_data_corpus": add_data,
-    "create_corpus": create_corpus,
-    "delete_corpus": delete_corpus,
-    "delete_document": delete_document,
-    "get_corpus_info": get_corpus_info,
+"""
+Registro de herramientas MCP.
+
+Los módulos de las herramientas importan los SDK de ADK y Vertex AI, que tardan varios
+segundos en cargarse. TOOLS_MAP los importa la primera vez que se usa cada herramienta,
+de modo que el servidor arranca y responde `initialize` y `tools/list` sin pagar ese costo.
+"""
+
+import importlib
+import threading
+import time
+from collections.abc import Mapping
+from types import ModuleType
+from typing import Dict, Iterator
+
+TOOL_MODULES = {
+    "rag_query": "rag_query",
+    "list_corpora": "list_corpora",
+    "add_data_corpus": "add_data",
+    "create_corpus": "create_corpus",
+    "delete_corpus": "delete_corpus",
+    "delete_document": "delete_document",
+    "delete_documents": "delete_documents",
+    "get_corpus_info": "get_corpus_info",
+    "get_import_status": "get_import_status",
+    "sync_corpus": "sync_corpus",
 }
+
+
+class LazyToolsMap(Mapping):
+    """
+    Mapeo nombre de herramienta -> módulo que importa cada módulo en su primer acceso
+    y registra cuánto tardó la importación.
+    """
+
+    def __init__(self, modules: Dict[str, str]):
+        self._modules = dict(modules)
+        self._loaded: Dict[str, ModuleType] = {}
+        self._import_seconds: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def module_name(self, name: str) -> str:
+        return self._modules[name]
+
+    def __getitem__(self, name: str) -> ModuleType:
+        module = self._loaded.get(name)
+        if module is not None:
+            return module
+
+        module_name = self._modules[name]
+        with self._lock:
+            module = self._loaded.get(name)
+            if module is None:
+                started = time.perf_counter()
+                module = importlib.import_module(f"{__name__}.{module_name}")
+                self._import_seconds[name] = time.perf_counter() - started
+                self._loaded[name] = module
+        return module
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._loaded
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._modules
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._modules)
+
+    def __len__(self) -> int:
+        return len(self._modules)
+
+    def preload(self) -> None:
+        for name in self._modules:
+            self[name]
+
+    def import_times(self) -> Dict[str, float]:
+        """
+        Segundos que tardó la importación de cada herramienta ya cargada. La primera en
+        cargarse absorbe el costo de los SDK compartidos.
+        """
+        with self._lock:
+            return {name: round(seconds, 4) for name, seconds in self._import_seconds.items()}
+
+
+TOOLS_MAP = LazyToolsMap(TOOL_MODULES)
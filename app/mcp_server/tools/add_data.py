@@ -3,38 +3,18 @@ Herramienta para agregar nuevas fuentes de datos a un corpus RAG de Vertex AI.
 """
 
 from typing import List, Dict
-from vertexai import rag
 from google.adk.tools import ToolContext, FunctionTool
 
-from config import (
-    DEFAULT_CHUNK_OVERLAP,
-    DEFAULT_CHUNK_SIZE,
-    DEFAULT_EMBEDDING_REQUESTS_PER_MIN,
-    CORPUS_NAME,
-)
+from tools.jobs import ImportJob, import_jobs
 from tools.utils import check_corpus_exists, get_corpus_resource_name
 
-DESCRIPTION = "Agrega nuevos documentos al corpus RAG desde rutas de Google Cloud Storage (gs://)"
-SCHEMA = {
-    "type": "object",
-    "properties": {
-        "corpus_name": {
-            "type": "string",
-            "description": "Nombre del corpus RAG",
-        },
-        "paths": {
-            "type": "array",
-            "items": {"type": "string"},
-            "description": "Lista de rutas GCS. Ejemplo: ['gs://bucket/archivo.pdf', 'gs://bucket/carpeta/']"
-        }
-    },
-    "required": ["paths"]
-}
+PROCESS_SAFE = False
 
 def add_data(corpus_name: str, paths: List[str], tool_context: ToolContext) -> Dict:
     """
     Agregar nuevas fuentes de datos a un corpus RAG de Vertex AI.
-    SOLO admite rutas GCS.
+    SOLO admite rutas GCS. La importación se encola como un trabajo en segundo plano
+    y la herramienta regresa inmediatamente con su job_id.
     
     Args:
         corpus_name (str): El nombre del corpus al que se agregará datos. Si no se proporciona, usa CORPUS_NAME por defecto.
@@ -43,7 +23,7 @@ def add_data(corpus_name: str, paths: List[str], tool_context: ToolContext) -> D
         tool_context (ToolContext): El contexto de la herramienta
         
     Returns:
-        dict: Información sobre los datos agregados y el estado
+        dict: El job_id del trabajo de importación encolado y las rutas aceptadas
     """
 
     if not check_corpus_exists(corpus_name, tool_context):
@@ -86,28 +66,26 @@ def add_data(corpus_name: str, paths: List[str], tool_context: ToolContext) -> D
     try:
         corpus_resource_name = get_corpus_resource_name(corpus_name)
 
-        transformation_config = rag.TransformationConfig(
-            chunking_config=rag.ChunkingConfig(
-                chunk_size=DEFAULT_CHUNK_SIZE,
-                chunk_overlap=DEFAULT_CHUNK_OVERLAP,
-            ),
-        )
-
-        import_result = rag.import_files(
-            corpus_resource_name,
-            validated_paths,
-            transformation_config=transformation_config,
-            max_embedding_requests_per_min=DEFAULT_EMBEDDING_REQUESTS_PER_MIN,
+        job = import_jobs.submit(
+            ImportJob(
+                corpus_name=corpus_name,
+                corpus_resource_name=corpus_resource_name,
+                paths=validated_paths,
+                invalid_paths=invalid_paths,
+            )
         )
 
         if not tool_context.state.get("current_corpus"):
             tool_context.state["current_corpus"] = corpus_name
 
         return {
-            "status": "success",
-            "message": f"Se agregaron exitosamente {import_result.imported_rag_files_count} archivo(s) al corpus '{corpus_name}'",
+            "status": "accepted",
+            "message": (
+                f"Importación de {len(validated_paths)} ruta(s) al corpus '{corpus_name}' encolada. "
+                f"Consulta el avance con get_import_status y el job_id '{job.job_id}'."
+            ),
+            "job_id": job.job_id,
             "corpus_name": corpus_name,
-            "files_added": import_result.imported_rag_files_count,
             "paths": validated_paths,
             "invalid_paths": invalid_paths,
         }
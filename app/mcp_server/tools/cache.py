@@ -0,0 +1,90 @@
+"""
+Caché en memoria con expiración (TTL) y desalojo LRU para resultados de las herramientas RAG.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+RAG_QUERY_CACHE_SIZE = int(os.getenv("RAG_QUERY_CACHE_SIZE", "1024"))
+RAG_QUERY_CACHE_TTL_SECONDS = float(os.getenv("RAG_QUERY_CACHE_TTL_SECONDS", "600"))
+FILE_COUNT_CACHE_TTL_SECONDS = float(os.getenv("FILE_COUNT_CACHE_TTL_SECONDS", "60"))
+
+
+class TTLCache:
+    """
+    Caché LRU acotada en tamaño cuyas entradas expiran después de `ttl_seconds`.
+    Es segura para usarse desde los hilos del executor de herramientas.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 600):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evicted_expired = 0
+        self.evicted_lru = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Devuelve el valor almacenado para `key` o None si no existe o ya expiró.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.evicted_expired += 1
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evicted_lru += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "evicted_expired": self.evicted_expired,
+                "evicted_lru": self.evicted_lru,
+            }
+
+
+# Las cachés compartidas viven aquí y no en los módulos de cada herramienta para que el
+# servidor pueda reportarlas sin importar las herramientas (y sus SDKs) antes de tiempo.
+retrieval_cache = TTLCache(
+    max_size=RAG_QUERY_CACHE_SIZE,
+    ttl_seconds=RAG_QUERY_CACHE_TTL_SECONDS,
+)
+
+# El total de archivos se cachea por versión del corpus: contarlo en Vertex AI requiere recorrer todas las páginas
+file_count_cache = TTLCache(max_size=256, ttl_seconds=FILE_COUNT_CACHE_TTL_SECONDS)
@@ -0,0 +1,62 @@
+"""
+Catálogo precalculado de herramientas para `tools/list`.
+
+DESCRIPTION y SCHEMA de cada herramienta viven en `tools.schemas`, en módulos que solo
+dependen de la biblioteca estándar, así que el catálogo se arma sin importar las
+herramientas ni sus SDK. La respuesta se serializa una sola vez al arrancar, junto con un
+ETag derivado de su contenido.
+"""
+
+import hashlib
+import importlib
+from typing import Any, Dict, List
+
+from serialization import dumps_bytes
+from tools import TOOL_MODULES
+
+
+class ToolCatalog:
+    """
+    Resultado de `tools/list` construido una vez: la lista de herramientas, su JSON
+    serializado y un ETag derivado del contenido.
+    """
+
+    def __init__(self):
+        self.tools: List[Dict[str, Any]] = []
+        self.result_json = b""
+        self.etag = ""
+
+    def build(self) -> "ToolCatalog":
+        tools = []
+        for name, module_name in TOOL_MODULES.items():
+            schema_module = importlib.import_module(f"tools.schemas.{module_name}")
+            tools.append({
+                "name": name,
+                "description": schema_module.DESCRIPTION,
+                "inputSchema": schema_module.SCHEMA,
+            })
+
+        self.tools = tools
+        self.result_json = dumps_bytes({"tools": tools})
+        self.etag = '"' + hashlib.sha256(self.result_json).hexdigest()[:32] + '"'
+        return self
+
+    @property
+    def result(self) -> Dict[str, Any]:
+        return {"tools": self.tools}
+
+    def response_bytes(self, request_id: Any) -> bytes:
+        """
+        Respuesta JSON-RPC completa de `tools/list` reutilizando el resultado ya serializado.
+        """
+        return (
+            b'{"jsonrpc":"2.0","id":' + dumps_bytes(request_id)
+            + b',"result":' + self.result_json + b',"error":null}'
+        )
+
+    def stats(self) -> dict:
+        return {
+            "tools": len(self.tools),
+            "bytes": len(self.result_json),
+            "etag": self.etag,
+        }
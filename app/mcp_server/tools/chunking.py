@@ -0,0 +1,24 @@
+"""
+Fragmentación de texto por palabras compartida por el backend local y el índice léxico.
+
+Solo usa la biblioteca estándar para que importarla no cargue NumPy ni el backend local.
+"""
+
+from typing import List
+
+
+def chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> List[str]:
+    """
+    Divide el texto en fragmentos de `chunk_size` palabras que se traslapan `chunk_overlap` palabras.
+    """
+    words = text.split()
+    if not words:
+        return []
+
+    step = max(1, chunk_size - chunk_overlap)
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(" ".join(words[start:start + chunk_size]))
+        if start + chunk_size >= len(words):
+            break
+    return chunks
@@ -4,25 +4,17 @@ Herramienta para crear un nuevo corpus RAG de Vertex AI.
 
 import re
 from mcp import types as mcp_types
-from vertexai import rag
 from google.adk.tools import ToolContext, FunctionTool
 
+from backends import get_backend
+
 from config import (
   DEFAULT_EMBEDDING_MODEL,
 )
 
-from tools.utils import check_corpus_exists
+from tools.utils import check_corpus_exists, corpus_registry
 
-DESCRIPTION = "Crea un nuevo corpus RAG de Vertex AI con el nombre especificado."
-SCHEMA = {
-    "type": "object",
-    "properties": {
-        "corpus_name": {
-            "type": "string",
-            "description": "El nombre para el nuevo corpus"
-        }
-    },
-}
+PROCESS_SAFE = False
 
 def create_corpus(
     corpus_name: str,
@@ -51,19 +43,13 @@ def create_corpus(
        
         display_name = re.sub(r"[^a-zA-Z0-9_-]", "_", corpus_name)
 
-        embedding_model_config = rag.RagEmbeddingModelConfig(
-            vertex_prediction_endpoint=rag.VertexPredictionEndpoint(
-                publisher_model=DEFAULT_EMBEDDING_MODEL
-            )
-        )
-        
-        rag_corpus = rag.create_corpus(
+        rag_corpus = get_backend().create_corpus(
             display_name=display_name,
-            backend_config=rag.RagVectorDbConfig(
-                rag_embedding_model_config=embedding_model_config
-            ),
+            embedding_model=DEFAULT_EMBEDDING_MODEL,
         )
 
+        corpus_registry.invalidate()
+
         tool_context.state[f"corpus_exists_{corpus_name}"] = True
 
         tool_context.state["current_corpus"] = corpus_name
@@ -3,24 +3,14 @@ Herramienta para eliminar un corpus RAG de Vertex AI cuando ya no se necesita.
 """
 
 from google.adk.tools import ToolContext, FunctionTool
-from vertexai import rag
 
-from tools.utils import check_corpus_exists, get_corpus_resource_name
+from backends import get_backend
 
-DESCRIPTION = "Elimina un corpus RAG de Vertex AI cuando ya no se necesita. Requiere confirmación para evitar eliminaciones accidentales."
-SCHEMA = {
-    "type": "object",
-    "properties": {
-        "corpus_name": {
-            "type": "string",
-            "description": "El nombre completo del recurso del corpus a eliminar. Preferiblemente use el resource_name de los resultados de list_corpora."
-        },
-        "confirm": {
-            "type": "boolean",
-            "description": "Debe establecerse en True para confirmar la eliminación"
-        }
-    },
-}
+from tools.lexical import lexical_index
+from tools.manifest import delete_manifest
+from tools.utils import check_corpus_exists, get_corpus_resource_name, corpus_registry, corpus_versions
+
+PROCESS_SAFE = False
 
 def delete_corpus(
     corpus_name: str,
@@ -58,7 +48,11 @@ def delete_corpus(
    
         corpus_resource_name = get_corpus_resource_name(corpus_name)
 
-        rag.delete_corpus(corpus_resource_name)
+        get_backend().delete_corpus(corpus_resource_name)
+        corpus_registry.invalidate()
+        corpus_versions.bump(corpus_resource_name)
+        delete_manifest(corpus_resource_name)
+        lexical_index.drop(corpus_resource_name)
 
         state_key = f"corpus_exists_{corpus_name}"
         if state_key in tool_context.state:
@@ -3,26 +3,12 @@ Herramienta para eliminar un documento específico de un corpus RAG de Vertex AI
 """
 
 from google.adk.tools import ToolContext, FunctionTool
-from vertexai import rag
 
-from tools.utils import check_corpus_exists, get_corpus_resource_name
+from backends import get_backend
 
+from tools.utils import check_corpus_exists, get_corpus_resource_name, corpus_versions
 
-DESCRIPTION = "Elimina un documento específico de un corpus RAG de Vertex AI."
-SCHEMA = {
-    "type": "object",
-    "properties": {
-        "corpus_name": {
-            "type": "string",
-            "description": "El nombre completo del recurso del corpus que contiene el documento. Preferiblemente use el resource_name de los resultados de list_corpora."
-        },
-        "document_id": {
-            "type": "string",
-            "description": "El ID del documento/archivo específico a eliminar. Esto se puede obtener de los resultados de get_corpus_info."
-        }
-    },
-    "required": ["corpus_name", "document_id"],
-}
+PROCESS_SAFE = False
 
 def delete_document(
     corpus_name: str,
@@ -55,7 +41,8 @@ def delete_document(
         corpus_resource_name = get_corpus_resource_name(corpus_name)
 
         rag_file_path = f"{corpus_resource_name}/ragFiles/{document_id}"
-        rag.delete_file(rag_file_path)
+        get_backend().delete_file(rag_file_path)
+        corpus_versions.bump(corpus_resource_name)
 
         return {
             "status": "success",
@@ -0,0 +1,131 @@
+"""
+Herramienta para eliminar en bloque documentos de un corpus RAG de Vertex AI.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from google.adk.tools import ToolContext, FunctionTool
+
+from backends import get_backend
+
+from tools.utils import check_corpus_exists, get_corpus_resource_name, corpus_versions
+
+BULK_DELETE_CONCURRENCY = int(os.getenv("BULK_DELETE_CONCURRENCY", "8"))
+
+PROCESS_SAFE = False
+
+delete_executor = ThreadPoolExecutor(
+    max_workers=BULK_DELETE_CONCURRENCY,
+    thread_name_prefix="rag-delete",
+)
+
+
+def _delete_one(rag_file_name: str) -> dict:
+    document_id = rag_file_name.rsplit("/", 1)[-1]
+    try:
+        get_backend().delete_file(rag_file_name)
+        return {"document_id": document_id, "status": "deleted"}
+    except Exception as e:
+        return {"document_id": document_id, "status": "error", "message": str(e)}
+
+
+def delete_documents(
+    corpus_name: str,
+    tool_context: ToolContext,
+    document_ids: Optional[List[str]] = None,
+    source_uri_prefix: str = "",
+    confirm: bool = False,
+) -> dict:
+    """
+    Borra en bloque documentos de un corpus RAG de Vertex AI.
+
+    Los documentos se resuelven una sola vez (una sola validación del corpus y, con prefijo,
+    un solo listado de archivos) y se eliminan en paralelo con hasta BULK_DELETE_CONCURRENCY
+    eliminaciones simultáneas.
+
+    Args:
+        corpus_name (str): El nombre completo del recurso del corpus.
+        tool_context (ToolContext): El contexto de la herramienta
+        document_ids (List[str], opcional): IDs de los documentos a eliminar
+        source_uri_prefix (str, opcional): Prefijo de la ruta de origen de los documentos a eliminar
+        confirm (bool): True para eliminar; False solo lista los documentos encontrados
+
+    Returns:
+        dict: El resultado de cada documento y el conteo de eliminados y fallidos
+    """
+    if not document_ids and not source_uri_prefix:
+        return {
+            "status": "error",
+            "message": "Proporciona document_ids o source_uri_prefix para elegir los documentos a eliminar.",
+            "corpus_name": corpus_name,
+        }
+
+    if not check_corpus_exists(corpus_name, tool_context):
+        return {
+            "status": "error",
+            "message": f"El corpus '{corpus_name}' no existe",
+            "corpus_name": corpus_name,
+        }
+
+    try:
+        corpus_resource_name = get_corpus_resource_name(corpus_name)
+
+        rag_file_names = [
+            document_id if "/ragFiles/" in document_id else f"{corpus_resource_name}/ragFiles/{document_id}"
+            for document_id in document_ids or []
+        ]
+        if source_uri_prefix:
+            rag_file_names += [
+                rag_file.name
+                for rag_file in get_backend().list_files(corpus_resource_name)
+                if getattr(rag_file, "source_uri", "").startswith(source_uri_prefix)
+            ]
+        rag_file_names = list(dict.fromkeys(rag_file_names))
+
+        if not rag_file_names:
+            return {
+                "status": "success",
+                "message": f"No hay documentos que coincidan en el corpus '{corpus_name}'",
+                "corpus_name": corpus_name,
+                "deleted_count": 0,
+                "results": [],
+            }
+
+        if not confirm:
+            return {
+                "status": "error",
+                "message": (
+                    f"Se eliminarían {len(rag_file_names)} documento(s). "
+                    "Establezca confirm=True para confirmar la eliminación."
+                ),
+                "corpus_name": corpus_name,
+                "document_ids": [name.rsplit("/", 1)[-1] for name in rag_file_names],
+            }
+
+        results = list(delete_executor.map(_delete_one, rag_file_names))
+        deleted_count = sum(1 for result in results if result["status"] == "deleted")
+        failed_count = len(results) - deleted_count
+        if deleted_count:
+            corpus_versions.bump(corpus_resource_name)
+
+        return {
+            "status": "success" if not failed_count else ("partial" if deleted_count else "error"),
+            "message": (
+                f"{deleted_count} documento(s) eliminado(s) del corpus '{corpus_name}'"
+                + (f", {failed_count} con error" if failed_count else "")
+            ),
+            "corpus_name": corpus_name,
+            "deleted_count": deleted_count,
+            "failed_count": failed_count,
+            "results": results,
+        }
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Error al eliminar los documentos: {str(e)}",
+            "corpus_name": corpus_name,
+        }
+
+run = FunctionTool(func=delete_documents)
@@ -0,0 +1,103 @@
+"""
+Reparto de la cuota de embeddings entre los trabajos de importación del proceso.
+
+`rag.import_files` aplica el límite `max_embedding_requests_per_min` por llamada, así que
+dos importaciones simultáneas con el valor fijo duplicaban la tasa real y provocaban errores
+de cuota, mientras que una sola dejaba sin usar la cuota de las demás. Aquí la cuota total se
+presta por lote: cada lote toma una porción de la tasa y la devuelve al terminar, y la suma
+de porciones prestadas nunca supera el total.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Set
+
+from config import DEFAULT_EMBEDDING_REQUESTS_PER_MIN
+
+EMBEDDING_REQUESTS_PER_MIN_TOTAL = int(
+    os.getenv("EMBEDDING_REQUESTS_PER_MIN_TOTAL", str(DEFAULT_EMBEDDING_REQUESTS_PER_MIN))
+)
+
+
+class EmbeddingRateScheduler:
+    """
+    Presta porciones de `total_per_min` a los trabajos activos.
+
+    La porción justa de un trabajo es el total entre los trabajos activos (los que ya
+    pidieron cuota y no han terminado). Un lote recibe su porción justa si está libre; si
+    otro trabajo aún tiene prestada una porción mayor de un reparto anterior, el lote espera
+    a que se libere. Así, cuando un trabajo empieza o termina, el reparto se ajusta en el
+    siguiente lote de cada trabajo, y un trabajo solo usa la cuota completa.
+    """
+
+    def __init__(self, total_per_min: int):
+        self.total_per_min = max(1, total_per_min)
+        self._condition = threading.Condition()
+        self._active: Set[str] = set()
+        self._leases: Dict[str, int] = {}
+
+        self.leases_granted = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def _fair_share(self) -> int:
+        return max(1, self.total_per_min // max(1, len(self._active)))
+
+    def _available(self) -> int:
+        return self.total_per_min - sum(self._leases.values())
+
+    @contextmanager
+    def lease(self, job_id: str) -> Iterator[int]:
+        """
+        Reserva la porción de cuota de un lote del trabajo `job_id` mientras dura el bloque.
+
+        Yields:
+            int: Solicitudes de embedding por minuto que el lote puede usar
+        """
+        started = time.perf_counter()
+        with self._condition:
+            self._active.add(job_id)
+            self._condition.notify_all()
+            waited = False
+            while self._available() < self._fair_share():
+                waited = True
+                self._condition.wait()
+            rate = self._fair_share()
+            self._leases[job_id] = rate
+            self.leases_granted += 1
+            if waited:
+                self.waits += 1
+                self.wait_seconds += time.perf_counter() - started
+
+        try:
+            yield rate
+        finally:
+            with self._condition:
+                self._leases.pop(job_id, None)
+                self._condition.notify_all()
+
+    def finish(self, job_id: str) -> None:
+        """
+        Retira el trabajo del reparto; los demás reciben una porción mayor en su siguiente lote.
+        """
+        with self._condition:
+            self._active.discard(job_id)
+            self._leases.pop(job_id, None)
+            self._condition.notify_all()
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "total_per_min": self.total_per_min,
+                "active_jobs": len(self._active),
+                "fair_share_per_min": self._fair_share(),
+                "leased_per_min": sum(self._leases.values()),
+                "leases_granted": self.leases_granted,
+                "waits": self.waits,
+                "wait_seconds": round(self.wait_seconds, 3),
+            }
+
+
+embedding_scheduler = EmbeddingRateScheduler(EMBEDDING_REQUESTS_PER_MIN_TOTAL)
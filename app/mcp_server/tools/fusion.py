@@ -0,0 +1,94 @@
+"""
+Fusión de listas de resultados de recuperación provenientes de varias fuentes.
+"""
+
+from typing import Callable, Dict, Hashable, List
+
+RRF_K = 60
+
+
+def default_result_key(result: dict) -> Hashable:
+    return (result.get("corpus_name", ""), result.get("source_uri", ""), result.get("text", ""))
+
+
+def relevance_scores(results: List[dict]) -> List[float]:
+    """
+    Normaliza los scores de una lista de resultados al rango [0, 1], donde 1 es el más relevante.
+
+    La lista llega ordenada de más a menos relevante, así que la orientación del score
+    (similitud o distancia) se deduce comparando el primer y el último elemento.
+    """
+    if not results:
+        return []
+
+    scores = [float(result.get("score") or 0.0) for result in results]
+    low, high = min(scores), max(scores)
+    if high == low:
+        return [1.0] * len(scores)
+
+    if scores[0] >= scores[-1]:
+        return [(score - low) / (high - low) for score in scores]
+    return [(high - score) / (high - low) for score in scores]
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Dict[str, List[dict]],
+    top_k: int,
+    key: Callable[[dict], Hashable] = default_result_key,
+    k: int = RRF_K,
+) -> List[dict]:
+    """
+    Combina varias listas ordenadas con Reciprocal Rank Fusion: cada resultado suma
+    1 / (k + posición) por cada lista en la que aparece.
+
+    Args:
+        ranked_lists (Dict[str, List[dict]]): Listas de resultados ordenadas por relevancia, por fuente
+        top_k (int): Número máximo de resultados a devolver
+        key (Callable): Identifica un mismo resultado entre listas
+        k (int): Constante de suavizado de RRF
+
+    Returns:
+        List[dict]: Los resultados fusionados con `fused_score`, de mayor a menor
+    """
+    fused: Dict[Hashable, dict] = {}
+    for results in ranked_lists.values():
+        for rank, result in enumerate(results, 1):
+            result_key = key(result)
+            entry = fused.get(result_key)
+            if entry is None:
+                entry = dict(result)
+                entry["fused_score"] = 0.0
+                fused[result_key] = entry
+            entry["fused_score"] += 1.0 / (k + rank)
+
+    ordered = sorted(fused.values(), key=lambda result: result["fused_score"], reverse=True)
+    return ordered[:top_k]
+
+
+def normalized_score_fusion(
+    ranked_lists: Dict[str, List[dict]],
+    top_k: int,
+    key: Callable[[dict], Hashable] = default_result_key,
+) -> List[dict]:
+    """
+    Combina varias listas normalizando los scores de cada una a [0, 1] y conservando
+    el mayor score normalizado de cada resultado.
+    """
+    fused: Dict[Hashable, dict] = {}
+    for results in ranked_lists.values():
+        for result, score in zip(results, relevance_scores(results)):
+            result_key = key(result)
+            entry = fused.get(result_key)
+            if entry is None or score > entry["fused_score"]:
+                entry = dict(result)
+                entry["fused_score"] = score
+                fused[result_key] = entry
+
+    ordered = sorted(fused.values(), key=lambda result: result["fused_score"], reverse=True)
+    return ordered[:top_k]
+
+
+FUSION_METHODS = {
+    "rrf": reciprocal_rank_fusion,
+    "score": normalized_score_fusion,
+}
@@ -2,37 +2,70 @@
 Herramienta para recuperar información detallada sobre un corpus RAG específico.
 """
 
+from typing import List, Optional
+
 from google.adk.tools import ToolContext, FunctionTool
-from vertexai import rag
 
-from tools.utils import check_corpus_exists, get_corpus_resource_name
+from backends import get_backend
 
-DESCRIPTION = "Obtiene información detallada sobre un corpus RAG específico, incluidos sus archivos."
+from tools.cache import file_count_cache
+from tools.utils import check_corpus_exists, corpus_versions, get_corpus_resource_name
+from tools.schemas.get_corpus_info import (
+    FILE_FIELDS,
+    GET_CORPUS_INFO_MAX_PAGE_SIZE,
+    GET_CORPUS_INFO_PAGE_SIZE,
+)
+
+
+def file_to_dict(rag_file, fields: List[str]) -> dict:
+    values = {
+        "file_id": lambda: rag_file.name.split("/")[-1],
+        "display_name": lambda: getattr(rag_file, "display_name", ""),
+        "source_uri": lambda: getattr(rag_file, "source_uri", ""),
+        "create_time": lambda: str(rag_file.create_time) if hasattr(rag_file, "create_time") else "",
+        "update_time": lambda: str(rag_file.update_time) if hasattr(rag_file, "update_time") else "",
+    }
+    return {field: values[field]() for field in fields}
+
+
+def _file_count_key(corpus_resource_name: str) -> tuple:
+    return (corpus_resource_name, corpus_versions.get(corpus_resource_name))
+
+
+def cached_file_count(corpus_resource_name: str) -> Optional[int]:
+    return file_count_cache.get(_file_count_key(corpus_resource_name))
+
+
+def count_corpus_files(corpus_resource_name: str) -> int:
+    key = _file_count_key(corpus_resource_name)
+    total = file_count_cache.get(key)
+    if total is None:
+        total = get_backend().count_files(corpus_resource_name)
+        file_count_cache.set(key, total)
+    return total
 
-SCHEMA = {
-    "type": "object",
-    "properties": {
-        "corpus_name": {
-            "type": "string",
-            "description": "El nombre completo del recurso del corpus sobre el que se desea obtener información.",
-        }
-    },
-    "required": ["corpus_name"],
-}
 
 def get_corpus_info(
     corpus_name: str,
     tool_context: ToolContext,
+    page_size: Optional[int] = None,
+    page_token: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    count_only: bool = False,
 ) -> dict:
     """
-    Obtiene información detallada sobre un corpus RAG específico, incluidos sus archivos.
+    Obtiene información sobre un corpus RAG específico y una página de sus archivos.
     Args:
         corpus_name (str): El nombre completo del recurso del corpus sobre el que se desea obtener información.
                            Preferiblemente use el resource_name de los resultados de list_corpora.
         tool_context (ToolContext): El contexto de la herramienta
-    
+        page_size (int, optional): Cantidad de archivos por página
+        page_token (str, optional): Token de la página a obtener, devuelto como next_page_token
+        fields (List[str], optional): Campos a incluir por archivo
+        count_only (bool): Devolver solo la cantidad total de archivos
+
     Returns:
-        dict: Información sobre el corpus y sus archivos
+        dict: Información sobre el corpus y la página de archivos solicitada
     """
     try:
         if not check_corpus_exists(corpus_name, tool_context):
@@ -46,50 +79,54 @@ def get_corpus_info(
 
         corpus_display_name = corpus_name
 
+        if count_only:
+            total_file_count = count_corpus_files(corpus_resource_name)
+            return {
+                "status": "success",
+                "message": f"El corpus '{corpus_display_name}' tiene {total_file_count} archivo(s)",
+                "corpus_name": corpus_name,
+                "corpus_display_name": corpus_display_name,
+                "total_file_count": total_file_count,
+            }
+
+        selected_fields = list(fields) if fields else list(FILE_FIELDS)
+        unknown_fields = [field for field in selected_fields if field not in FILE_FIELDS]
+        if unknown_fields:
+            return {
+                "status": "error",
+                "message": f"Campos no soportados: {', '.join(unknown_fields)}. Usa: {', '.join(FILE_FIELDS)}",
+                "corpus_name": corpus_name,
+            }
+
+        page_size = min(max(1, page_size or GET_CORPUS_INFO_PAGE_SIZE), GET_CORPUS_INFO_MAX_PAGE_SIZE)
+
+        files, next_page_token = get_backend().list_files_page(
+            corpus_resource_name,
+            page_size=page_size,
+            page_token=page_token,
+        )
+
         file_details = []
-        try:
-            files = rag.list_files(corpus_resource_name)
-            for rag_file in files:
-                try:
-                    file_id = rag_file.name.split("/")[-1]
-
-                    file_info = {
-                        "file_id": file_id,
-                        "display_name": (
-                            rag_file.display_name
-                            if hasattr(rag_file, "display_name")
-                            else ""
-                        ),
-                        "source_uri": (
-                            rag_file.source_uri
-                            if hasattr(rag_file, "source_uri")
-                            else ""
-                        ),
-                        "create_time": (
-                            str(rag_file.create_time)
-                            if hasattr(rag_file, "create_time")
-                            else ""
-                        ),
-                        "update_time": (
-                            str(rag_file.update_time)
-                            if hasattr(rag_file, "update_time")
-                            else ""
-                        ),
-                    }
-
-                    file_details.append(file_info)
-                except Exception:
-                    continue
-        except Exception:
-            pass
+        for rag_file in files:
+            try:
+                file_details.append(file_to_dict(rag_file, selected_fields))
+            except Exception:
+                continue
+
+        # Contar recorre todo el corpus: en una página solo se informa el total si ya está en
+        # caché; si no, es None y count_only lo calcula
+        total_file_count = cached_file_count(corpus_resource_name)
+        total_message = f" ({total_file_count} archivo(s) en total)" if total_file_count is not None else ""
 
         return {
             "status": "success",
-            "message": f"Se obtuvo información para el corpus '{corpus_display_name}'",
+            "message": f"Se obtuvo información para el corpus '{corpus_display_name}'{total_message}",
             "corpus_name": corpus_name,
             "corpus_display_name": corpus_display_name,
-            "file_count": len(file_details),
+            "total_file_count": total_file_count,
+            "page_file_count": len(file_details),
             "files": file_details,
+            "next_page_token": next_page_token,
         }
 
     except Exception as e:
@@ -98,5 +135,5 @@ def get_corpus_info(
             "message": f"Error al obtener la información del corpus: {str(e)}",
             "corpus_name": corpus_name,
         }
-    
-run = FunctionTool(func=get_corpus_info)
\ No newline at end of file
+
+run = FunctionTool(func=get_corpus_info)
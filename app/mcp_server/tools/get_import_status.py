@@ -0,0 +1,49 @@
+"""
+Herramienta para consultar el estado de los trabajos de importación de documentos.
+"""
+
+from google.adk.tools import ToolContext, FunctionTool
+
+from tools.jobs import import_jobs
+
+PROCESS_SAFE = False
+
+def get_import_status(
+    tool_context: ToolContext,
+    job_id: str = None,
+    corpus_name: str = None,
+) -> dict:
+    """
+    Consulta el estado de uno o varios trabajos de importación.
+
+    Args:
+        tool_context (ToolContext): El contexto de la herramienta
+        job_id (str, opcional): El identificador del trabajo devuelto por add_data_corpus
+        corpus_name (str, opcional): Nombre del corpus para filtrar los trabajos recientes
+
+    Returns:
+        dict: El estado del trabajo solicitado o la lista de trabajos recientes
+    """
+    if job_id:
+        job = import_jobs.get(job_id)
+        if job is None:
+            return {
+                "status": "error",
+                "message": f"No se encontró el trabajo de importación '{job_id}'",
+                "job_id": job_id,
+            }
+
+        return {
+            "status": "success",
+            "message": f"El trabajo '{job_id}' está en estado '{job.status}'",
+            "job": job.to_dict(),
+        }
+
+    jobs = import_jobs.list_jobs(corpus_name)
+    return {
+        "status": "success",
+        "message": f"Se encontraron {len(jobs)} trabajo(s) de importación",
+        "jobs": [job.to_dict() for job in reversed(jobs)],
+    }
+
+run = FunctionTool(func=get_import_status)
@@ -0,0 +1,318 @@
+"""
+Trabajos de ingesta en segundo plano para los corpus RAG de Vertex AI.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from backends import get_backend
+from config import (
+    DEFAULT_CHUNK_OVERLAP,
+    DEFAULT_CHUNK_SIZE,
+)
+from tools.embedding_quota import embedding_scheduler
+from tools.lexical import index_paths, publish_index
+from tools.utils import corpus_versions
+
+logger = logging.getLogger(__name__)
+
+IMPORT_JOB_MAX_WORKERS = int(os.getenv("IMPORT_JOB_MAX_WORKERS", "2"))
+IMPORT_JOB_HISTORY_SIZE = int(os.getenv("IMPORT_JOB_HISTORY_SIZE", "200"))
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_PARTIAL = "partial"
+JOB_FAILED = "failed"
+
+FINISHED_STATES = (JOB_SUCCEEDED, JOB_PARTIAL, JOB_FAILED)
+
+
+class ImportJob:
+    """
+    Estado de un trabajo de importación. Los contadores se actualizan desde el hilo
+    worker y se leen desde la herramienta de estado.
+    """
+
+    def __init__(
+        self,
+        corpus_name: str,
+        corpus_resource_name: str,
+        paths: List[str],
+        invalid_paths: Optional[List[str]] = None,
+        kind: str = "import",
+    ):
+        self.job_id = uuid.uuid4().hex
+        self.kind = kind
+        self.corpus_name = corpus_name
+        self.corpus_resource_name = corpus_resource_name
+        self.paths = paths
+        self.invalid_paths = invalid_paths or []
+
+        self.status = JOB_QUEUED
+        # Los trabajos que expanden sus rutas en archivos (sync) fijan aquí el total real
+        self.items_total: Optional[int] = None
+        self.paths_done = 0
+        self.imported_count = 0
+        self.failed_count = 0
+        self.skipped_count = 0
+        self.errors: List[Dict[str, str]] = []
+        self.details: Dict = {}
+
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def to_dict(self) -> dict:
+        now = time.time()
+        started_at = self.started_at or now
+        total = self.items_total if self.items_total is not None else len(self.paths)
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "corpus_name": self.corpus_name,
+            "paths": self.paths,
+            "invalid_paths": self.invalid_paths,
+            "progress": {
+                "paths_total": total,
+                "paths_done": self.paths_done,
+                "percent": round(100.0 * self.paths_done / total, 1) if total else 100.0,
+            },
+            "imported_count": self.imported_count,
+            "failed_count": self.failed_count,
+            "skipped_count": self.skipped_count,
+            "errors": self.errors,
+            "details": self.details,
+            "timings": {
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "queued_seconds": round(started_at - self.created_at, 3),
+                "running_seconds": (
+                    round((self.finished_at or now) - self.started_at, 3)
+                    if self.started_at else 0.0
+                ),
+            },
+        }
+
+
+def import_paths(job: ImportJob, paths: List[str], batch_size: int = 1) -> None:
+    """
+    Importa las rutas sobre el corpus del trabajo en lotes de `batch_size`, acumulando
+    los contadores. Cada lote usa la porción de cuota de embeddings que le presta
+    `embedding_scheduler`; si el lote importó archivos se agrega al índice léxico e
+    incrementa la versión del corpus para invalidar las cachés de consulta. El índice léxico
+    se reconstruye una sola vez, al terminar todos los lotes.
+    """
+    backend = get_backend()
+    indexed = 0
+
+    for start in range(0, len(paths), batch_size):
+        batch = paths[start:start + batch_size]
+        try:
+            with embedding_scheduler.lease(job.job_id) as embedding_rate:
+                job.details["embedding_requests_per_min"] = embedding_rate
+                import_result = backend.import_files(
+                    job.corpus_resource_name,
+                    batch,
+                    chunk_size=DEFAULT_CHUNK_SIZE,
+                    chunk_overlap=DEFAULT_CHUNK_OVERLAP,
+                    max_embedding_requests_per_min=embedding_rate,
+                )
+            imported = getattr(import_result, "imported_rag_files_count", 0) or 0
+            job.imported_count += imported
+            job.failed_count += getattr(import_result, "failed_rag_files_count", 0) or 0
+            job.skipped_count += getattr(import_result, "skipped_rag_files_count", 0) or 0
+            if imported:
+                # Un lote sin archivos importados (todo omitido o fallido) no tiene texto nuevo que leer
+                indexed += index_paths(job.corpus_resource_name, batch)
+                corpus_versions.bump(job.corpus_resource_name)
+        except Exception as e:
+            logger.warning(f"Error al importar {batch} en el corpus '{job.corpus_name}': {str(e)}")
+            job.errors.extend({"path": path, "error": str(e)} for path in batch)
+        finally:
+            job.paths_done += len(batch)
+
+    if indexed:
+        publish_index(job.corpus_resource_name)
+
+
+def run_import(job: ImportJob) -> None:
+    import_paths(job, job.paths)
+
+
+class ImportJobManager:
+    """
+    Ejecuta trabajos de ingesta en un pool de hilos propio, separado del executor de
+    herramientas, para que las importaciones largas no ocupen la capacidad de consulta.
+
+    Los trabajos sobre un mismo corpus se serializan, ya que Vertex AI no admite
+    importaciones simultáneas en un corpus: mientras uno corre, los siguientes esperan en
+    una cola del corpus, fuera del pool, y se despachan al terminar el anterior. Así un
+    corpus ocupado no bloquea workers que podrían atender otros corpus. Se conserva un
+    historial acotado de trabajos.
+
+    Después de `shutdown()` no se despachan más trabajos: los que siguen en cola se marcan
+    como fallidos en lugar de crear un pool nuevo que nadie cerraría.
+    """
+
+    def __init__(self, max_workers: int = 2, history_size: int = 200):
+        self.max_workers = max_workers
+        self.history_size = history_size
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: "OrderedDict[str, ImportJob]" = OrderedDict()
+        # Un corpus tiene cola mientras alguno de sus trabajos está despachado
+        self._corpus_queues: Dict[str, Deque[Tuple[ImportJob, Callable[[ImportJob], None]]]] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("El administrador de trabajos de ingesta ya se cerró")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="rag-import",
+                )
+            return self._executor
+
+    def _remember(self, job: ImportJob) -> None:
+        with self._lock:
+            self._jobs[job.job_id] = job
+            if len(self._jobs) > self.history_size:
+                for job_id, old_job in list(self._jobs.items()):
+                    if len(self._jobs) <= self.history_size:
+                        break
+                    if old_job.finished:
+                        del self._jobs[job_id]
+
+    def submit(self, job: ImportJob, target: Callable[[ImportJob], None] = run_import) -> ImportJob:
+        """
+        Encola un trabajo y regresa inmediatamente.
+
+        Args:
+            job (ImportJob): El trabajo a ejecutar
+            target (Callable): La función que realiza la ingesta del trabajo
+
+        Returns:
+            ImportJob: El mismo trabajo, ya registrado en el historial
+        """
+        self._remember(job)
+        with self._lock:
+            queue = self._corpus_queues.get(job.corpus_resource_name)
+            if queue is not None:
+                queue.append((job, target))
+                return job
+            self._corpus_queues[job.corpus_resource_name] = deque()
+        try:
+            self._get_executor().submit(self._run, job, target)
+        except Exception as e:
+            # Sin liberar la cola, los trabajos siguientes del corpus esperarían para siempre
+            self._abandon_corpus(job.corpus_resource_name, [job], str(e))
+            raise
+        return job
+
+    def _abandon_corpus(self, corpus_resource_name: str, jobs: List[ImportJob], reason: str) -> None:
+        """
+        Libera la cola del corpus y marca como fallidos `jobs` y los trabajos que esperaban en ella.
+        """
+        with self._lock:
+            queue = self._corpus_queues.pop(corpus_resource_name, None) or deque()
+        for job in jobs + [queued_job for queued_job, _ in queue]:
+            job.errors.append({"path": "", "error": reason})
+            job.status = JOB_FAILED
+            job.finished_at = time.time()
+
+    def _dispatch_next(self, corpus_resource_name: str) -> None:
+        with self._lock:
+            queue = self._corpus_queues.get(corpus_resource_name)
+            if not queue:
+                self._corpus_queues.pop(corpus_resource_name, None)
+                return
+            if self._closed:
+                job = None
+            else:
+                job, target = queue.popleft()
+        if job is None:
+            self._abandon_corpus(corpus_resource_name, [], "El servidor se apagó antes de iniciar el trabajo")
+            return
+
+        try:
+            self._get_executor().submit(self._run, job, target)
+        except Exception as e:
+            self._abandon_corpus(corpus_resource_name, [job], str(e))
+
+    def _run(self, job: ImportJob, target: Callable[[ImportJob], None]) -> None:
+        job.status = JOB_RUNNING
+        job.started_at = time.time()
+        try:
+            target(job)
+        except Exception as e:
+            logger.exception(f"Error en el trabajo de ingesta {job.job_id}: {str(e)}")
+            job.errors.append({"path": "", "error": str(e)})
+        finally:
+            embedding_scheduler.finish(job.job_id)
+            job.finished_at = time.time()
+            if not job.errors and not job.failed_count:
+                job.status = JOB_SUCCEEDED
+            elif job.imported_count:
+                job.status = JOB_PARTIAL
+            else:
+                job.status = JOB_FAILED
+            logger.info(
+                f"Trabajo de ingesta {job.job_id} terminado: {job.status} "
+                f"({job.imported_count} importados, {job.failed_count} fallidos)"
+            )
+            self._dispatch_next(job.corpus_resource_name)
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self, corpus_name: Optional[str] = None) -> List[ImportJob]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        if corpus_name:
+            jobs = [
+                job for job in jobs
+                if corpus_name in (job.corpus_name, job.corpus_resource_name)
+            ]
+        return jobs
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        by_status: Dict[str, int] = {}
+        for job in jobs:
+            by_status[job.status] = by_status.get(job.status, 0) + 1
+        return {
+            "max_workers": self.max_workers,
+            "jobs": len(jobs),
+            "by_status": by_status,
+            "embedding_quota": embedding_scheduler.stats(),
+        }
+
+
+import_jobs = ImportJobManager(
+    max_workers=IMPORT_JOB_MAX_WORKERS,
+    history_size=IMPORT_JOB_HISTORY_SIZE,
+)
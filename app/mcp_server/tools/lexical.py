@@ -0,0 +1,462 @@
+"""
+Índice léxico BM25 local por corpus.
+
+La recuperación vectorial falla con coincidencias exactas (nombres de formatos, montos,
+nombres de oficinas). Este índice se alimenta durante la ingesta con el texto de los
+documentos, fragmentado como lo hace el backend, y su ranking se fusiona con el vectorial
+en rag_query. El BM25 se reconstruye una vez al terminar cada trabajo de ingesta, no al
+buscar: las búsquedas siguen usando el índice anterior hasta que el nuevo está listo.
+
+Las listas de postings se guardan en arreglos NumPy contiguos (formato CSR: offsets por
+término, ids de fragmento y frecuencias), que ocupan una fracción de un dict de listas y
+se persisten como .npz junto a un JSON por origen con el texto de sus fragmentos. NumPy se
+importa dentro de BM25Index, en la primera búsqueda o ingesta, para que el servidor no lo
+cargue al arrancar cuando el backend es Vertex.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import threading
+import unicodedata
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple
+
+from backends import get_backend
+from config import DEFAULT_CHUNK_OVERLAP, DEFAULT_CHUNK_SIZE
+from tools.chunking import chunk_text
+from tools.utils import corpus_versions
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+RAG_LEXICAL_INDEX_ENABLED = os.getenv("RAG_LEXICAL_INDEX_ENABLED", "true").lower() == "true"
+LEXICAL_INDEX_DIR = os.getenv("LEXICAL_INDEX_DIR", "./lexical_index")
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Términos en minúsculas y sin acentos; los números se conservan para que montos y folios
+    coincidan de forma exacta.
+    """
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return TOKEN_PATTERN.findall(stripped)
+
+
+class BM25Index:
+    """
+    Índice invertido inmutable sobre una lista de fragmentos `{source_uri, text}`.
+    """
+
+    def __init__(
+        self,
+        chunks: List[dict],
+        vocabulary: Dict[str, int],
+        offsets: "np.ndarray",
+        chunk_ids: "np.ndarray",
+        frequencies: "np.ndarray",
+        chunk_lengths: "np.ndarray",
+    ):
+        self.chunks = chunks
+        self.vocabulary = vocabulary
+        self.offsets = offsets
+        self.chunk_ids = chunk_ids
+        self.frequencies = frequencies
+        self.chunk_lengths = chunk_lengths
+        self.average_length = float(chunk_lengths.mean()) if len(chunk_lengths) else 0.0
+
+    @classmethod
+    def build(cls, chunks: List[dict], chunk_counts: List[Counter]) -> "BM25Index":
+        """
+        Construye el índice a partir de las frecuencias de términos de cada fragmento, ya
+        calculadas al ingerir, así que reconstruir no vuelve a tokenizar el corpus.
+        """
+        import numpy as np
+
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        chunk_lengths = np.zeros(len(chunks), dtype=np.float32)
+        for chunk_id, counts in enumerate(chunk_counts):
+            chunk_lengths[chunk_id] = sum(counts.values())
+            for term, count in counts.items():
+                postings.setdefault(term, []).append((chunk_id, count))
+
+        vocabulary = {term: term_id for term_id, term in enumerate(sorted(postings))}
+        offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        for term, term_id in vocabulary.items():
+            offsets[term_id + 1] = len(postings[term])
+        np.cumsum(offsets, out=offsets)
+
+        chunk_ids = np.empty(offsets[-1], dtype=np.int32)
+        frequencies = np.empty(offsets[-1], dtype=np.uint16)
+        for term, term_id in vocabulary.items():
+            start, end = offsets[term_id], offsets[term_id + 1]
+            term_postings = postings[term]
+            chunk_ids[start:end] = [chunk_id for chunk_id, _ in term_postings]
+            frequencies[start:end] = [min(count, 65535) for _, count in term_postings]
+
+        return cls(chunks, vocabulary, offsets, chunk_ids, frequencies, chunk_lengths)
+
+    def search(self, query: str, top_k: int) -> List[Tuple[int, float]]:
+        """
+        Devuelve hasta `top_k` pares (índice de fragmento, score BM25) de mayor a menor.
+        """
+        import numpy as np
+
+        if not self.chunks:
+            return []
+
+        scores = np.zeros(len(self.chunks), dtype=np.float32)
+        chunk_count = len(self.chunks)
+        for term in set(tokenize(query)):
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                continue
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            ids = self.chunk_ids[start:end]
+            frequencies = self.frequencies[start:end].astype(np.float32)
+            idf = math.log(1 + (chunk_count - (end - start) + 0.5) / ((end - start) + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self.chunk_lengths[ids] / (self.average_length or 1.0))
+            scores[ids] += idf * frequencies * (BM25_K1 + 1) / (frequencies + norm)
+
+        matched = np.flatnonzero(scores)
+        if not len(matched):
+            return []
+        best = matched[np.argsort(-scores[matched], kind="stable")[:top_k]]
+        return [(int(chunk_id), float(scores[chunk_id])) for chunk_id in best]
+
+    def save(self, path: str) -> None:
+        import numpy as np
+
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        temporary_path = f"{path}.tmp.npz"
+        np.savez(
+            temporary_path,
+            terms=np.array(terms, dtype=np.str_),
+            offsets=self.offsets,
+            chunk_ids=self.chunk_ids,
+            frequencies=self.frequencies,
+            chunk_lengths=self.chunk_lengths,
+        )
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path: str, chunks: List[dict]) -> "BM25Index":
+        import numpy as np
+
+        with np.load(path, allow_pickle=False) as data:
+            vocabulary = {str(term): term_id for term_id, term in enumerate(data["terms"])}
+            if len(data["chunk_lengths"]) != len(chunks):
+                raise ValueError("los arreglos no corresponden a los fragmentos guardados")
+            return cls(
+                chunks,
+                vocabulary,
+                data["offsets"],
+                data["chunk_ids"],
+                data["frequencies"],
+                data["chunk_lengths"],
+            )
+
+
+class CorpusLexicalIndex:
+    """
+    Fragmentos por `source_uri` de un corpus, sus frecuencias de términos y el BM25Index
+    construido sobre ellos.
+
+    Los orígenes ingeridos quedan en `pending` hasta que `LexicalIndexStore.publish` los
+    escribe y reconstruye el índice una sola vez por trabajo. `lock` serializa los cambios
+    del corpus sin bloquear a los demás; las búsquedas leen `index` sin tomarlo, porque se
+    reemplaza completo al terminar cada reconstrucción.
+    """
+
+    def __init__(self):
+        self.sources: Dict[str, List[str]] = {}
+        self.term_counts: Dict[str, List[Counter]] = {}
+        self.pending: Set[str] = set()
+        self.removed: Set[str] = set()
+        self.index: Optional[BM25Index] = None
+        self.reconciled_version: Optional[int] = None
+        self.lock = threading.Lock()
+
+    def chunks(self) -> List[dict]:
+        return [
+            {"source_uri": source_uri, "text": text}
+            for source_uri in sorted(self.sources)
+            for text in self.sources[source_uri]
+        ]
+
+    def chunk_counts(self) -> List[Counter]:
+        """
+        Frecuencias por fragmento en el orden de `chunks()`. Las de los orígenes cargados
+        de disco se calculan aquí la primera vez.
+        """
+        counts = []
+        for source_uri in sorted(self.sources):
+            source_counts = self.term_counts.get(source_uri)
+            if source_counts is None:
+                source_counts = [Counter(tokenize(text)) for text in self.sources[source_uri]]
+                self.term_counts[source_uri] = source_counts
+            counts.extend(source_counts)
+        return counts
+
+
+class LexicalIndexStore:
+    """
+    Índices léxicos de todos los corpus, persistidos en LEXICAL_INDEX_DIR: un directorio por
+    corpus con un JSON por origen y los arreglos del índice en un .npz. Publicar cambios solo
+    escribe los JSON de los orígenes que cambiaron. El lock del almacén solo protege el
+    registro de corpus; cada corpus tiene el suyo.
+
+    Las eliminaciones de documentos no pasan por aquí: cuando la versión del corpus cambia,
+    la siguiente búsqueda lista los archivos del corpus una vez y descarta los orígenes que
+    ya no están.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._corpora: Dict[str, CorpusLexicalIndex] = {}
+
+        self.indexed_sources = 0
+        self.rebuilds = 0
+        self.reconciliations = 0
+
+    def _corpus_dir(self, corpus_resource_name: str) -> str:
+        digest = hashlib.sha1(corpus_resource_name.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest)
+
+    def _paths(self, corpus_resource_name: str) -> Tuple[str, str]:
+        corpus_dir = self._corpus_dir(corpus_resource_name)
+        return os.path.join(corpus_dir, "sources"), os.path.join(corpus_dir, "index.npz")
+
+    @staticmethod
+    def _source_path(sources_dir: str, source_uri: str) -> str:
+        return os.path.join(sources_dir, hashlib.sha1(source_uri.encode("utf-8")).hexdigest() + ".json")
+
+    def _get(self, corpus_resource_name: str) -> CorpusLexicalIndex:
+        """Carga el índice del corpus desde disco si existe."""
+        with self._lock:
+            corpus_index = self._corpora.get(corpus_resource_name)
+            if corpus_index is not None:
+                return corpus_index
+
+        sources_dir, arrays_path = self._paths(corpus_resource_name)
+        corpus_index = CorpusLexicalIndex()
+        if os.path.isdir(sources_dir):
+            try:
+                for file_name in os.listdir(sources_dir):
+                    if not file_name.endswith(".json"):
+                        continue
+                    with open(os.path.join(sources_dir, file_name), encoding="utf-8") as source:
+                        data = json.load(source)
+                    corpus_index.sources[data["source_uri"]] = data["chunks"]
+                if os.path.exists(arrays_path):
+                    corpus_index.index = BM25Index.load(arrays_path, corpus_index.chunks())
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"No se pudo cargar el índice léxico de '{corpus_resource_name}': {str(e)}")
+                corpus_index.index = None
+        with self._lock:
+            return self._corpora.setdefault(corpus_resource_name, corpus_index)
+
+    def _publish(self, corpus_resource_name: str, corpus_index: CorpusLexicalIndex) -> None:
+        """
+        Escribe los orígenes pendientes, borra los eliminados, reconstruye el BM25Index y lo
+        publica. Debe llamarse con el lock del corpus adquirido.
+        """
+        sources_dir, arrays_path = self._paths(corpus_resource_name)
+        os.makedirs(sources_dir, exist_ok=True)
+        # Sin arreglos en disco, un proceso que caiga a media escritura reconstruye al cargar
+        if os.path.exists(arrays_path):
+            os.remove(arrays_path)
+
+        for source_uri in corpus_index.pending:
+            path = self._source_path(sources_dir, source_uri)
+            temporary_path = f"{path}.tmp"
+            with open(temporary_path, "w", encoding="utf-8") as target:
+                json.dump(
+                    {"source_uri": source_uri, "chunks": corpus_index.sources[source_uri]},
+                    target,
+                    ensure_ascii=False,
+                )
+            os.replace(temporary_path, path)
+        for source_uri in corpus_index.removed:
+            path = self._source_path(sources_dir, source_uri)
+            if os.path.exists(path):
+                os.remove(path)
+        corpus_index.pending.clear()
+        corpus_index.removed.clear()
+
+        index = BM25Index.build(corpus_index.chunks(), corpus_index.chunk_counts())
+        corpus_index.index = index
+        with self._lock:
+            self.rebuilds += 1
+        try:
+            index.save(arrays_path)
+        except OSError as e:
+            logger.warning(f"No se pudo guardar el índice léxico de '{corpus_resource_name}': {str(e)}")
+
+    def add_sources(self, corpus_resource_name: str, texts: Iterable[Tuple[str, str]]) -> int:
+        """
+        Fragmenta y tokeniza los textos `(source_uri, texto)`; un origen ya indexado se
+        reemplaza. Los cambios quedan pendientes hasta llamar a `publish`.
+
+        Returns:
+            int: Cuántos orígenes se agregaron
+        """
+        chunked = {
+            source_uri: chunk_text(text, DEFAULT_CHUNK_SIZE, DEFAULT_CHUNK_OVERLAP)
+            for source_uri, text in texts
+        }
+        if not chunked:
+            return 0
+        counts = {
+            source_uri: [Counter(tokenize(chunk)) for chunk in chunks]
+            for source_uri, chunks in chunked.items()
+        }
+
+        corpus_index = self._get(corpus_resource_name)
+        with corpus_index.lock:
+            corpus_index.sources.update(chunked)
+            corpus_index.term_counts.update(counts)
+            corpus_index.pending.update(chunked)
+            corpus_index.removed.difference_update(chunked)
+        with self._lock:
+            self.indexed_sources += len(chunked)
+        return len(chunked)
+
+    def publish(self, corpus_resource_name: str) -> None:
+        """
+        Persiste los cambios pendientes del corpus y reconstruye su índice una sola vez.
+        """
+        corpus_index = self._get(corpus_resource_name)
+        with corpus_index.lock:
+            if corpus_index.pending or corpus_index.removed or (corpus_index.index is None and corpus_index.sources):
+                self._publish(corpus_resource_name, corpus_index)
+
+    def retain(self, corpus_resource_name: str, source_uris: Set[str]) -> None:
+        corpus_index = self._get(corpus_resource_name)
+        with corpus_index.lock:
+            removed = set(corpus_index.sources) - source_uris
+            if removed:
+                for source_uri in removed:
+                    del corpus_index.sources[source_uri]
+                    corpus_index.term_counts.pop(source_uri, None)
+                corpus_index.pending.difference_update(removed)
+                corpus_index.removed.update(removed)
+                self._publish(corpus_resource_name, corpus_index)
+
+    def drop(self, corpus_resource_name: str) -> None:
+        corpus_index = self._get(corpus_resource_name)
+        with corpus_index.lock:
+            with self._lock:
+                self._corpora.pop(corpus_resource_name, None)
+            shutil.rmtree(self._corpus_dir(corpus_resource_name), ignore_errors=True)
+
+    def _reconcile(self, corpus_resource_name: str) -> None:
+        version = corpus_versions.get(corpus_resource_name)
+        corpus_index = self._get(corpus_resource_name)
+        if not corpus_index.sources or corpus_index.reconciled_version == version:
+            return
+
+        try:
+            files = get_backend().list_files(corpus_resource_name)
+        except Exception as e:
+            logger.warning(f"No se pudo verificar el índice léxico de '{corpus_resource_name}': {str(e)}")
+            return
+
+        self.retain(corpus_resource_name, {getattr(rag_file, "source_uri", "") for rag_file in files})
+        corpus_index.reconciled_version = version
+        with self._lock:
+            self.reconciliations += 1
+
+    def search(self, corpus_resource_name: str, query: str, top_k: int) -> List[dict]:
+        """
+        Busca en el índice léxico del corpus.
+
+        Returns:
+            List[dict]: Fragmentos con source_uri, source_name, text y score BM25, de mayor a menor
+        """
+        self._reconcile(corpus_resource_name)
+
+        corpus_index = self._get(corpus_resource_name)
+        if corpus_index.index is None:
+            # Solo ocurre con un índice en disco sin sus arreglos (por ejemplo, si falló el guardado)
+            self.publish(corpus_resource_name)
+        index = corpus_index.index
+        if index is None:
+            return []
+
+        results = []
+        for chunk_id, score in index.search(query, top_k):
+            chunk = index.chunks[chunk_id]
+            results.append({
+                "source_uri": chunk["source_uri"],
+                "source_name": chunk["source_uri"].rsplit("/", 1)[-1],
+                "text": chunk["text"],
+                "score": score,
+            })
+        return results
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": RAG_LEXICAL_INDEX_ENABLED,
+                "corpora_loaded": len(self._corpora),
+                "sources": sum(len(corpus.sources) for corpus in self._corpora.values()),
+                "pending_sources": sum(len(corpus.pending) for corpus in self._corpora.values()),
+                "postings": sum(
+                    len(corpus.index.chunk_ids) for corpus in self._corpora.values() if corpus.index
+                ),
+                "indexed_sources": self.indexed_sources,
+                "rebuilds": self.rebuilds,
+                "reconciliations": self.reconciliations,
+            }
+
+
+def index_paths(corpus_resource_name: str, paths: List[str]) -> int:
+    """
+    Agrega al índice léxico, como cambios pendientes, el texto de las rutas recién
+    importadas; `publish_index` los publica al terminar la ingesta. Un error aquí solo se
+    registra: el índice léxico complementa la recuperación y no debe hacer fallar la ingesta.
+    """
+    if not RAG_LEXICAL_INDEX_ENABLED:
+        return 0
+
+    backend = get_backend()
+    texts = []
+    for path in paths:
+        try:
+            texts.extend(backend.read_source_texts(path))
+        except Exception as e:
+            logger.warning(f"No se pudo leer '{path}' para el índice léxico: {str(e)}")
+    try:
+        return lexical_index.add_sources(corpus_resource_name, texts)
+    except Exception as e:
+        logger.warning(f"No se pudo indexar {paths} en el índice léxico: {str(e)}")
+        return 0
+
+
+def publish_index(corpus_resource_name: str) -> None:
+    """
+    Publica los cambios pendientes del índice léxico del corpus: una reconstrucción por
+    trabajo de ingesta en lugar de una por lote u objeto.
+    """
+    if not RAG_LEXICAL_INDEX_ENABLED:
+        return
+    try:
+        lexical_index.publish(corpus_resource_name)
+    except Exception as e:
+        logger.warning(f"No se pudo publicar el índice léxico de '{corpus_resource_name}': {str(e)}")
+
+
+lexical_index = LexicalIndexStore(LEXICAL_INDEX_DIR)
@@ -3,15 +3,15 @@ Herramienta para listar todos los corpus RAG disponibles de Vertex AI.
 """
 
 from typing import Dict, List, Union
-from vertexai import rag
 from google.adk.tools import ToolContext, FunctionTool
 
-DESCRIPTION = "Lista todos los corpus RAG disponibles en Vertex AI"
-SCHEMA = {
-    "type": "object",
-    "properties": {},
-    "required": []
-}
+from backends import get_backend
+
+from tools.singleflight import singleflight
+from tools.utils import corpus_registry
+
+# El mensaje enumera en texto los mismos corpus que ya van en "corpora"
+REDUNDANT_MESSAGE = True
 
 def list_corpora(tool_context: ToolContext = None) -> dict:
     """
@@ -25,7 +25,9 @@ def list_corpora(tool_context: ToolContext = None) -> dict:
             - update_time: Cuando se actualizó por última vez el corpus
     """
     try:
-        corpora = rag.list_corpora()
+        # Misma llave que las recargas del registro: tampoco se une a un listado que empezó
+        # antes de la última invalidación
+        corpora = singleflight.do(("list_corpora", corpus_registry.generation), get_backend().list_corpora)
 
         corpus_info: List[Dict[str, Union[str, int]]] = []
         for corpus in corpora:
@@ -0,0 +1,76 @@
+"""
+Manifiesto de sincronización por corpus: qué generación y checksum de cada objeto de
+origen se importó por última vez. Se guarda como JSON en SYNC_MANIFEST_DIR.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+SYNC_MANIFEST_DIR = os.getenv("SYNC_MANIFEST_DIR", "./sync_manifests")
+
+_lock = threading.Lock()
+
+
+def manifest_path(corpus_resource_name: str) -> str:
+    digest = hashlib.sha1(corpus_resource_name.encode("utf-8")).hexdigest()
+    return os.path.join(SYNC_MANIFEST_DIR, f"{digest}.json")
+
+
+class SyncManifest:
+    """
+    Entradas `source_uri -> {generation, checksum, rag_file, synced_at}` de un corpus.
+
+    Las escrituras son atómicas (archivo temporal + os.replace), así que una sincronización
+    interrumpida deja el manifiesto anterior intacto y la siguiente retoma lo pendiente.
+    """
+
+    def __init__(self, corpus_resource_name: str, entries: Optional[Dict[str, dict]] = None):
+        self.corpus_resource_name = corpus_resource_name
+        self.entries: Dict[str, dict] = entries or {}
+
+    @classmethod
+    def load(cls, corpus_resource_name: str) -> "SyncManifest":
+        path = manifest_path(corpus_resource_name)
+        with _lock:
+            if not os.path.exists(path):
+                return cls(corpus_resource_name)
+            with open(path, encoding="utf-8") as source:
+                data = json.load(source)
+        return cls(corpus_resource_name, data.get("entries", {}))
+
+    def record(self, source_uri: str, generation: str, checksum: str, rag_file: str) -> None:
+        self.entries[source_uri] = {
+            "generation": generation,
+            "checksum": checksum,
+            "rag_file": rag_file,
+            "synced_at": time.time(),
+        }
+
+    def forget(self, source_uri: str) -> None:
+        self.entries.pop(source_uri, None)
+
+    def save(self) -> None:
+        path = manifest_path(self.corpus_resource_name)
+        data = {
+            "corpus": self.corpus_resource_name,
+            "updated_at": time.time(),
+            "entries": self.entries,
+        }
+        with _lock:
+            os.makedirs(SYNC_MANIFEST_DIR, exist_ok=True)
+            temporary_path = f"{path}.tmp"
+            with open(temporary_path, "w", encoding="utf-8") as target:
+                json.dump(data, target, ensure_ascii=False)
+            os.replace(temporary_path, path)
+
+
+def delete_manifest(corpus_resource_name: str) -> None:
+    with _lock:
+        try:
+            os.remove(manifest_path(corpus_resource_name))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,198 @@
+"""
+Empaquetado de resultados de recuperación dentro de un presupuesto de tokens.
+
+Los fragmentos de un mismo documento suelen traslaparse (el chunking usa `chunk_overlap`)
+o repetirse entre corpus. Antes de entregarlos al agente se fusionan los fragmentos
+contiguos de cada `source_uri`, se eliminan los pasajes con el mismo texto normalizado
+aunque vengan de otro documento o corpus, y se recorta la lista, en orden de relevancia,
+hasta el presupuesto configurado.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from .fusion import relevance_scores
+
+CHARS_PER_TOKEN = 4
+MIN_OVERLAP_WORDS = 3
+MIN_TRUNCATED_TOKENS = 32
+TRUNCATION_MARK = " …"
+
+WORD_PATTERN = re.compile(r"\S+")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimación barata de tokens (~4 caracteres por token), suficiente para presupuestar
+    sin cargar un tokenizer.
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _words(text: str) -> List[re.Match]:
+    return list(WORD_PATTERN.finditer(text))
+
+
+def merge_overlapping(first: str, second: str, min_overlap: int = MIN_OVERLAP_WORDS) -> Optional[str]:
+    """
+    Une dos fragmentos si uno contiene al otro o si el final de `first` coincide con el
+    inicio de `second` en al menos `min_overlap` palabras. Devuelve None si no se traslapan.
+    """
+    first_words = [match.group() for match in _words(first)]
+    second_matches = _words(second)
+    second_words = [match.group() for match in second_matches]
+    if not first_words or not second_words:
+        return first or second
+
+    first_joined = f" {' '.join(first_words)} "
+    second_joined = f" {' '.join(second_words)} "
+    if second_joined in first_joined:
+        return first
+    if first_joined in second_joined:
+        return second
+
+    # Se prueba primero el traslape más largo posible
+    for start in range(max(0, len(first_words) - len(second_words) + 1), len(first_words) - min_overlap + 1):
+        overlap = len(first_words) - start
+        if first_words[start:] == second_words[:overlap]:
+            return first.rstrip() + " " + second[second_matches[overlap].start():]
+    return None
+
+
+def _merge_group(entries: List[dict]) -> List[dict]:
+    """
+    Fusiona repetidamente los fragmentos de un mismo documento hasta que ninguno se traslape.
+    Cada entrada conserva la mayor relevancia de los fragmentos que la forman.
+    """
+    merged = [dict(entry) for entry in entries]
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(merged)):
+            for j in range(len(merged)):
+                if i == j:
+                    continue
+                text = merge_overlapping(merged[i]["text"], merged[j]["text"])
+                if text is None:
+                    continue
+                keep, drop = (i, j) if merged[i]["_relevance"] >= merged[j]["_relevance"] else (j, i)
+                combined = merged[keep]
+                combined["text"] = text
+                combined["merged_chunks"] = merged[i].get("merged_chunks", 1) + merged[j].get("merged_chunks", 1)
+                del merged[drop]
+                changed = True
+                break
+            if changed:
+                break
+    return merged
+
+
+def _normalized(text: str) -> str:
+    return " ".join(WORD_PATTERN.findall(text)).casefold()
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    max_chars = max_tokens * CHARS_PER_TOKEN - len(TRUNCATION_MARK)
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind(" ", 0, max_chars)
+    return text[:cut if cut > 0 else max_chars].rstrip() + TRUNCATION_MARK
+
+
+def _merged_candidates(results: List[dict]) -> List[dict]:
+    """
+    Fusiona los fragmentos traslapados de cada documento, los ordena por relevancia y
+    descarta los que repiten el texto de uno más relevante de otro documento o corpus. Las
+    entradas llevan `_relevance` y `_rank`, que quien las use debe retirar.
+    """
+    if all("fused_score" in result for result in results):
+        relevance = [float(result["fused_score"]) for result in results]
+    else:
+        relevance = relevance_scores(results)
+
+    groups: Dict[Tuple[str, str], List[dict]] = {}
+    for rank, (result, score) in enumerate(zip(results, relevance)):
+        entry = dict(result, _relevance=score, _rank=rank)
+        key = (result.get("corpus_name", ""), result.get("source_uri", "") or f"#{rank}")
+        groups.setdefault(key, []).append(entry)
+
+    merged = [entry for entries in groups.values() for entry in _merge_group(entries)]
+    merged.sort(key=lambda entry: (-entry["_relevance"], entry["_rank"]))
+
+    # Un mismo pasaje indexado en varios corpus solo se entrega una vez, desde el más relevante
+    candidates: List[dict] = []
+    seen: Dict[str, dict] = {}
+    for entry in merged:
+        text = _normalized(entry.get("text", ""))
+        kept = seen.get(text) if text else None
+        if kept is not None:
+            kept["merged_chunks"] = kept.get("merged_chunks", 1) + entry.get("merged_chunks", 1)
+            continue
+        if text:
+            seen[text] = entry
+        candidates.append(entry)
+    return candidates
+
+
+def merge_duplicates(results: List[dict]) -> List[dict]:
+    """
+    Fusiona los fragmentos repetidos o traslapados de un mismo documento y los pasajes
+    idénticos de distintos corpus, conservando el orden de relevancia. Se usa antes del
+    reranking para que un mismo pasaje no ocupe varios lugares del top-k.
+    """
+    if not results:
+        return []
+    candidates = _merged_candidates(results)
+    for entry in candidates:
+        del entry["_relevance"], entry["_rank"]
+    return candidates
+
+
+def pack_results(results: List[dict], token_budget: int) -> Tuple[List[dict], Dict[str, int]]:
+    """
+    Deduplica, fusiona y recorta una lista de resultados ordenada por relevancia.
+
+    La relevancia se toma de `fused_score` cuando existe (resultados multi-corpus) o del
+    `score` normalizado de la lista. Los resultados se agregan en ese orden mientras quepan
+    en `token_budget`; el primero que no cabe se trunca si aún queda espacio útil y el resto
+    se descarta. Con `token_budget <= 0` solo se deduplica y fusiona.
+
+    Returns:
+        Tuple[List[dict], Dict[str, int]]: Los resultados empaquetados y un resumen con los
+        tokens estimados antes y después, los fragmentos fusionados y los descartados
+    """
+    if not results:
+        return [], {"tokens_before": 0, "tokens_after": 0, "merged": 0, "dropped": 0, "truncated": 0}
+
+    candidates = _merged_candidates(results)
+
+    tokens_before = sum(estimate_tokens(result.get("text", "")) for result in results)
+    packed: List[dict] = []
+    used = 0
+    truncated = 0
+    for entry in candidates:
+        tokens = estimate_tokens(entry["text"])
+        if token_budget > 0 and used + tokens > token_budget:
+            remaining = token_budget - used
+            if remaining < MIN_TRUNCATED_TOKENS and packed:
+                break
+            entry["text"] = _truncate(entry["text"], max(remaining, MIN_TRUNCATED_TOKENS))
+            tokens = estimate_tokens(entry["text"])
+            truncated += 1
+            packed.append(entry)
+            used += tokens
+            break
+        packed.append(entry)
+        used += tokens
+
+    for entry in packed:
+        del entry["_relevance"], entry["_rank"]
+
+    summary = {
+        "tokens_before": tokens_before,
+        "tokens_after": used,
+        "merged": len(results) - len(candidates),
+        "dropped": len(candidates) - len(packed),
+        "truncated": truncated,
+    }
+    return packed, summary
@@ -2,43 +2,238 @@
 Herramienta para consultar corpus RAG de Vertex AI y recuperar información relevante.
 """
 
+import os
+import re
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
 from google.adk.tools import ToolContext, FunctionTool
-from vertexai import rag
 
+from backends import get_backend
 from config import (
     DEFAULT_DISTANCE_THRESHOLD,
     DEFAULT_TOP_K,
     CORPUS_NAME,
 )
-from .utils import check_corpus_exists, get_corpus_resource_name
-
-DESCRIPTION = "Busca información en un corpus RAG. Puedes especificar el corpus en el query de forma natural."
-
-SCHEMA = {
-    "type": "object",
-    "properties": {
-        "query": {
-            "type": "string",
-            "description": (
-                "La pregunta o búsqueda que deseas hacer. Puedes mencionar el corpus específico "
-                "en lenguaje natural (ej: 'en el corpus de trámites') o dejarlo para usar el corpus por defecto"
+from .cache import retrieval_cache
+from .fusion import FUSION_METHODS
+from .lexical import RAG_LEXICAL_INDEX_ENABLED, lexical_index
+from .packing import merge_duplicates, pack_results
+from .rerank import rerank
+from .singleflight import singleflight
+from .utils import check_corpus_exists, get_corpus_resource_name, corpus_versions
+
+RAG_QUERY_FANOUT_WORKERS = int(os.getenv("RAG_QUERY_FANOUT_WORKERS", "8"))
+RAG_FUSION_METHOD = os.getenv("RAG_FUSION_METHOD", "rrf")
+RAG_CONTEXT_TOKEN_BUDGET = int(os.getenv("RAG_CONTEXT_TOKEN_BUDGET", "2000"))
+RAG_HYBRID_CANDIDATES = int(os.getenv("RAG_HYBRID_CANDIDATES", "10"))
+RAG_RERANK_ENABLED = os.getenv("RAG_RERANK_ENABLED", "true").lower() == "true"
+
+PROCESS_SAFE = False
+
+fanout_executor = ThreadPoolExecutor(
+    max_workers=RAG_QUERY_FANOUT_WORKERS,
+    thread_name_prefix="rag-fanout",
+)
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normaliza una consulta para usarla como llave de caché: unicode NFC, minúsculas,
+    espacios colapsados y sin signos de puntuación en los extremos.
+    """
+    normalized = unicodedata.normalize("NFC", query).casefold()
+    normalized = re.sub(r"\s+", " ", normalized)
+    return normalized.strip(" ¿?¡!.,;:")
+
+
+def retrieve(corpus_resource_name: str, query: str) -> List[dict]:
+    """
+    Ejecuta la consulta de recuperación sobre un corpus y devuelve los contextos como diccionarios.
+
+    Los resultados se cachean por consulta normalizada, corpus, DEFAULT_TOP_K,
+    DEFAULT_DISTANCE_THRESHOLD y la versión actual del corpus, de modo que cualquier
+    ingesta o eliminación sobre el corpus invalida sus entradas.
+
+    Args:
+        corpus_resource_name (str): El nombre completo del recurso del corpus
+        query (str): La consulta de texto
+
+    Returns:
+        List[dict]: Los contextos recuperados con source_uri, source_name, text y score
+    """
+    cache_key = (
+        normalize_query(query),
+        corpus_resource_name,
+        DEFAULT_TOP_K,
+        DEFAULT_DISTANCE_THRESHOLD,
+        corpus_versions.get(corpus_resource_name),
+    )
+
+    cached = retrieval_cache.get(cache_key)
+    if cached is None:
+        # Las consultas idénticas simultáneas comparten una sola llamada al backend
+        cached = singleflight.do(
+            ("retrieval_query",) + cache_key,
+            lambda: fetch_contexts(corpus_resource_name, query, cache_key),
+        )
+    return [dict(result) for result in cached]
+
+def fetch_contexts(corpus_resource_name: str, query: str, cache_key: tuple) -> tuple:
+    """
+    Llama a la recuperación del backend y guarda en caché los contextos como una tupla
+    de diccionarios, que se comparte entre las llamadas agrupadas por singleflight.
+
+    Con la búsqueda híbrida se piden RAG_HYBRID_CANDIDATES candidatos vectoriales, se
+    fusionan con los del índice léxico BM25, se unen los fragmentos traslapados de cada
+    documento y el reranker local elige los DEFAULT_TOP_K finales.
+    """
+    hybrid = RAG_LEXICAL_INDEX_ENABLED or RAG_RERANK_ENABLED
+    candidates = max(DEFAULT_TOP_K, RAG_HYBRID_CANDIDATES) if hybrid else DEFAULT_TOP_K
+
+    contexts = get_backend().retrieval_query(
+        corpus_resource_name,
+        text=query,
+        top_k=candidates,
+        distance_threshold=DEFAULT_DISTANCE_THRESHOLD,
+    )
+
+    results = []
+    for ctx_group in contexts:
+        result = {
+            "source_uri": (
+                ctx_group.source_uri if hasattr(ctx_group, "source_uri") else ""
             ),
-        },
-        "corpus_name": {
-            "type": "string",
-            "description": (
-                "Nombre específico del corpus donde buscar. Opcional: si no se proporciona, "
-                "se usará el corpus por defecto o se intentará extraer del query"
+            "source_name": (
+                ctx_group.source_display_name
+                if hasattr(ctx_group, "source_display_name")
+                else ""
             ),
-        },
-    },
-    "required": ["query"],
-}
+            "text": ctx_group.text if hasattr(ctx_group, "text") else "",
+            "score": ctx_group.score if hasattr(ctx_group, "score") else 0.0,
+        }
+        results.append(result)
+
+    if RAG_LEXICAL_INDEX_ENABLED:
+        lexical = lexical_index.search(corpus_resource_name, query, candidates)
+        if lexical:
+            fuse = FUSION_METHODS.get(RAG_FUSION_METHOD, FUSION_METHODS["rrf"])
+            results = fuse({"vector": results, "lexical": lexical}, top_k=candidates)
+            for result in results:
+                result["score"] = result.pop("fused_score")
+
+    if hybrid:
+        results = merge_duplicates(results)
+
+    if RAG_RERANK_ENABLED:
+        results = rerank(query, results, DEFAULT_TOP_K)
+    else:
+        results = results[:DEFAULT_TOP_K]
+
+    shared = tuple(results)
+    retrieval_cache.set(cache_key, shared)
+    return shared
+
+def query_corpus(query: str, corpus_name: str, tool_context: ToolContext) -> dict:
+    """
+    Consulta un corpus dentro de una búsqueda multi-corpus y mide su latencia.
+
+    Returns:
+        dict: El nombre del corpus, sus resultados o su error, y la latencia en milisegundos
+    """
+    started = time.perf_counter()
+    try:
+        if tool_context and not check_corpus_exists(corpus_name, tool_context):
+            return {
+                "corpus_name": corpus_name,
+                "error": f"El corpus '{corpus_name}' no existe",
+                "results": [],
+                "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+            }
+
+        results = retrieve(get_corpus_resource_name(corpus_name), query)
+        for result in results:
+            result["corpus_name"] = corpus_name
+
+        return {
+            "corpus_name": corpus_name,
+            "results": results,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+    except Exception as e:
+        return {
+            "corpus_name": corpus_name,
+            "error": str(e),
+            "results": [],
+            "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+def rag_query_multi(query: str, corpus_names: List[str], tool_context: ToolContext) -> dict:
+    """
+    Consulta varios corpus en paralelo y fusiona sus resultados en una sola lista top-k
+    con el método configurado en RAG_FUSION_METHOD ("rrf" o "score"), empaquetada dentro
+    de RAG_CONTEXT_TOKEN_BUDGET.
+    """
+    started = time.perf_counter()
+    fuse = FUSION_METHODS.get(RAG_FUSION_METHOD, FUSION_METHODS["rrf"])
+
+    futures = [
+        fanout_executor.submit(query_corpus, query, name, tool_context)
+        for name in corpus_names
+    ]
+    outcomes = [future.result() for future in futures]
+
+    ranked_lists = {
+        outcome["corpus_name"]: outcome["results"]
+        for outcome in outcomes
+        if outcome["results"]
+    }
+    results, packing = pack_results(fuse(ranked_lists, top_k=DEFAULT_TOP_K), RAG_CONTEXT_TOKEN_BUDGET)
+
+    corpus_latency_ms = {outcome["corpus_name"]: outcome["latency_ms"] for outcome in outcomes}
+    corpus_errors = {
+        outcome["corpus_name"]: outcome["error"]
+        for outcome in outcomes
+        if "error" in outcome
+    }
+
+    response = {
+        "query": query,
+        "corpus_names": corpus_names,
+        "fusion_method": RAG_FUSION_METHOD if RAG_FUSION_METHOD in FUSION_METHODS else "rrf",
+        "results": results,
+        "results_count": len(results),
+        "packing": packing,
+        "corpus_latency_ms": corpus_latency_ms,
+        "total_latency_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+    if corpus_errors:
+        response["corpus_errors"] = corpus_errors
+
+    if len(corpus_errors) == len(corpus_names):
+        response.update({
+            "status": "error",
+            "message": "No fue posible consultar ninguno de los corpus solicitados",
+        })
+    elif not results:
+        response.update({
+            "status": "warning",
+            "message": f"No se encontro información en los corpus {corpus_names} para la consulta: '{query}'",
+        })
+    else:
+        response.update({
+            "status": "success",
+            "message": f"Se obtuvo la siguiente información de los corpus {list(ranked_lists)} \n",
+        })
+    return response
 
 def rag_query(
     query: str,
     tool_context: ToolContext,
     corpus_name: str = None,
+    corpus_names: List[str] = None,
 ) -> dict:
     """
     Consulta un corpus RAG de Vertex AI con una pregunta del usuario.
@@ -51,13 +246,21 @@ def rag_query(
         query (str): La consulta de texto. Puede incluir el nombre del corpus en lenguaje natural.
         tool_context (ToolContext, opcional): El contexto de la herramienta
         corpus_name (str, opcional): Nombre específico del corpus. Si no se proporciona, usa CORPUS_NAME por defecto.
+        corpus_names (List[str], opcional): Varios corpus a consultar en paralelo; sus resultados
+                                            se fusionan en una sola lista top-k.
     
     Returns:
-        dict: Los resultados de la consulta y el estado
+        dict: Los resultados de la consulta, deduplicados y recortados a RAG_CONTEXT_TOKEN_BUDGET
+              tokens estimados, y el estado
     """
     try:
-        if not corpus_name:
-            corpus_name = CORPUS_NAME
+        requested = list(dict.fromkeys(
+            name for name in [corpus_name, *(corpus_names or [])] if name
+        ))
+        if len(requested) > 1:
+            return rag_query_multi(query, requested, tool_context)
+
+        corpus_name = requested[0] if requested else CORPUS_NAME
         
         if tool_context and not check_corpus_exists(corpus_name, tool_context):
             return {
@@ -69,38 +272,11 @@ def rag_query(
 
         corpus_resource_name = get_corpus_resource_name(corpus_name)
 
-        rag_retrieval_config = rag.RagRetrievalConfig(
-            top_k=DEFAULT_TOP_K,
-            filter=rag.Filter(vector_distance_threshold=DEFAULT_DISTANCE_THRESHOLD),
-        )
-
-        response = rag.retrieval_query(
-            rag_resources=[
-                rag.RagResource(
-                    rag_corpus=corpus_resource_name,
-                )
-            ],
-            text=query,
-            rag_retrieval_config=rag_retrieval_config,
+        results, packing = pack_results(
+            retrieve(corpus_resource_name, query),
+            RAG_CONTEXT_TOKEN_BUDGET,
         )
 
-        results = []
-        if hasattr(response, "contexts") and response.contexts:
-            for ctx_group in response.contexts.contexts:
-                result = {
-                    "source_uri": (
-                        ctx_group.source_uri if hasattr(ctx_group, "source_uri") else ""
-                    ),
-                    "source_name": (
-                        ctx_group.source_display_name
-                        if hasattr(ctx_group, "source_display_name")
-                        else ""
-                    ),
-                    "text": ctx_group.text if hasattr(ctx_group, "text") else "",
-                    "score": ctx_group.score if hasattr(ctx_group, "score") else 0.0,
-                }
-                results.append(result)
-
         if not results:
             return {
                 "status": "warning",
@@ -118,6 +294,7 @@ def rag_query(
             "corpus_name": corpus_name,
             "results": results,
             "results_count": len(results),
+            "packing": packing,
         }
 
     except Exception as e:
@@ -0,0 +1,67 @@
+"""
+Reordenamiento local de los candidatos de recuperación.
+
+Un cross-encoder sería más preciso, pero cuesta una llamada a un modelo por consulta. Este
+reranker solo mira el texto: qué parte de los términos de la consulta aparece en el
+fragmento, cuántos pares de palabras consecutivos coinciden y si los números de la consulta
+(montos, folios, artículos) aparecen tal cual.
+"""
+
+import os
+from typing import List
+
+from .fusion import relevance_scores
+from .lexical import tokenize
+
+RERANK_RETRIEVAL_WEIGHT = float(os.getenv("RERANK_RETRIEVAL_WEIGHT", "0.5"))
+
+
+def text_match_score(query_terms: List[str], text: str) -> float:
+    """
+    Score en [0, 1]: cobertura de términos (60%), pares consecutivos (25%) y números (15%).
+    """
+    if not query_terms:
+        return 0.0
+
+    text_terms = tokenize(text)
+    vocabulary = set(text_terms)
+    unique_terms = set(query_terms)
+    coverage = len(unique_terms & vocabulary) / len(unique_terms)
+
+    query_bigrams = set(zip(query_terms, query_terms[1:]))
+    bigrams = (
+        len(query_bigrams & set(zip(text_terms, text_terms[1:]))) / len(query_bigrams)
+        if query_bigrams else coverage
+    )
+
+    numbers = {term for term in unique_terms if term.isdigit()}
+    number_match = len(numbers & vocabulary) / len(numbers) if numbers else coverage
+
+    return 0.6 * coverage + 0.25 * bigrams + 0.15 * number_match
+
+
+def rerank(query: str, candidates: List[dict], top_k: int) -> List[dict]:
+    """
+    Reordena los candidatos combinando su score de recuperación normalizado con el de
+    coincidencia textual, ponderados por RERANK_RETRIEVAL_WEIGHT.
+
+    Args:
+        query (str): La consulta original
+        candidates (List[dict]): Candidatos ordenados por relevancia de recuperación
+        top_k (int): Número máximo de resultados a devolver
+
+    Returns:
+        List[dict]: Los candidatos con `score` reemplazado por el score de reranking (mayor es mejor)
+    """
+    query_terms = tokenize(query)
+    reranked = []
+    for candidate, retrieval_score in zip(candidates, relevance_scores(candidates)):
+        result = dict(candidate)
+        result["score"] = (
+            RERANK_RETRIEVAL_WEIGHT * retrieval_score
+            + (1 - RERANK_RETRIEVAL_WEIGHT) * text_match_score(query_terms, candidate.get("text", ""))
+        )
+        reranked.append(result)
+
+    reranked.sort(key=lambda result: result["score"], reverse=True)
+    return reranked[:top_k]
@@ -0,0 +1,6 @@
+"""
+Descripciones y esquemas de entrada de las herramientas MCP, uno por módulo de herramienta.
+
+Estos módulos solo usan la biblioteca estándar: el catálogo de `tools/list` los importa
+sin cargar los SDK que necesitan las herramientas.
+"""
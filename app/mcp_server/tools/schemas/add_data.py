@@ -0,0 +1,24 @@
+"""
+Descripción y esquema de entrada de la herramienta add_data.
+"""
+
+DESCRIPTION = (
+    "Agrega nuevos documentos al corpus RAG desde rutas de Google Cloud Storage (gs://). "
+    "La importación se ejecuta en segundo plano y devuelve un job_id para consultar su avance con get_import_status."
+)
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "corpus_name": {
+            "type": "string",
+            "description": "Nombre del corpus RAG",
+        },
+        "paths": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Lista de rutas GCS. Ejemplo: ['gs://bucket/archivo.pdf', 'gs://bucket/carpeta/']"
+        }
+    },
+    "required": ["paths"]
+}
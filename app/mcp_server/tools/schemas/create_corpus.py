@@ -0,0 +1,15 @@
+"""
+Descripción y esquema de entrada de la herramienta create_corpus.
+"""
+
+DESCRIPTION = "Crea un nuevo corpus RAG de Vertex AI con el nombre especificado."
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "corpus_name": {
+            "type": "string",
+            "description": "El nombre para el nuevo corpus"
+        }
+    },
+}
@@ -0,0 +1,19 @@
+"""
+Descripción y esquema de entrada de la herramienta delete_corpus.
+"""
+
+DESCRIPTION = "Elimina un corpus RAG de Vertex AI cuando ya no se necesita. Requiere confirmación para evitar eliminaciones accidentales."
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "corpus_name": {
+            "type": "string",
+            "description": "El nombre completo del recurso del corpus a eliminar. Preferiblemente use el resource_name de los resultados de list_corpora."
+        },
+        "confirm": {
+            "type": "boolean",
+            "description": "Debe establecerse en True para confirmar la eliminación"
+        }
+    },
+}
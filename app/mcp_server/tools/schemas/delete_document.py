@@ -0,0 +1,20 @@
+"""
+Descripción y esquema de entrada de la herramienta delete_document.
+"""
+
+DESCRIPTION = "Elimina un documento específico de un corpus RAG de Vertex AI."
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "corpus_name": {
+            "type": "string",
+            "description": "El nombre completo del recurso del corpus que contiene el documento. Preferiblemente use el resource_name de los resultados de list_corpora."
+        },
+        "document_id": {
+            "type": "string",
+            "description": "El ID del documento/archivo específico a eliminar. Esto se puede obtener de los resultados de get_corpus_info."
+        }
+    },
+    "required": ["corpus_name", "document_id"],
+}
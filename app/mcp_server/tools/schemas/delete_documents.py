@@ -0,0 +1,32 @@
+"""
+Descripción y esquema de entrada de la herramienta delete_documents.
+"""
+
+DESCRIPTION = (
+    "Elimina varios documentos de un corpus RAG en una sola llamada, por lista de IDs o por "
+    "prefijo de ruta de origen (gs://). Sin confirm=True solo devuelve los documentos que se eliminarían."
+)
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "corpus_name": {
+            "type": "string",
+            "description": "El nombre completo del recurso del corpus. Preferiblemente use el resource_name de los resultados de list_corpora."
+        },
+        "document_ids": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "IDs de los documentos a eliminar, obtenidos de get_corpus_info"
+        },
+        "source_uri_prefix": {
+            "type": "string",
+            "description": "Elimina todos los documentos cuya ruta de origen empieza con este prefijo. Ejemplo: 'gs://bucket/carpeta/'"
+        },
+        "confirm": {
+            "type": "boolean",
+            "description": "Debe establecerse en True para eliminar; con False solo se listan los documentos encontrados"
+        }
+    },
+    "required": ["corpus_name"],
+}
@@ -0,0 +1,44 @@
+"""
+Descripción y esquema de entrada de la herramienta get_corpus_info.
+"""
+
+import os
+
+GET_CORPUS_INFO_PAGE_SIZE = int(os.getenv("GET_CORPUS_INFO_PAGE_SIZE", "50"))
+GET_CORPUS_INFO_MAX_PAGE_SIZE = int(os.getenv("GET_CORPUS_INFO_MAX_PAGE_SIZE", "200"))
+
+FILE_FIELDS = ("file_id", "display_name", "source_uri", "create_time", "update_time")
+
+DESCRIPTION = (
+    "Obtiene información sobre un corpus RAG específico y una página de sus archivos. "
+    "Usa count_only para conocer solo la cantidad de documentos, fields para elegir los "
+    "campos de cada archivo y page_token para continuar con la página siguiente."
+)
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "corpus_name": {
+            "type": "string",
+            "description": "El nombre completo del recurso del corpus sobre el que se desea obtener información.",
+        },
+        "page_size": {
+            "type": "integer",
+            "description": f"Cantidad de archivos por página (por defecto {GET_CORPUS_INFO_PAGE_SIZE}, máximo {GET_CORPUS_INFO_MAX_PAGE_SIZE}).",
+        },
+        "page_token": {
+            "type": "string",
+            "description": "El next_page_token devuelto por una llamada anterior para obtener la página siguiente.",
+        },
+        "fields": {
+            "type": "array",
+            "items": {"type": "string", "enum": list(FILE_FIELDS)},
+            "description": "Campos a incluir por archivo. Por defecto se incluyen todos.",
+        },
+        "count_only": {
+            "type": "boolean",
+            "description": "Si es true, devuelve solo la cantidad total de archivos del corpus.",
+        },
+    },
+    "required": ["corpus_name"],
+}
@@ -0,0 +1,22 @@
+"""
+Descripción y esquema de entrada de la herramienta get_import_status.
+"""
+
+DESCRIPTION = (
+    "Consulta el avance de un trabajo de importación iniciado con add_data_corpus: estado, "
+    "progreso, archivos importados y fallidos, y tiempos. Sin job_id lista los trabajos recientes."
+)
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "job_id": {
+            "type": "string",
+            "description": "El job_id devuelto por add_data_corpus. Opcional."
+        },
+        "corpus_name": {
+            "type": "string",
+            "description": "Filtra los trabajos recientes por corpus cuando no se indica job_id. Opcional."
+        }
+    },
+}
@@ -0,0 +1,11 @@
+"""
+Descripción y esquema de entrada de la herramienta list_corpora.
+"""
+
+DESCRIPTION = "Lista todos los corpus RAG disponibles en Vertex AI"
+
+SCHEMA = {
+    "type": "object",
+    "properties": {},
+    "required": []
+}
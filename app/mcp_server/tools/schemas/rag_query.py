@@ -0,0 +1,34 @@
+"""
+Descripción y esquema de entrada de la herramienta rag_query.
+"""
+
+DESCRIPTION = "Busca información en un corpus RAG. Puedes especificar el corpus en el query de forma natural."
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "query": {
+            "type": "string",
+            "description": (
+                "La pregunta o búsqueda que deseas hacer. Puedes mencionar el corpus específico "
+                "en lenguaje natural (ej: 'en el corpus de trámites') o dejarlo para usar el corpus por defecto"
+            ),
+        },
+        "corpus_name": {
+            "type": "string",
+            "description": (
+                "Nombre específico del corpus donde buscar. Opcional: si no se proporciona, "
+                "se usará el corpus por defecto o se intentará extraer del query"
+            ),
+        },
+        "corpus_names": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": (
+                "Lista de corpus donde buscar cuando la pregunta abarca varios. Opcional: "
+                "se consultan en paralelo y sus resultados se combinan en una sola lista"
+            ),
+        },
+    },
+    "required": ["query"],
+}
@@ -0,0 +1,32 @@
+"""
+Descripción y esquema de entrada de la herramienta sync_corpus.
+"""
+
+DESCRIPTION = (
+    "Sincroniza un corpus con una ruta de Google Cloud Storage (gs://): importa solo los objetos "
+    "nuevos o modificados desde la última sincronización y elimina los documentos cuyo origen ya "
+    "no existe. Se ejecuta en segundo plano y devuelve un job_id para consultar con get_import_status."
+)
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "corpus_name": {
+            "type": "string",
+            "description": "Nombre del corpus RAG a sincronizar",
+        },
+        "source_uri": {
+            "type": "string",
+            "description": "Ruta GCS de origen. Ejemplo: 'gs://bucket/carpeta/'",
+        },
+        "delete_missing": {
+            "type": "boolean",
+            "description": "Eliminar del corpus los documentos cuyo objeto de origen ya no existe (por defecto true)",
+        },
+        "dry_run": {
+            "type": "boolean",
+            "description": "Solo calcular qué se importaría y eliminaría, sin modificar el corpus",
+        },
+    },
+    "required": ["corpus_name", "source_uri"],
+}
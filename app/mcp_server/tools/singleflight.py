@@ -0,0 +1,83 @@
+"""
+Agrupación de llamadas idénticas en vuelo (singleflight).
+
+Cuando varias peticiones piden lo mismo al backend RAG al mismo tiempo, solo la primera
+(el líder) hace la llamada; las demás esperan su resultado y lo comparten, en lugar de
+multiplicar las llamadas salientes durante un pico de tráfico.
+"""
+
+import threading
+from collections import Counter
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coordina llamadas por llave `(operación, *argumentos)`. Una llamada solo se comparte
+    mientras está en vuelo: en cuanto termina se olvida, así que esto no sustituye a la caché.
+    Si el líder falla, todos los que esperaban reciben la misma excepción.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Tuple[Hashable, ...], Future] = {}
+        self.leaders: Counter = Counter()
+        self.collapsed: Counter = Counter()
+
+    def do(self, key: Tuple[Hashable, ...], fn: Callable[[], T]) -> T:
+        """
+        Ejecuta `fn` o espera a la ejecución en curso con la misma llave.
+
+        Args:
+            key (tuple): Llave de la llamada; su primer elemento es el nombre de la operación
+            fn (Callable): La llamada a realizar si no hay otra igual en vuelo
+
+        Returns:
+            El resultado de `fn`, compartido con las llamadas agrupadas. Quien lo reciba no
+            debe modificarlo.
+        """
+        operation = key[0]
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self.leaders[operation] += 1
+            else:
+                self.collapsed[operation] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            operations = set(self.leaders) | set(self.collapsed)
+            return {
+                "in_flight": len(self._calls),
+                "operations": {
+                    operation: {
+                        "upstream_calls": self.leaders[operation],
+                        "collapsed_calls": self.collapsed[operation],
+                    }
+                    for operation in sorted(operations)
+                },
+            }
+
+
+singleflight = SingleFlight()
@@ -0,0 +1,309 @@
+"""
+Herramienta para sincronizar incrementalmente un corpus RAG con una carpeta de Google Cloud Storage.
+"""
+
+import logging
+import os
+import time
+from typing import Dict, List, Tuple
+
+from google.adk.tools import ToolContext, FunctionTool
+
+from backends import get_backend
+from backends.base import SourceObject
+from tools.jobs import ImportJob, import_jobs, import_paths
+from tools.manifest import SyncManifest
+from tools.utils import check_corpus_exists, corpus_versions, get_corpus_resource_name
+
+logger = logging.getLogger(__name__)
+
+SYNC_IMPORT_BATCH_SIZE = int(os.getenv("SYNC_IMPORT_BATCH_SIZE", "25"))
+SYNC_SECONDS_PER_FILE_ESTIMATE = float(os.getenv("SYNC_SECONDS_PER_FILE_ESTIMATE", "10"))
+
+PROCESS_SAFE = False
+
+
+class SyncPlan:
+    """
+    Diferencia entre los objetos de origen, el manifiesto y los archivos del corpus.
+    """
+
+    def __init__(self):
+        self.new: List[SourceObject] = []
+        self.changed: List[Tuple[SourceObject, list]] = []
+        self.unchanged: List[SourceObject] = []
+        # Objetos ya presentes en el corpus que se registran en el manifiesto sin reimportar
+        self.adopted: List[Tuple[SourceObject, object]] = []
+        self.gone: List[Tuple[str, list]] = []
+        self.forgotten: List[str] = []
+
+    @property
+    def to_import(self) -> List[SourceObject]:
+        return self.new + [source for source, _ in self.changed]
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "new": len(self.new),
+            "changed": len(self.changed),
+            "unchanged": len(self.unchanged) + len(self.adopted),
+            "adopted": len(self.adopted),
+            "gone": len(self.gone),
+        }
+
+
+def _is_current(rag_file, source: SourceObject) -> bool:
+    update_time = getattr(rag_file, "update_time", None)
+    if update_time is None or source.updated is None:
+        return False
+    try:
+        return update_time >= source.updated
+    except TypeError:
+        return False
+
+
+def plan_sync(
+    manifest: SyncManifest,
+    source_objects: List[SourceObject],
+    corpus_files: list,
+    source_uri: str,
+) -> SyncPlan:
+    """
+    Clasifica cada objeto de origen como nuevo, modificado o sin cambios y detecta los
+    documentos del corpus bajo `source_uri` cuyo origen desapareció.
+
+    Un objeto no cambió si su generación coincide con la del manifiesto, o si cambió la
+    generación pero no el checksum. Los documentos que ya estaban en el corpus antes del
+    primer sync se adoptan cuando son más recientes que su objeto de origen.
+    """
+    files_by_source: Dict[str, list] = {}
+    for rag_file in corpus_files:
+        file_source = getattr(rag_file, "source_uri", "")
+        if file_source and file_source.startswith(source_uri):
+            files_by_source.setdefault(file_source, []).append(rag_file)
+
+    plan = SyncPlan()
+    seen = set()
+    for source in source_objects:
+        seen.add(source.source_uri)
+        entry = manifest.entries.get(source.source_uri)
+        existing = files_by_source.get(source.source_uri, [])
+
+        if not existing:
+            plan.new.append(source)
+        elif entry and (
+            entry.get("generation") == source.generation
+            or (entry.get("checksum") and entry.get("checksum") == source.checksum)
+        ):
+            plan.unchanged.append(source)
+        elif not entry and len(existing) == 1 and _is_current(existing[0], source):
+            plan.adopted.append((source, existing[0]))
+        else:
+            plan.changed.append((source, existing))
+
+    plan.gone = [(uri, files) for uri, files in files_by_source.items() if uri not in seen]
+    plan.forgotten = [
+        uri for uri in manifest.entries
+        if uri.startswith(source_uri) and uri not in seen
+    ]
+    return plan
+
+
+def _delete_files(job: ImportJob, source_uri: str, rag_files: list) -> bool:
+    backend = get_backend()
+    deleted = True
+    for rag_file in rag_files:
+        try:
+            backend.delete_file(rag_file.name)
+        except Exception as e:
+            logger.warning(f"No se pudo eliminar '{rag_file.name}' durante el sync: {str(e)}")
+            job.errors.append({"path": source_uri, "error": str(e)})
+            deleted = False
+    return deleted
+
+
+def run_sync(job: ImportJob, source_uri: str, delete_missing: bool) -> None:
+    """
+    Ejecuta la sincronización dentro del trabajo: elimina los documentos sin origen, importa
+    lo nuevo o modificado en lotes y, solo para lo que se importó, elimina la versión anterior
+    y la registra en el manifiesto.
+    """
+    backend = get_backend()
+    source_objects = backend.list_source_objects(source_uri)
+    if not source_objects:
+        # Un listado vacío suele ser una ruta equivocada: no se elimina nada del corpus
+        job.errors.append({"path": source_uri, "error": "No se encontraron objetos en la ruta de origen"})
+        return
+
+    manifest = SyncManifest.load(job.corpus_resource_name)
+    plan = plan_sync(manifest, source_objects, backend.list_files(job.corpus_resource_name), source_uri)
+    gone = plan.gone if delete_missing else []
+    job.items_total = len(plan.to_import) + len(gone)
+    job.details["plan"] = plan.summary()
+
+    for source in plan.unchanged:
+        entry = manifest.entries[source.source_uri]
+        manifest.record(source.source_uri, source.generation, source.checksum, entry.get("rag_file", ""))
+    for source, rag_file in plan.adopted:
+        manifest.record(source.source_uri, source.generation, source.checksum, rag_file.name)
+
+    deleted = 0
+    for uri, rag_files in gone:
+        if _delete_files(job, uri, rag_files):
+            manifest.forget(uri)
+            deleted += 1
+        job.paths_done += 1
+    if delete_missing:
+        for uri in plan.forgotten:
+            manifest.forget(uri)
+
+    if gone:
+        corpus_versions.bump(job.corpus_resource_name)
+
+    import_started = time.perf_counter()
+    import_paths(job, [source.source_uri for source in plan.to_import], batch_size=SYNC_IMPORT_BATCH_SIZE)
+    import_seconds = time.perf_counter() - import_started
+
+    files_by_source: Dict[str, list] = {}
+    for rag_file in backend.list_files(job.corpus_resource_name):
+        files_by_source.setdefault(getattr(rag_file, "source_uri", ""), []).append(rag_file)
+
+    previous_files = {source.source_uri: [] for source in plan.new}
+    previous_files.update({source.source_uri: rag_files for source, rag_files in plan.changed})
+
+    synced = 0
+    replaced = False
+    not_imported = []
+    for source in plan.to_import:
+        # Solo cuenta como sincronizado si apareció un archivo nuevo: si la importación falló,
+        # el archivo anterior sigue ahí y no debe registrarse con la generación nueva
+        previous_names = {rag_file.name for rag_file in previous_files[source.source_uri]}
+        new_files = [
+            rag_file for rag_file in files_by_source.get(source.source_uri, [])
+            if rag_file.name not in previous_names
+        ]
+        if not new_files:
+            not_imported.append(source.source_uri)
+            continue
+
+        # Los archivos anteriores se eliminan hasta que el reemplazo ya está en el corpus
+        stale_files = [
+            rag_file for rag_file in files_by_source[source.source_uri]
+            if rag_file.name in previous_names
+        ]
+        if stale_files:
+            _delete_files(job, source.source_uri, stale_files)
+            replaced = True
+        manifest.record(source.source_uri, source.generation, source.checksum, new_files[0].name)
+        synced += 1
+
+    if replaced:
+        corpus_versions.bump(job.corpus_resource_name)
+
+    manifest.save()
+
+    seconds_per_file = import_seconds / synced if synced else SYNC_SECONDS_PER_FILE_ESTIMATE
+    skipped = len(plan.unchanged) + len(plan.adopted)
+    job.skipped_count += skipped
+    job.details["sync"] = {
+        "source_uri": source_uri,
+        "imported": synced,
+        "deleted": deleted,
+        "skipped_unchanged": skipped,
+        "not_imported": not_imported,
+        "import_seconds": round(import_seconds, 3),
+        "estimated_seconds_per_file": round(seconds_per_file, 3),
+        "estimated_seconds_saved": round(skipped * seconds_per_file, 1),
+    }
+
+
+def sync_corpus(
+    corpus_name: str,
+    source_uri: str,
+    tool_context: ToolContext,
+    delete_missing: bool = True,
+    dry_run: bool = False,
+) -> dict:
+    """
+    Sincroniza un corpus con una ruta de GCS importando solo lo nuevo o modificado.
+
+    Args:
+        corpus_name (str): Nombre del corpus a sincronizar
+        source_uri (str): Ruta GCS de origen (archivo o carpeta)
+        tool_context (ToolContext): El contexto de la herramienta
+        delete_missing (bool): Eliminar los documentos cuyo origen ya no existe
+        dry_run (bool): Solo calcular el plan, sin modificar el corpus
+
+    Returns:
+        dict: El plan de sincronización (dry_run) o el job_id del trabajo encolado
+    """
+    if not source_uri or not source_uri.startswith("gs://"):
+        return {
+            "status": "error",
+            "message": "Ruta invalida: proporciona una ruta GCS que comience con 'gs://'.",
+            "corpus_name": corpus_name,
+            "source_uri": source_uri,
+        }
+
+    try:
+        if not check_corpus_exists(corpus_name, tool_context):
+            return {
+                "status": "error",
+                "message": f"Corpus '{corpus_name}' no existe. Crealo primero.",
+                "corpus_name": corpus_name,
+                "source_uri": source_uri,
+            }
+
+        corpus_resource_name = get_corpus_resource_name(corpus_name)
+
+        if dry_run:
+            backend = get_backend()
+            plan = plan_sync(
+                SyncManifest.load(corpus_resource_name),
+                backend.list_source_objects(source_uri),
+                backend.list_files(corpus_resource_name),
+                source_uri,
+            )
+            summary = plan.summary()
+            return {
+                "status": "success",
+                "message": (
+                    f"Sync de '{source_uri}': {summary['new']} nuevo(s), {summary['changed']} modificado(s), "
+                    f"{summary['unchanged']} sin cambios y {summary['gone']} sin origen"
+                ),
+                "corpus_name": corpus_name,
+                "source_uri": source_uri,
+                "plan": summary,
+                "to_import": [source.source_uri for source in plan.to_import],
+                "to_delete": [uri for uri, _ in plan.gone] if delete_missing else [],
+            }
+
+        job = import_jobs.submit(
+            ImportJob(
+                corpus_name=corpus_name,
+                corpus_resource_name=corpus_resource_name,
+                paths=[source_uri],
+                kind="sync",
+            ),
+            target=lambda job: run_sync(job, source_uri, delete_missing),
+        )
+
+        return {
+            "status": "accepted",
+            "message": (
+                f"Sincronización de '{source_uri}' con el corpus '{corpus_name}' encolada. "
+                f"Consulta el avance con get_import_status y el job_id '{job.job_id}'."
+            ),
+            "job_id": job.job_id,
+            "corpus_name": corpus_name,
+            "source_uri": source_uri,
+        }
+
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Error al sincronizar el corpus: {str(e)}",
+            "corpus_name": corpus_name,
+            "source_uri": source_uri,
+        }
+
+run = FunctionTool(func=sync_corpus)
@@ -2,19 +2,191 @@
 Funciones utilitarias para las herramientas RAG.
 """
 
+import hashlib
+import json
 import logging
+import os
 import re
+import threading
+import time
+import uuid
+from typing import TYPE_CHECKING, Dict, Optional
 
-from google.adk.tools.tool_context import ToolContext
-from vertexai import rag
-
+from backends import get_backend
+from tools.singleflight import singleflight
 from config import (
     LOCATION,
     PROJECT_ID,
 )
 
+if TYPE_CHECKING:
+    from google.adk.tools.tool_context import ToolContext
+
 logger = logging.getLogger(__name__)
 
+CORPUS_REGISTRY_TTL_SECONDS = float(os.getenv("CORPUS_REGISTRY_TTL_SECONDS", "300"))
+CORPUS_REGISTRY_NEGATIVE_TTL_SECONDS = float(os.getenv("CORPUS_REGISTRY_NEGATIVE_TTL_SECONDS", "30"))
+
+RESOURCE_NAME_PATTERN = r"^projects/[^/]+/locations/[^/]+/ragCorpora/[^/]+$"
+
+
+class CorpusRegistry:
+    """
+    Registro en memoria, compartido por todo el proceso, de los corpus RAG disponibles.
+
+    Mapea display_name -> resource_name y solo lista los corpus del backend RAG cuando el
+    registro expira (TTL) o cuando se invalida explícitamente (create_corpus / delete_corpus).
+    Un nombre desconocido fuerza una recarga como máximo cada `negative_ttl_seconds`,
+    para detectar corpus creados fuera del servidor sin listar en cada consulta.
+
+    `generation` aumenta con cada invalidación y forma parte de la llave de singleflight del
+    listado: una recarga posterior a `invalidate()` nunca se une a un `list_corpora` que
+    empezó antes y podría no incluir el corpus recién creado.
+    """
+
+    def __init__(self, ttl_seconds: float, negative_ttl_seconds: float):
+        self._ttl_seconds = ttl_seconds
+        self._negative_ttl_seconds = negative_ttl_seconds
+        self._lock = threading.Lock()
+        self._by_display_name: Dict[str, str] = {}
+        self._by_corpus_id: Dict[str, str] = {}
+        self._resource_names: set = set()
+        self._loaded_at: Optional[float] = None
+        self.generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.invalidations = 0
+
+    def _is_fresh(self, max_age: float) -> bool:
+        return self._loaded_at is not None and (time.monotonic() - self._loaded_at) < max_age
+
+    def _refresh(self) -> bool:
+        """Recarga el registro desde el backend RAG. Debe llamarse con el lock adquirido."""
+        try:
+            corpora = singleflight.do(("list_corpora", self.generation), get_backend().list_corpora)
+            by_display_name = {}
+            by_corpus_id = {}
+            resource_names = set()
+            for corpus in corpora:
+                resource_names.add(corpus.name)
+                by_corpus_id[corpus.name.split("/")[-1]] = corpus.name
+                if hasattr(corpus, "display_name") and corpus.display_name:
+                    by_display_name[corpus.display_name] = corpus.name
+        except Exception as e:
+            self.refresh_errors += 1
+            logger.warning(f"Error al refrescar el registro de corpus: {str(e)}")
+            return False
+
+        self._by_display_name = by_display_name
+        self._by_corpus_id = by_corpus_id
+        self._resource_names = resource_names
+        self._loaded_at = time.monotonic()
+        self.refreshes += 1
+        return True
+
+    def _lookup(self, corpus_name: str) -> Optional[str]:
+        if corpus_name in self._resource_names:
+            return corpus_name
+        if corpus_name in self._by_display_name:
+            return self._by_display_name[corpus_name]
+        return self._by_corpus_id.get(corpus_name)
+
+    def resolve(self, corpus_name: str) -> Optional[str]:
+        """
+        Busca el resource_name de un corpus por su nombre para mostrar, su ID o su resource_name.
+
+        Args:
+            corpus_name (str): El nombre para mostrar, el ID o el nombre completo del recurso
+
+        Returns:
+            Optional[str]: El resource_name si el corpus está registrado, None en caso contrario.
+                           También devuelve None si no fue posible consultar Vertex AI.
+        """
+        with self._lock:
+            if self._is_fresh(self._ttl_seconds):
+                resource_name = self._lookup(corpus_name)
+                if resource_name or self._is_fresh(self._negative_ttl_seconds):
+                    self.hits += 1
+                    return resource_name
+
+            self.misses += 1
+            if not self._refresh():
+                return None
+            return self._lookup(corpus_name)
+
+    def invalidate(self) -> None:
+        """Marca el registro como expirado; la siguiente consulta recargará la lista de corpus."""
+        with self._lock:
+            self._loaded_at = None
+            self.generation += 1
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "corpora": len(self._resource_names),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "remote_list_calls": self.refreshes + self.refresh_errors,
+                "remote_list_calls_saved": self.hits,
+                "refresh_errors": self.refresh_errors,
+                "invalidations": self.invalidations,
+                "age_seconds": (
+                    time.monotonic() - self._loaded_at if self._loaded_at is not None else None
+                ),
+            }
+
+
+corpus_registry = CorpusRegistry(
+    ttl_seconds=CORPUS_REGISTRY_TTL_SECONDS,
+    negative_ttl_seconds=CORPUS_REGISTRY_NEGATIVE_TTL_SECONDS,
+)
+
+
+class CorpusVersions:
+    """
+    Contador de versión por corpus. Las herramientas que modifican el contenido de un corpus
+    (add_data, delete_document, delete_corpus) incrementan su versión, lo que invalida
+    cualquier resultado cacheado con una versión anterior.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        # Los contadores viven en memoria: el boot_id distingue la versión 1 de un proceso
+        # de la versión 1 del siguiente tras un reinicio
+        self.boot_id = uuid.uuid4().hex
+
+    def get(self, corpus_resource_name: str) -> int:
+        with self._lock:
+            return self._versions.get(corpus_resource_name, 0)
+
+    def bump(self, corpus_resource_name: str) -> int:
+        with self._lock:
+            version = self._versions.get(corpus_resource_name, 0) + 1
+            self._versions[corpus_resource_name] = version
+            return version
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._versions)
+
+    def token(self) -> str:
+        """
+        Huella de todas las versiones: cambia cuando cualquier corpus se modifica o el
+        servidor se reinicia. Sirve a los clientes para invalidar cachés derivadas.
+        """
+        state = json.dumps([self.boot_id, sorted(self.snapshot().items())])
+        return hashlib.sha1(state.encode("utf-8")).hexdigest()
+
+
+corpus_versions = CorpusVersions()
+
 def get_corpus_resource_name(corpus_name: str) -> str:
     """
     Convierte un nombre de corpus a su nombre completo de recurso si es necesario.
@@ -27,17 +199,12 @@ def get_corpus_resource_name(corpus_name: str) -> str:
         str: El nombre completo del recurso del corpus
     """
 
-    if re.match(r"^projects/[^/]+/locations/[^/]+/ragCorpora/[^/]+$", corpus_name):
+    if re.match(RESOURCE_NAME_PATTERN, corpus_name):
         return corpus_name
 
-    try:
-        corpora = rag.list_corpora()
-        for corpus in corpora:
-            if hasattr(corpus, "display_name") and corpus.display_name == corpus_name:
-                return corpus.name
-    except Exception as e:
-        logger.warning(f"Error cuando se verifica el nombre para mostrar del corpus: {str(e)}")
-        pass
+    resource_name = corpus_registry.resolve(corpus_name)
+    if resource_name:
+        return resource_name
 
     if "/" in corpus_name:
         corpus_id = corpus_name.split("/")[-1]
@@ -49,7 +216,7 @@ def get_corpus_resource_name(corpus_name: str) -> str:
     return f"projects/{PROJECT_ID}/locations/{LOCATION}/ragCorpora/{corpus_id}"
 
 
-def check_corpus_exists(corpus_name: str, tool_context: ToolContext) -> bool:
+def check_corpus_exists(corpus_name: str, tool_context: "ToolContext") -> bool:
     """
     Comprueba si existe un corpus con el nombre dado.
 
@@ -65,27 +232,19 @@ def check_corpus_exists(corpus_name: str, tool_context: ToolContext) -> bool:
         return True
 
     try:
-        corpus_resource_name = get_corpus_resource_name(corpus_name)
-
-        corpora = rag.list_corpora()
-        for corpus in corpora:
-            if (
-                corpus.name == corpus_resource_name
-                or corpus.display_name == corpus_name
-            ):
-
-                tool_context.state[f"corpus_exists_{corpus_name}"] = True
+        if not corpus_registry.resolve(corpus_name):
+            return False
 
-                if not tool_context.state.get("current_corpus"):
-                    tool_context.state["current_corpus"] = corpus_name
-                return True
+        tool_context.state[f"corpus_exists_{corpus_name}"] = True
 
-        return False
+        if not tool_context.state.get("current_corpus"):
+            tool_context.state["current_corpus"] = corpus_name
+        return True
     except Exception as e:
         logger.error(f"Error al comprobar si existe el corpus: {str(e)}")
         return False
 
-def set_current_corpus(corpus_name: str, tool_context: ToolContext) -> bool:
+def set_current_corpus(corpus_name: str, tool_context: "ToolContext") -> bool:
     """
     Agregar el corpus actual en el estado del contexto de la herramienta.
 
@@ -2,24 +2,50 @@
 Rutas REST para interactuar con el agente vía HTTP.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+import json
+import logging
+import time
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.genai import types
 from pydantic import BaseModel
 
 from services.config import settings
 from agent_runner import AgentRunner
+from services.answer_cache import (
+    ANSWER_CACHE_ENABLED,
+    answer_cache,
+    corpus_version_client,
+    is_cacheable_question,
+)
+from sub_agents.pre_router import routing_stats
+from sub_agents.shared_toolset import shared_tools
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/agent", tags=["Agent"])
 
 class QueryInput(BaseModel):
     message: str
     session_id: str | None = None
+    user_id: str | None = None
+    bypass_cache: bool = False
 
-def get_runner() -> AgentRunner:
+def create_runner() -> AgentRunner:
     return AgentRunner(
         project_id=settings.GOOGLE_PROJECT,
         location=settings.GOOGLE_LOCATION,
     )
 
+def get_runner(request: Request) -> AgentRunner:
+    """
+    Devuelve el AgentRunner compartido, creado una sola vez en el lifespan de la aplicación.
+    """
+    return request.app.state.agent_runner
+
 @router.post("/ask")
 async def ask_agent(
     payload: QueryInput,
@@ -28,22 +54,129 @@ async def ask_agent(
     """
     Envía un mensaje al agente.
     Maneja sesión, crea Runner y devuelve respuesta.
+
+    Las preguntas de trámites que abren una conversación (sin session_id) se responden desde
+    la caché de respuestas cuando ya se contestaron con la misma versión de los corpus. Esa
+    respuesta no abre sesión (`session_id` es None), así que el siguiente mensaje del cliente
+    empieza una conversación nueva en lugar de continuar una sesión vacía que no conoce la
+    pregunta ni la respuesta. `bypass_cache` fuerza a ejecutar el agente.
     """
 
+    cache_key = None
+    if ANSWER_CACHE_ENABLED and not payload.session_id and is_cacheable_question(payload.message):
+        if payload.bypass_cache:
+            answer_cache.bypassed += 1
+        else:
+            corpus_version = await corpus_version_client.get()
+            if corpus_version:
+                cache_key = answer_cache.key(payload.message, corpus_version)
+                cached = answer_cache.get(cache_key)
+                if cached is not None:
+                    return {
+                        "session_id": None,
+                        "response": cached.text,
+                        "cached": True,
+                    }
+
     session_id = runner_builder.get_or_create_session(payload.session_id)
 
     runner = runner_builder.build(session_id)
 
     try:
+        started = time.perf_counter()
         response = await runner.run(payload.message)
+        if cache_key and response.text:
+            answer_cache.put(cache_key, response.text, time.perf_counter() - started)
         return {
             "session_id": session_id,
             "response": response.text,
+            "cached": False,
         }
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def sse_event(event: str, data: dict) -> str:
+    """
+    Serializa un evento en formato Server-Sent Events.
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+def adk_event_to_sse(event) -> list[str]:
+    """
+    Traduce un evento de ADK a los eventos SSE que consume el cliente:
+    texto parcial del modelo, inicio y fin de llamadas a herramientas y respuesta final.
+    """
+    messages = []
+    agent = event.author
+
+    for call in event.get_function_calls():
+        messages.append(sse_event("tool_call_started", {
+            "agent": agent,
+            "name": call.name,
+            "args": call.args,
+        }))
+
+    for function_response in event.get_function_responses():
+        messages.append(sse_event("tool_call_finished", {
+            "agent": agent,
+            "name": function_response.name,
+        }))
+
+    text = ""
+    if event.content and event.content.parts:
+        text = "".join(part.text for part in event.content.parts if part.text)
+
+    if text and event.partial:
+        messages.append(sse_event("delta", {"agent": agent, "text": text}))
+    elif text and event.is_final_response():
+        messages.append(sse_event("final", {"agent": agent, "text": text}))
+
+    return messages
+
+@router.post("/ask/stream")
+async def ask_agent_stream(
+    payload: QueryInput,
+    runner_builder: AgentRunner = Depends(get_runner),
+):
+    """
+    Envía un mensaje al agente y transmite su progreso vía Server-Sent Events.
+    Emite el texto parcial del modelo a medida que se genera, el inicio y fin de cada
+    llamada a herramienta y la respuesta final, seguida de un evento `done`.
+    """
+
+    session_id = runner_builder.get_or_create_session(payload.session_id)
+
+    runner = runner_builder.build(session_id)
+
+    new_message = types.Content(role="user", parts=[types.Part(text=payload.message)])
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE)
+
+    async def event_stream() -> AsyncIterator[str]:
+        yield sse_event("session", {"session_id": session_id})
+        try:
+            async for event in runner.run_async(
+                user_id=payload.user_id or session_id,
+                session_id=session_id,
+                new_message=new_message,
+                run_config=run_config,
+            ):
+                for message in adk_event_to_sse(event):
+                    yield message
+        except Exception as e:
+            logger.exception(f"Error transmitiendo la respuesta del agente: {str(e)}")
+            yield sse_event("error", {"detail": str(e)})
+        yield sse_event("done", {"session_id": session_id})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
 @router.get("/session/{session_id}")
 def get_session(
     session_id: str,
@@ -55,3 +188,17 @@ def get_session(
         "session_id": session_id,
         "exists": exists,
     }
+
+@router.get("/stats")
+def get_stats(
+    runner_builder: AgentRunner = Depends(get_runner),
+):
+    """
+    Expone la efectividad de las cachés del proceso del agente.
+    """
+    return {
+        "runners": runner_builder.stats(),
+        "mcp_tools": shared_tools.stats(),
+        "pre_router": routing_stats.stats(),
+        "answer_cache": answer_cache.stats(),
+    }
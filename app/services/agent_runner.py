@@ -2,28 +2,43 @@
 Construye el Runner y controla la creación/obtención de sesiones.
 """
 
+import os
 import uuid
+from collections import OrderedDict
 from google.adk import Runner
 
 from services.session_service import SessionService
 from services.vertex_services import VertexServices
 from agent.agent import root_agent
 
+AGENT_RUNNER_CACHE_SIZE = int(os.getenv("AGENT_RUNNER_CACHE_SIZE", "256"))
+
 
 class AgentRunner:
     """
     Clase que encapsula la creación del Runner de ADK
     y administra la sesión del usuario.
+
+    Se construye una sola vez por proceso: los clientes de sesiones y del memory bank
+    se comparten entre peticiones, y los Runner de las sesiones usadas recientemente
+    se conservan en una caché LRU acotada para que los turnos siguientes de una
+    conversación no vuelvan a construirlos.
     """
 
-    def __init__(self, project_id: str, location: str):
+    def __init__(self, project_id: str, location: str, runner_cache_size: int = AGENT_RUNNER_CACHE_SIZE):
         self.project_id = project_id
         self.location = location
 
         self.session_service = SessionService()
         self.vertex = VertexServices(project_id, location)
+        self.memory_bank = self.vertex.build_memory_bank()
         self.agent = root_agent
 
+        self.runner_cache_size = runner_cache_size
+        self._runners: "OrderedDict[str, Runner]" = OrderedDict()
+        self.runner_hits = 0
+        self.runner_misses = 0
+
     def get_or_create_session(self, session_id: str | None = None) -> str:
         """
         Regresa una sesión válida. Si no existe, la crea.
@@ -38,13 +53,40 @@ class AgentRunner:
         return new_session_id
 
     def build(self, session_id: str) -> Runner:
+        runner = self._runners.get(session_id)
+        if runner is not None:
+            self.runner_hits += 1
+            self._runners.move_to_end(session_id)
+            return runner
+
+        self.runner_misses += 1
         session = self.session_service.get(session_id)
         agent = self.agent_factory.create_agent(session_id=session_id)
 
         runner = Runner(
             agent=agent,
             session=session,
-            memory_bank=self.vertex.build_memory_bank(),
+            memory_bank=self.memory_bank,
         )
 
+        self._runners[session_id] = runner
+        while len(self._runners) > self.runner_cache_size:
+            self._runners.popitem(last=False)
+
         return runner
+
+    def evict(self, session_id: str) -> None:
+        """
+        Descarta el Runner cacheado de una sesión.
+        """
+        self._runners.pop(session_id, None)
+
+    def stats(self) -> dict:
+        lookups = self.runner_hits + self.runner_misses
+        return {
+            "runners_cached": len(self._runners),
+            "max_size": self.runner_cache_size,
+            "hits": self.runner_hits,
+            "misses": self.runner_misses,
+            "hit_rate": (self.runner_hits / lookups) if lookups else 0.0,
+        }
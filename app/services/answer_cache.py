@@ -0,0 +1,164 @@
+"""
+Caché de respuestas del agente para preguntas de trámites de primer turno.
+"""
+
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import httpx
+from dotenv import load_dotenv
+
+from sub_agents.pre_router import PROCEDURE_AGENT, intent_classifier, tokenize
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+MCP_SERVER_TOKEN = os.getenv("MCP_SERVER_TOKEN")
+MCP_SERVER_URL = os.getenv("MCP_SERVER_URL")
+
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "512"))
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+ANSWER_CACHE_MIN_CONFIDENCE = float(os.getenv("ANSWER_CACHE_MIN_CONFIDENCE", "0.8"))
+CORPUS_VERSION_TTL_SECONDS = float(os.getenv("CORPUS_VERSION_TTL_SECONDS", "5"))
+
+
+def normalize_question(question: str) -> str:
+    """
+    Llave de la pregunta: sin acentos, mayúsculas, puntuación ni palabras vacías, de modo que
+    '¿Cómo renuevo mi licencia?' y 'como renuevo la licencia' comparten respuesta.
+    """
+    return " ".join(tokenize(question))
+
+
+def is_cacheable_question(question: str) -> bool:
+    """
+    Solo se cachean consultas de información sobre trámites. Las peticiones al agente de corpus
+    pueden modificar datos (crear, importar, eliminar) y no deben responderse desde la caché.
+    """
+    decision = intent_classifier.classify(question)
+    return decision.label == PROCEDURE_AGENT and decision.confidence >= ANSWER_CACHE_MIN_CONFIDENCE
+
+
+class CorpusVersionClient:
+    """
+    Consulta la huella de versiones de corpus del servidor MCP y la reutiliza durante
+    `ttl_seconds`. Si el servidor no responde devuelve None y la caché no se usa.
+    """
+
+    def __init__(self, base_url: Optional[str], token: Optional[str], ttl_seconds: float = 5):
+        self.url = f"{base_url}/api/mcp/corpus_versions"
+        self.token = token
+        self.ttl_seconds = ttl_seconds
+        self._client: Optional[httpx.AsyncClient] = None
+        self._version: Optional[str] = None
+        self._expires_at = 0.0
+
+        self.fetches = 0
+        self.errors = 0
+
+    async def get(self) -> Optional[str]:
+        if self._version and time.monotonic() < self._expires_at:
+            return self._version
+
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers={"Authorization": f"Bearer {self.token}"},
+                timeout=2.0,
+            )
+
+        try:
+            response = await self._client.get(self.url)
+            response.raise_for_status()
+            self._version = response.json()["token"]
+            self._expires_at = time.monotonic() + self.ttl_seconds
+            self.fetches += 1
+            return self._version
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"No se pudo obtener la versión de los corpus: {str(e)}")
+            return None
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class CachedAnswer:
+    def __init__(self, text: str, latency_seconds: float, expires_at: float):
+        self.text = text
+        self.latency_seconds = latency_seconds
+        self.expires_at = expires_at
+
+
+class AnswerCache:
+    """
+    Respuestas finales del agente indexadas por (pregunta normalizada, versión de corpus).
+
+    Un cambio en cualquier corpus cambia la versión y deja de coincidir con las respuestas
+    anteriores, que salen por TTL o por el límite de tamaño (LRU). Cada acierto suma la
+    latencia que tomó generar la respuesta original como tiempo ahorrado.
+    """
+
+    def __init__(self, max_size: int = 512, ttl_seconds: float = 3600):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], CachedAnswer]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self.latency_saved_seconds = 0.0
+
+    @staticmethod
+    def key(question: str, corpus_version: str) -> Tuple[str, str]:
+        return normalize_question(question), corpus_version
+
+    def get(self, key: Tuple[str, str]) -> Optional[CachedAnswer]:
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() >= entry.expires_at:
+            del self._entries[key]
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self.latency_saved_seconds += entry.latency_seconds
+        return entry
+
+    def put(self, key: Tuple[str, str], text: str, latency_seconds: float) -> None:
+        self._entries[key] = CachedAnswer(text, latency_seconds, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": ANSWER_CACHE_ENABLED,
+            "entries": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "latency_saved_seconds": round(self.latency_saved_seconds, 3),
+            "corpus_version_fetches": corpus_version_client.fetches,
+            "corpus_version_errors": corpus_version_client.errors,
+        }
+
+
+corpus_version_client = CorpusVersionClient(MCP_SERVER_URL, MCP_SERVER_TOKEN, CORPUS_VERSION_TTL_SECONDS)
+answer_cache = AnswerCache(ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL_SECONDS)
@@ -1,31 +1,88 @@
+import asyncio
 import logging
-from typing import Optional
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+SESSION_INDEX_MAX_USERS = int(os.getenv("SESSION_INDEX_MAX_USERS", "10000"))
 
-async def get_or_create_session(
-    session_service,
-    app_name: str,
-    user_id: str,
-    requested_session_id: Optional[str] = None
-):
-    session = None
-    session_id = None
 
-    if requested_session_id:
+class LatestSessionIndex:
+    """
+    Índice en memoria de la sesión más reciente por (app_name, user_id).
+
+    Se actualiza cada vez que una sesión se crea o se usa, de modo que los usuarios
+    recurrentes se resuelven con un solo get_session en lugar de listar todo su historial.
+    Está acotado en tamaño y descarta a los usuarios usados hace más tiempo.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, app_name: str, user_id: str) -> Optional[str]:
+        with self._lock:
+            session_id = self._entries.get((app_name, user_id))
+            if session_id is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end((app_name, user_id))
+            return session_id
+
+    def peek(self, app_name: str, user_id: str) -> Optional[str]:
+        with self._lock:
+            return self._entries.get((app_name, user_id))
+
+    def touch(self, app_name: str, user_id: str, session_id: str) -> None:
+        with self._lock:
+            self._entries[(app_name, user_id)] = session_id
+            self._entries.move_to_end((app_name, user_id))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def forget(self, app_name: str, user_id: str) -> None:
+        with self._lock:
+            self._entries.pop((app_name, user_id), None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "users": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+latest_sessions = LatestSessionIndex(max_size=SESSION_INDEX_MAX_USERS)
+
+
+async def find_latest_session(session_service, app_name: str, user_id: str):
+    """
+    Busca la sesión más reciente del usuario: primero en el índice en memoria y,
+    solo si no está registrada (o ya no existe), listando las sesiones remotas.
+    """
+    indexed_session_id = latest_sessions.get(app_name, user_id)
+    if indexed_session_id:
         try:
             session = await session_service.get_session(
                 app_name=app_name,
                 user_id=user_id,
-                session_id=requested_session_id
+                session_id=indexed_session_id
             )
             if session:
-                session_id = session.id
-                logger.info(f"Sesión recuperada por session_id: {session_id}")
-                return session, session_id
+                logger.info(f"Sesión más reciente recuperada del índice: {session.id}")
+                return session
         except Exception as e:
-            logger.warning(f"No se pudo obtener sesión {requested_session_id}: {e}")
+            logger.warning(f"No se pudo obtener la sesión indexada {indexed_session_id}: {e}")
+        latest_sessions.forget(app_name, user_id)
 
     try:
         list_resp = await session_service.list_sessions(app_name=app_name, user_id=user_id)
@@ -40,15 +97,58 @@ async def get_or_create_session(
                     or 0
                 )
 
-            sessions_list.sort(key=_ts, reverse=True)
-            session = sessions_list[0]
-            session_id = session.id
-            logger.info(f"Sesión más reciente encontrada: {session_id}")
-            return session, session_id
+            session = max(sessions_list, key=_ts)
+            logger.info(f"Sesión más reciente encontrada: {session.id}")
+            return session
 
     except Exception as e:
         logger.warning(f"Error listando sesiones para user {user_id}: {e}")
 
+    return None
+
+
+async def get_or_create_session(
+    session_service,
+    app_name: str,
+    user_id: str,
+    requested_session_id: Optional[str] = None
+):
+    session = None
+    session_id = None
+    latest_task = None
+
+    if requested_session_id:
+        if latest_sessions.peek(app_name, user_id) != requested_session_id:
+            # La búsqueda de respaldo corre en paralelo para no sumar su latencia si la sesión pedida no existe
+            latest_task = asyncio.ensure_future(
+                find_latest_session(session_service, app_name, user_id)
+            )
+        try:
+            session = await session_service.get_session(
+                app_name=app_name,
+                user_id=user_id,
+                session_id=requested_session_id
+            )
+            if session:
+                if latest_task is not None:
+                    latest_task.cancel()
+                session_id = session.id
+                latest_sessions.touch(app_name, user_id, session_id)
+                logger.info(f"Sesión recuperada por session_id: {session_id}")
+                return session, session_id
+        except Exception as e:
+            logger.warning(f"No se pudo obtener sesión {requested_session_id}: {e}")
+
+    if latest_task is not None:
+        session = await latest_task
+    else:
+        session = await find_latest_session(session_service, app_name, user_id)
+
+    if session:
+        session_id = session.id
+        latest_sessions.touch(app_name, user_id, session_id)
+        return session, session_id
+
     try:
         initial_state = {}
         session = await session_service.create_session(
@@ -57,6 +157,7 @@ async def get_or_create_session(
             state=initial_state
         )
         session_id = session.id
+        latest_sessions.touch(app_name, user_id, session_id)
         logger.info(f"Nueva sesión creada: {session_id}")
         return session, session_id
 
@@ -0,0 +1,399 @@
+"""
+Benchmark de carga para el endpoint /api/mcp del servidor MCP.
+
+Envía una mezcla configurable de peticiones `initialize`, `tools/list` y `tools/call`
+a una tasa objetivo (RPS, en lazo abierto) y reporta latencias p50/p95/p99 por operación,
+throughput, tasa de error y el retraso del event loop.
+
+Por defecto levanta el servidor dentro del mismo proceso con el backend RAG local
+(RAG_BACKEND=local) y un corpus sintético, de modo que los resultados son reproducibles
+y comparables entre commits. Con --url se apunta a un servidor ya desplegado.
+
+Ejemplos:
+    python benchmarks/mcp_load.py --mix query --rps 200 --duration 30
+    python benchmarks/mcp_load.py --mix ingest --output bench_output.json
+    python benchmarks/mcp_load.py --mix "rag_query=7,tools/list=3" --compare bench_output.json
+"""
+
+import argparse
+import ast
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MCP_SERVER_DIR = os.path.join(ROOT_DIR, "app", "mcp_server")
+
+BENCH_CORPUS = "bench_corpus"
+BENCH_TOKEN = "bench-token"
+
+MIXES = {
+    "query": {
+        "rag_query": 80,
+        "tools/list": 10,
+        "initialize": 5,
+        "get_corpus_info": 5,
+    },
+    "ingest": {
+        "add_data_corpus": 40,
+        "get_import_status": 30,
+        "rag_query": 30,
+    },
+    "admin": {
+        "list_corpora": 35,
+        "get_corpus_info": 35,
+        "tools/list": 15,
+        "initialize": 15,
+    },
+}
+
+QUERIES = [
+    "¿Cómo renuevo mi licencia de conducir?",
+    "¿Qué documentos necesito para mi acta de nacimiento?",
+    "¿Cuánto cuesta el trámite de placas?",
+    "Horario del Registro Civil",
+    "Requisitos para la constancia de no antecedentes penales",
+    "¿Dónde pago el impuesto predial?",
+    "¿Cuánto tarda la entrega del pasaporte?",
+    "Formas de pago aceptadas en el módulo de licencias",
+]
+
+TOPICS = [
+    ("licencia", "Renovación de licencia de conducir. Requisitos: identificación oficial, comprobante de domicilio, licencia anterior y pago de derechos. Costo 850 pesos."),
+    ("acta", "Acta de nacimiento certificada. Se solicita en el Registro Civil con CURP e identificación. Costo 120 pesos, entrega inmediata."),
+    ("placas", "Alta de placas vehiculares. Requiere factura, tarjeta de circulación anterior y comprobante de domicilio. Costo 1,450 pesos."),
+    ("predial", "Pago de impuesto predial en tesorería municipal o en línea con la clave catastral. Descuento del 10% en enero."),
+    ("antecedentes", "Constancia de no antecedentes penales. Requiere identificación, CURP y fotografía. Trámite en la Fiscalía, costo 200 pesos."),
+]
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    if mix in MIXES:
+        return MIXES[mix]
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        weights[name.strip()] = int(weight or 1)
+    return weights
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(values: List[float]) -> dict:
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+        "max_ms": round(max(values), 3) if values else 0.0,
+    }
+
+
+def parse_tool_result(body: dict) -> dict:
+    """
+    Decodifica el resultado de una herramienta, serializado como JSON o como repr de Python.
+    """
+    text = body["result"]["content"][0]["text"]
+    for parse in (json.loads, ast.literal_eval):
+        try:
+            result = parse(text)
+        except (ValueError, SyntaxError):
+            continue
+        if isinstance(result, dict):
+            return result
+    return {}
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def write_corpus_files(data_dir: str, documents: int) -> None:
+    folder = os.path.join(data_dir, "bench", "docs")
+    os.makedirs(folder, exist_ok=True)
+    rng = random.Random(7)
+    for i in range(documents):
+        name, text = TOPICS[i % len(TOPICS)]
+        filler = " ".join(rng.choice(text.split()) for _ in range(200))
+        with open(os.path.join(folder, f"{name}_{i}.txt"), "w", encoding="utf-8") as handle:
+            handle.write(f"{text}\n{filler}\n")
+
+
+class LoopLagMonitor:
+    """
+    Mide el retraso del event loop: cuánto tarda en despertar una tarea que duerme `interval`.
+    Con el servidor en proceso refleja el bloqueo que sufren las peticiones del servidor.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, (time.perf_counter() - started - self.interval) * 1000))
+
+    def start(self) -> None:
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+class LoadGenerator:
+    def __init__(self, client: httpx.AsyncClient, token: str, weights: Dict[str, int], seed: int):
+        self.client = client
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.rng = random.Random(seed)
+        self.operations = list(weights)
+        self.weights = [weights[name] for name in self.operations]
+        self.latencies: Dict[str, List[float]] = {name: [] for name in self.operations}
+        self.errors: Dict[str, int] = {name: 0 for name in self.operations}
+        self.session_id: Optional[str] = None
+        self._ids = 0
+
+    def _next_id(self) -> int:
+        self._ids += 1
+        return self._ids
+
+    async def rpc(self, method: str, params: Optional[dict] = None) -> Tuple[int, dict]:
+        headers = dict(self.headers)
+        if self.session_id:
+            headers["Mcp-Session-Id"] = self.session_id
+        payload = {"jsonrpc": "2.0", "id": self._next_id(), "method": method}
+        if params is not None:
+            payload["params"] = params
+        response = await self.client.post("/api/mcp", json=payload, headers=headers)
+        if method == "initialize" and response.headers.get("mcp-session-id"):
+            self.session_id = response.headers["mcp-session-id"]
+        return response.status_code, response.json()
+
+    async def call_tool(self, name: str, arguments: dict) -> Tuple[int, dict]:
+        return await self.rpc("tools/call", {"name": name, "arguments": arguments})
+
+    def build_request(self, operation: str) -> Tuple[str, Optional[dict]]:
+        if operation in ("initialize", "tools/list"):
+            return operation, None
+        if operation == "rag_query":
+            arguments = {"query": self.rng.choice(QUERIES), "corpus_name": BENCH_CORPUS}
+        elif operation == "add_data_corpus":
+            arguments = {"corpus_name": BENCH_CORPUS, "paths": ["gs://bench/docs/"]}
+        elif operation in ("get_corpus_info", "get_import_status"):
+            arguments = {"corpus_name": BENCH_CORPUS}
+        else:
+            arguments = {}
+        return "tools/call", {"name": operation, "arguments": arguments}
+
+    async def execute(self, operation: str) -> None:
+        method, params = self.build_request(operation)
+        started = time.perf_counter()
+        failed = False
+        try:
+            status_code, body = await self.rpc(method, params)
+            failed = status_code != 200 or bool(body.get("error"))
+            if not failed and method == "tools/call":
+                failed = parse_tool_result(body).get("status") == "error"
+        except Exception:
+            failed = True
+        self.latencies[operation].append((time.perf_counter() - started) * 1000)
+        if failed:
+            self.errors[operation] += 1
+
+    async def run(self, rps: float, duration: float, max_in_flight: int) -> float:
+        """
+        Programa las peticiones en lazo abierto: la i-ésima sale en start + i / rps sin
+        esperar a las anteriores, hasta `max_in_flight` peticiones simultáneas.
+        """
+        in_flight = asyncio.Semaphore(max_in_flight)
+        tasks = []
+
+        async def guarded(operation: str) -> None:
+            try:
+                await self.execute(operation)
+            finally:
+                in_flight.release()
+
+        total = int(rps * duration)
+        started = time.perf_counter()
+        for i in range(total):
+            delay = started + i / rps - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await in_flight.acquire()
+            operation = self.rng.choices(self.operations, weights=self.weights)[0]
+            tasks.append(asyncio.ensure_future(guarded(operation)))
+
+        await asyncio.gather(*tasks)
+        return time.perf_counter() - started
+
+
+@asynccontextmanager
+async def local_server(data_dir: str):
+    """
+    Levanta el servidor MCP en proceso con el backend RAG local y lo expone vía ASGI.
+    """
+    os.environ["RAG_BACKEND"] = "local"
+    os.environ["RAG_LOCAL_DATA_DIR"] = data_dir
+    os.environ["MCP_SERVER_TOKEN"] = BENCH_TOKEN
+    sys.path.insert(0, MCP_SERVER_DIR)
+
+    import mcp_server
+
+    async with mcp_server.lifespan(mcp_server.app):
+        transport = httpx.ASGITransport(app=mcp_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://mcp.local", timeout=60) as client:
+            yield client
+
+
+async def prepare_corpus(generator: LoadGenerator, timeout: float = 120) -> None:
+    await generator.rpc("initialize")
+    await generator.call_tool("create_corpus", {"corpus_name": BENCH_CORPUS})
+    _, body = await generator.call_tool(
+        "add_data_corpus", {"corpus_name": BENCH_CORPUS, "paths": ["gs://bench/docs/"]}
+    )
+    job_id = parse_tool_result(body)["job_id"]
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        _, body = await generator.call_tool("get_import_status", {"job_id": job_id})
+        if parse_tool_result(body)["job"]["status"] not in ("queued", "running"):
+            return
+        await asyncio.sleep(0.1)
+    raise TimeoutError("La ingesta del corpus de benchmark no terminó a tiempo")
+
+
+def build_report(args, generator: LoadGenerator, elapsed: float, lag: LoopLagMonitor) -> dict:
+    all_latencies = [value for values in generator.latencies.values() for value in values]
+    completed = len(all_latencies)
+    errors = sum(generator.errors.values())
+    return {
+        "revision": git_revision(),
+        "target": args.url or "in-process (RAG_BACKEND=local)",
+        "mix": args.mix,
+        "target_rps": args.rps,
+        "duration_s": round(elapsed, 3),
+        "completed": completed,
+        "throughput_rps": round(completed / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(errors / completed, 4) if completed else 0.0,
+        "latency": summarize(all_latencies),
+        "operations": {
+            name: {**summarize(values), "errors": generator.errors[name]}
+            for name, values in generator.latencies.items()
+            if values
+        },
+        "event_loop_lag": summarize(lag.samples),
+    }
+
+
+def print_report(report: dict, baseline: Optional[dict] = None) -> None:
+    print(f"\nrevisión {report['revision']} | {report['target']} | mezcla '{report['mix']}'")
+    print(
+        f"completadas {report['completed']} en {report['duration_s']}s | "
+        f"throughput {report['throughput_rps']} rps (objetivo {report['target_rps']}) | "
+        f"errores {report['error_rate'] * 100:.2f}%"
+    )
+    header = f"{'operación':<20}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errores':>9}"
+    print(header)
+    print("-" * len(header))
+    rows = dict(report["operations"])
+    rows["TOTAL"] = {**report["latency"], "errors": round(report["error_rate"] * report["completed"])}
+    rows["event loop lag"] = {**report["event_loop_lag"], "errors": 0}
+    for name, row in rows.items():
+        line = f"{name:<20}{row['count']:>7}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}{row['errors']:>9}"
+        if baseline:
+            base = baseline["operations"].get(name) or (baseline["latency"] if name == "TOTAL" else None)
+            if base and base.get("p95_ms"):
+                line += f"   p95 {100.0 * (row['p95_ms'] - base['p95_ms']) / base['p95_ms']:+.1f}% vs {baseline['revision']}"
+        print(line)
+
+
+async def main(args) -> dict:
+    weights = parse_mix(args.mix)
+
+    if args.url:
+        client_context = httpx.AsyncClient(base_url=args.url.rstrip("/"), timeout=60)
+        token = args.token or os.getenv("MCP_SERVER_TOKEN", "")
+    else:
+        data_dir = tempfile.mkdtemp(prefix="mcp-bench-")
+        write_corpus_files(data_dir, args.documents)
+        client_context = local_server(data_dir)
+        token = BENCH_TOKEN
+
+    async with client_context as client:
+        generator = LoadGenerator(client, token, weights, args.seed)
+        if not args.url or args.prepare:
+            await prepare_corpus(generator)
+
+        if args.warmup:
+            await generator.run(rps=args.rps, duration=args.warmup, max_in_flight=args.max_in_flight)
+            generator.latencies = {name: [] for name in generator.operations}
+            generator.errors = {name: 0 for name in generator.operations}
+
+        lag = LoopLagMonitor()
+        lag.start()
+        elapsed = await generator.run(rps=args.rps, duration=args.duration, max_in_flight=args.max_in_flight)
+        await lag.stop()
+
+    return build_report(args, generator, elapsed, lag)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de carga del servidor MCP")
+    parser.add_argument("--mix", default="query",
+                        help="query, ingest, admin o pesos personalizados 'rag_query=8,tools/list=2'")
+    parser.add_argument("--rps", type=float, default=50.0, help="Peticiones por segundo objetivo")
+    parser.add_argument("--duration", type=float, default=10.0, help="Duración de la medición en segundos")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Segundos de calentamiento no medidos")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="Máximo de peticiones simultáneas")
+    parser.add_argument("--documents", type=int, default=50, help="Documentos del corpus sintético local")
+    parser.add_argument("--seed", type=int, default=1234, help="Semilla para la selección de operaciones")
+    parser.add_argument("--url", help="URL de un servidor MCP desplegado; por defecto se usa uno en proceso")
+    parser.add_argument("--token", help="Token bearer para --url (por defecto MCP_SERVER_TOKEN)")
+    parser.add_argument("--prepare", action="store_true",
+                        help="Con --url, crea y puebla el corpus de benchmark antes de medir")
+    parser.add_argument("--output", help="Archivo JSON donde guardar el reporte")
+    parser.add_argument("--compare", help="Reporte JSON previo contra el cual comparar")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    report = asyncio.run(main(arguments))
+
+    baseline = None
+    if arguments.compare:
+        with open(arguments.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+    print_report(report, baseline)
+
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2, ensure_ascii=False)